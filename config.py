@@ -26,9 +26,40 @@ ADMIN_IDS: list[int] = [
     int(uid.strip()) for uid in _admin_ids_raw.split(",") if uid.strip().isdigit()
 ]
 
+# ---- Run mode: "polling" or "webhook" ----
+BOT_MODE: str = os.getenv("BOT_MODE", "polling").strip().lower()
+
+# Webhook settings (BOT_MODE=webhook). WEBHOOK_URL is the public HTTPS base
+# URL Telegram will call; WEBHOOK_SECRET is checked on every request.
+WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "")
+WEBAPP_HOST: str = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT: int = int(os.getenv("WEBAPP_PORT", "8080"))
+# Seconds to wait for in-flight updates on shutdown
+WEBHOOK_DRAIN_TIMEOUT: float = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))
+
+# Worker processes (>1 = supervisor mode: updates are sharded by user id)
+WORKERS: int = int(os.getenv("WORKERS", "1"))
+# Set by the supervisor for its child processes; None in a single process
+WORKER_INDEX: int | None = (
+    int(os.environ["BOT_WORKER_INDEX"]) if os.getenv("BOT_WORKER_INDEX") else None
+)
+# How often workers check cache_versions for changes made by other workers
+CACHE_SYNC_INTERVAL: float = float(os.getenv("CACHE_SYNC_INTERVAL", "1"))
+
+# Custom Bot API server (local Bot API server or a fake one for tests)
+TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "")
+
 # ---- Database path ----
 DB_PATH: str = str((BASE_DIR / "data" / "bot.db").absolute())
 
+# Read-only WAL connections used for SELECTs (0 = use the single writer)
+DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+
+# Milliseconds to wait for another process holding the SQLite write lock
+DB_BUSY_TIMEOUT: int = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))
+
 # ---- Logging ----
 LOG_DIR: str = str((BASE_DIR / "logs").absolute())
 LOG_FILE: str = str((Path(LOG_DIR) / "bot.log").absolute())
@@ -36,8 +67,98 @@ LOG_FILE: str = str((Path(LOG_DIR) / "bot.log").absolute())
 # ---- Pagination ----
 EPISODES_PER_PAGE: int = 5
 SEARCH_RESULTS_PER_PAGE: int = 5
+# Cached search totals and page cursors (seconds)
+SEARCH_COUNT_TTL: float = float(os.getenv("SEARCH_COUNT_TTL", "60"))
+SEARCH_CURSOR_TTL: float = float(os.getenv("SEARCH_CURSOR_TTL", "600"))
+SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "10000"))
 SHORTS_PER_PAGE: int = 1
 
+# ---- Catalog cache (anime rows and season indexes, per process) ----
+CATALOG_CACHE_SIZE: int = int(os.getenv("CATALOG_CACHE_SIZE", "5000"))
+# Cached anime rows are re-read after this many seconds so view counts
+# flushed by other worker processes show up
+CATALOG_ANIME_TTL: float = float(os.getenv("CATALOG_ANIME_TTL", "60"))
+
+# ---- Inline button context (search queries behind callback tokens) ----
+CALLBACK_CONTEXT_TTL: float = float(os.getenv("CALLBACK_CONTEXT_TTL", "86400"))
+CALLBACK_CONTEXT_SIZE: int = int(os.getenv("CALLBACK_CONTEXT_SIZE", "50000"))
+
+# ---- Full-text search ranking ----
+# bm25 is boosted by up to (1 + SEARCH_VIEWS_WEIGHT) for popular anime;
+# SEARCH_VIEWS_HALF is the view count that gives half of that boost.
+SEARCH_VIEWS_WEIGHT: float = float(os.getenv("SEARCH_VIEWS_WEIGHT", "0.5"))
+SEARCH_VIEWS_HALF: int = int(os.getenv("SEARCH_VIEWS_HALF", "100"))
+
+# ---- View counter buffer (write-behind) ----
+VIEW_FLUSH_INTERVAL: float = float(os.getenv("VIEW_FLUSH_INTERVAL", "10"))
+VIEW_FLUSH_THRESHOLD: int = int(os.getenv("VIEW_FLUSH_THRESHOLD", "500"))
+
+# ---- Outgoing Telegram API limits (all workers together) ----
+# Telegram allows about 30 messages/s per bot, ~1 message/s per private
+# chat and 20 messages/minute per group.
+OUT_GLOBAL_RATE: float = float(os.getenv("OUT_GLOBAL_RATE", "30"))
+OUT_CHAT_RATE: float = float(os.getenv("OUT_CHAT_RATE", "1"))
+OUT_CHAT_BURST: float = float(os.getenv("OUT_CHAT_BURST", "3"))
+OUT_GROUP_RATE: float = float(os.getenv("OUT_GROUP_RATE", str(20 / 60)))
+OUT_GROUP_BURST: float = float(os.getenv("OUT_GROUP_BURST", "3"))
+
+# ---- Broadcast ----
+# Telegram allows ~30 messages/s per bot; stay a bit below it.
+BROADCAST_RATE: float = float(os.getenv("BROADCAST_RATE", "25"))
+BROADCAST_WORKERS: int = int(os.getenv("BROADCAST_WORKERS", "10"))
+BROADCAST_CHUNK_SIZE: int = int(os.getenv("BROADCAST_CHUNK_SIZE", "500"))
+BROADCAST_STATUS_INTERVAL: float = float(os.getenv("BROADCAST_STATUS_INTERVAL", "5"))
+# Progress is saved after this many recipients (at most this many are re-sent after a crash)
+BROADCAST_CHECKPOINT_EVERY: int = int(os.getenv("BROADCAST_CHECKPOINT_EVERY", "50"))
+
+# ---- FSM storage (SQLite) ----
+# States unused for FSM_STATE_TTL seconds expire. Writes are flushed every
+# FSM_FLUSH_INTERVAL seconds (or earlier once FSM_FLUSH_THRESHOLD keys changed).
+FSM_STATE_TTL: float = float(os.getenv("FSM_STATE_TTL", str(2 * 24 * 3600)))
+FSM_FLUSH_INTERVAL: float = float(os.getenv("FSM_FLUSH_INTERVAL", "1"))
+FSM_FLUSH_THRESHOLD: int = int(os.getenv("FSM_FLUSH_THRESHOLD", "200"))
+FSM_SWEEP_INTERVAL: float = float(os.getenv("FSM_SWEEP_INTERVAL", "600"))
+FSM_CACHE_IDLE: float = float(os.getenv("FSM_CACHE_IDLE", "1800"))
+
+# ---- Current user context (per-update middleware) ----
+# Users whose (id, name, username) are kept in memory (LRU)
+USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "100000"))
+# New/renamed users are upserted in batches: one transaction per
+# USER_UPSERT_WINDOW seconds, or earlier once USER_UPSERT_BATCH users wait.
+USER_UPSERT_WINDOW: float = float(os.getenv("USER_UPSERT_WINDOW", "0.05"))
+USER_UPSERT_BATCH: int = int(os.getenv("USER_UPSERT_BATCH", "500"))
+# Rows per query when scanning all users (exports, bulk jobs)
+USER_SCAN_CHUNK: int = int(os.getenv("USER_SCAN_CHUNK", "1000"))
+
+# ---- Throttling (per user token bucket) ----
+# RATE = events per second, BURST = how many may arrive back to back.
+THROTTLE_MESSAGE_RATE: float = float(os.getenv("THROTTLE_MESSAGE_RATE", "2"))
+THROTTLE_MESSAGE_BURST: float = float(os.getenv("THROTTLE_MESSAGE_BURST", "3"))
+THROTTLE_CALLBACK_RATE: float = float(os.getenv("THROTTLE_CALLBACK_RATE", "3"))
+THROTTLE_CALLBACK_BURST: float = float(os.getenv("THROTTLE_CALLBACK_BURST", "5"))
+THROTTLE_STORE_SIZE: int = int(os.getenv("THROTTLE_STORE_SIZE", "100000"))
+
+# ---- Forced subscription check cache (seconds) ----
+# Positive results are kept longer; a user who just subscribed should not
+# wait long before a "not subscribed" answer is re-checked.
+SUBSCRIPTION_TTL: float = float(os.getenv("SUBSCRIPTION_TTL", "300"))
+SUBSCRIPTION_NEGATIVE_TTL: float = float(os.getenv("SUBSCRIPTION_NEGATIVE_TTL", "10"))
+SUBSCRIPTION_CACHE_SIZE: int = int(os.getenv("SUBSCRIPTION_CACHE_SIZE", "50000"))
+
+# ---- Media file_id cache ----
+# Chat that receives the startup upload of IMAGES (default: first admin, 0 = off)
+_media_warmup_raw = os.getenv("MEDIA_WARMUP_CHAT_ID", "")
+MEDIA_WARMUP_CHAT_ID: int = (
+    int(_media_warmup_raw) if _media_warmup_raw else (ADMIN_IDS[0] if ADMIN_IDS else 0)
+)
+
+# Identical media failures within this window (seconds) become one admin alert
+MEDIA_ALERT_WINDOW: float = float(os.getenv("MEDIA_ALERT_WINDOW", "60"))
+
+# ---- VIP expiry sweeper ----
+# How often (seconds) overdue VIPs are revoked in the database
+VIP_SWEEP_INTERVAL: float = float(os.getenv("VIP_SWEEP_INTERVAL", "300"))
+
 # ---- VIP payment card number (admin sets this) ----
 VIP_CARD_NUMBER: str = os.getenv("VIP_CARD_NUMBER", "8600 0000 0000 0000")
 
@@ -1,17 +1,35 @@
 """
 database.py - Database initialization and connection management.
-Creates all tables on startup using aiosqlite.
+Schema changes live in migrations.py and are applied on startup.
+One writer connection is used for all writes; SELECTs go through a small
+pool of read-only WAL connections so they do not queue behind commits.
 """
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 import aiosqlite
 import os
-from config import DB_PATH
+from config import DB_PATH, DB_READ_POOL_SIZE, DB_BUSY_TIMEOUT
 
 
 class Database:
-    """Manages SQLite database connection and schema creation."""
+    """Manages SQLite database connections and schema creation."""
 
     _connection: aiosqlite.Connection | None = None
+    _write_lock = asyncio.Lock()
+
+    # True when the local sqlite has FTS5 and anime_fts is ready
+    has_fts5: bool = False
+
+    _readers: asyncio.Queue | None = None
+    _reader_connections: list[aiosqlite.Connection] = []
+    _pool_lock = asyncio.Lock()
+
+    # Read pool metrics (queue wait time in seconds)
+    _read_stats: dict = {"acquired": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0}
 
     @classmethod
     async def connect(cls) -> aiosqlite.Connection:
@@ -23,181 +41,114 @@ class Database:
             cls._connection.row_factory = aiosqlite.Row
             await cls._connection.execute("PRAGMA journal_mode=WAL;")
             await cls._connection.execute("PRAGMA foreign_keys=ON;")
+            # Other worker processes may hold the write lock briefly
+            await cls._connection.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT};")
         return cls._connection
 
+    @classmethod
+    async def _open_reader(cls) -> aiosqlite.Connection:
+        """Open one read-only connection for the pool."""
+        conn = await aiosqlite.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute("PRAGMA query_only=ON;")
+        await conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT};")
+        return conn
+
+    @classmethod
+    async def _get_read_pool(cls) -> asyncio.Queue | None:
+        """Lazily create the read-only connection pool."""
+        if cls._readers is None and DB_READ_POOL_SIZE > 0:
+            async with cls._pool_lock:
+                if cls._readers is None:
+                    # The writer creates the file and switches it to WAL first
+                    await cls.connect()
+                    pool: asyncio.Queue = asyncio.Queue()
+                    for _ in range(DB_READ_POOL_SIZE):
+                        conn = await cls._open_reader()
+                        cls._reader_connections.append(conn)
+                        pool.put_nowait(conn)
+                    cls._readers = pool
+        return cls._readers
+
+    @classmethod
+    @asynccontextmanager
+    async def read(cls) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection from the pool (for SELECT queries)."""
+        pool = await cls._get_read_pool()
+        if pool is None:
+            # Pool disabled (DB_READ_POOL_SIZE=0) - use the writer connection
+            yield await cls.connect()
+            return
+
+        started = time.perf_counter()
+        conn = await pool.get()
+        waited = time.perf_counter() - started
+
+        stats = cls._read_stats
+        stats["acquired"] += 1
+        if waited > 0.001:
+            stats["waited"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+        try:
+            yield conn
+        finally:
+            pool.put_nowait(conn)
+
+    @classmethod
+    @asynccontextmanager
+    async def write(cls) -> AsyncIterator[aiosqlite.Connection]:
+        """Run statements on the writer connection as one committed transaction."""
+        db = await cls.connect()
+        async with cls._write_lock:
+            try:
+                # Take the database write lock up front: a deferred transaction
+                # that reads first can fail with SQLITE_BUSY when another
+                # process commits in between, and busy_timeout does not retry it
+                if not db.in_transaction:
+                    await db.execute("BEGIN IMMEDIATE")
+                yield db
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """Return read pool metrics."""
+        stats = cls._read_stats
+        acquired = stats["acquired"]
+        return {
+            "size": len(cls._reader_connections),
+            "available": cls._readers.qsize() if cls._readers is not None else 0,
+            "acquired": acquired,
+            "waited": stats["waited"],
+            "wait_avg_ms": (stats["wait_total"] / acquired * 1000) if acquired else 0.0,
+            "wait_max_ms": stats["wait_max"] * 1000,
+        }
+
     @classmethod
     async def close(cls) -> None:
-        """Close the database connection."""
+        """Close the writer and all pooled read connections."""
+        for conn in cls._reader_connections:
+            await conn.close()
+        cls._reader_connections = []
+        cls._readers = None
+
         if cls._connection is not None:
             await cls._connection.close()
             cls._connection = None
 
     @classmethod
     async def create_tables(cls) -> None:
-        """Create all tables if they do not exist."""
-        db = await cls.connect()
+        """Bring the schema up to date (see migrations.py).
 
-        await db.executescript("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                telegram_id INTEGER UNIQUE NOT NULL,
-                full_name TEXT NOT NULL DEFAULT '',
-                username TEXT DEFAULT '',
-                is_vip INTEGER NOT NULL DEFAULT 0,
-                vip_expire_date TEXT DEFAULT NULL,
-                joined_date TEXT NOT NULL DEFAULT (datetime('now'))
-            );
-
-            CREATE TABLE IF NOT EXISTS anime (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                code TEXT UNIQUE NOT NULL,
-                description TEXT DEFAULT '',
-                genre TEXT DEFAULT '',
-                season_count INTEGER NOT NULL DEFAULT 1,
-                total_episodes INTEGER NOT NULL DEFAULT 0,
-                poster_file_id TEXT DEFAULT '',
-                poster_url TEXT DEFAULT '',
-                status TEXT DEFAULT 'Tugallangan',
-                translator TEXT DEFAULT 'AniBro',
-                is_vip INTEGER NOT NULL DEFAULT 0,
-                views INTEGER NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL DEFAULT (datetime('now'))
-            );
-
-            CREATE TABLE IF NOT EXISTS episodes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                anime_id INTEGER NOT NULL,
-                season_number INTEGER NOT NULL DEFAULT 1,
-                episode_number INTEGER NOT NULL,
-                title TEXT DEFAULT '',
-                video_file_id TEXT NOT NULL,
-                is_vip INTEGER NOT NULL DEFAULT 0,
-                views INTEGER NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS favorites (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                anime_id INTEGER NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE,
-                UNIQUE(user_id, anime_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS comments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                anime_id INTEGER NOT NULL,
-                comment_text TEXT NOT NULL,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS channels (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                channel_id TEXT UNIQUE NOT NULL,
-                channel_name TEXT NOT NULL DEFAULT '',
-                channel_link TEXT NOT NULL DEFAULT '',
-                added_at TEXT NOT NULL DEFAULT (datetime('now'))
-            );
-
-            CREATE TABLE IF NOT EXISTS vip_plans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                price INTEGER NOT NULL,
-                duration_days INTEGER NOT NULL,
-                card_number TEXT DEFAULT ''
-            );
-
-            CREATE TABLE IF NOT EXISTS admins (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                telegram_id INTEGER UNIQUE NOT NULL,
-                full_name TEXT DEFAULT '',
-                role TEXT DEFAULT 'admin',
-                added_at TEXT NOT NULL DEFAULT (datetime('now'))
-            );
-
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS shorts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                anime_id INTEGER NOT NULL,
-                short_video_file_id TEXT NOT NULL,
-                views INTEGER NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS short_views (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                short_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                viewed_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (short_id) REFERENCES shorts(id) ON DELETE CASCADE,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                UNIQUE(short_id, user_id)
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_anime_code ON anime(code);
-            CREATE INDEX IF NOT EXISTS idx_anime_genre ON anime(genre);
-            CREATE INDEX IF NOT EXISTS idx_anime_views ON anime(views DESC);
-            CREATE INDEX IF NOT EXISTS idx_anime_created ON anime(created_at DESC);
-            CREATE INDEX IF NOT EXISTS idx_episodes_anime ON episodes(anime_id);
-            CREATE INDEX IF NOT EXISTS idx_episodes_views ON episodes(views DESC);
-            CREATE INDEX IF NOT EXISTS idx_favorites_user ON favorites(user_id);
-            CREATE INDEX IF NOT EXISTS idx_comments_anime ON comments(anime_id);
-            CREATE INDEX IF NOT EXISTS idx_shorts_anime ON shorts(anime_id);
-            CREATE INDEX IF NOT EXISTS idx_shorts_views ON shorts(views DESC);
-            CREATE INDEX IF NOT EXISTS idx_short_views_short ON short_views(short_id);
-            CREATE INDEX IF NOT EXISTS idx_users_joined ON users(joined_date DESC);
-        """)
-
-
-        await db.commit()
-        await cls.migrate_database()
+        On an up-to-date database this is a single version read, so every
+        process may call it; it also detects whether anime_fts exists.
+        """
+        from migrations import migrate
 
-    @classmethod
-    async def migrate_database(cls) -> None:
-        """Apply schema migrations (e.g., adding missing columns)."""
-        db = await cls.connect()
-        
-        # Add poster_url to anime table if it doesn't exist
-        try:
-            # Check if column exists by trying to select it
-            await db.execute("SELECT poster_url FROM anime LIMIT 1")
-        except Exception:
-            # Column likely doesn't exist, add it
-            print("Migrating: Adding poster_url column to anime table...")
-            await db.execute("ALTER TABLE anime ADD COLUMN poster_url TEXT DEFAULT ''")
-            await db.commit()
-            print("Migration successful: poster_url added.")
-        
-        # Add channel_name to channels table if it doesn't exist
-        try:
-            await db.execute("SELECT channel_name FROM channels LIMIT 1")
-        except Exception:
-            print("Migrating: Adding channel_name column to channels table...")
-            await db.execute("ALTER TABLE channels ADD COLUMN channel_name TEXT DEFAULT ''")
-            await db.commit()
-            print("Migration successful: channel_name added.")
-        
-        # Add status and translator to anime table if they don't exist
-        try:
-            await db.execute("SELECT status FROM anime LIMIT 1")
-        except Exception:
-            print("Migrating: Adding status and translator columns to anime table...")
-            await db.execute("ALTER TABLE anime ADD COLUMN status TEXT DEFAULT 'Tugallangan'")
-            await db.execute("ALTER TABLE anime ADD COLUMN translator TEXT DEFAULT 'AniBro'")
-            await db.commit()
-            print("Migration successful: status and translator added.")
-        
-        # You can add more migrations here as the schema evolves
+        _, cls.has_fts5 = await migrate()
 
 
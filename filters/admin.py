@@ -7,8 +7,16 @@ from aiogram.filters import Filter
 from models.admin import AdminModel
 
 class IsAdminFilter(Filter):
-    """Checks if a user is an admin (either in config or database)."""
-    async def __call__(self, event: types.Message | types.CallbackQuery) -> bool:
+    """Checks if a user is an admin (either in config or database).
+
+    MaintenanceMiddleware resolves admin status once per update and passes it
+    as data["is_admin"]; the model is only consulted when it is missing.
+    """
+    async def __call__(
+        self, event: types.Message | types.CallbackQuery, is_admin: bool | None = None
+    ) -> bool:
+        if is_admin is not None:
+            return is_admin
         return await AdminModel.is_admin(event.from_user.id)
 
 # Shorthand for simple usage
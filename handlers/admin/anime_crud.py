@@ -15,6 +15,7 @@ from models.anime import AnimeModel
 from models.admin import AdminModel
 from keyboards.reply import cancel_keyboard, skip_keyboard, vip_choice_keyboard, admin_main_menu
 from keyboards.inline import anime_view_keyboard, anime_select_keyboard, admin_fix_media_keyboard
+from keyboards.callbacks import AnimeSelectCallback, FixAnimePosterCallback
 
 from filters.admin import is_admin
 
@@ -263,7 +264,7 @@ async def add_anime_is_vip(message: Message, state: FSMContext) -> None:
 @router.message(F.text == "📝 Anime tahrirlash", is_admin)
 async def edit_anime_start(message: Message, state: FSMContext) -> None:
     """Anime tahrirlash - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("\u25B8 Hozircha animelar mavjud emas.")
         return
@@ -274,10 +275,10 @@ async def edit_anime_start(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("edit_anime_select:"))
-async def edit_anime_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "edit_anime_select"))
+async def edit_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback, state: FSMContext) -> None:
     """Tahrirlash uchun anime tanlangan."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     anime = await AnimeModel.get_by_id(anime_id)
     if not anime:
         await callback.answer("Anime topilmadi.")
@@ -367,7 +368,7 @@ async def edit_anime_new_value(message: Message, state: FSMContext) -> None:
 @router.message(F.text == "❌ Anime o'chirish", is_admin)
 async def delete_anime_start(message: Message) -> None:
     """Anime o'chirish - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("\u25B8 Hozircha animelar mavjud emas.")
         return
@@ -377,14 +378,14 @@ async def delete_anime_start(message: Message) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("delete_anime_confirm:"))
-async def delete_anime_confirmed(callback: CallbackQuery) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "delete_anime_confirm"))
+async def delete_anime_confirmed(callback: CallbackQuery, callback_data: AnimeSelectCallback) -> None:
     """Animeni o'chirish tasdiqlash."""
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Sizda ruxsat yo'q.")
         return
 
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     anime = await AnimeModel.get_by_id(anime_id)
 
     if not anime:
@@ -403,10 +404,10 @@ async def delete_anime_confirmed(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("fix_anime_poster:"), is_admin)
-async def fix_anime_poster_start(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(FixAnimePosterCallback.filter(), is_admin)
+async def fix_anime_poster_start(callback: CallbackQuery, callback_data: FixAnimePosterCallback, state: FSMContext) -> None:
     """Quick fix for broken anime poster."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.update_data(edit_anime_id=anime_id, edit_field="poster_file_id")
     await state.set_state(EditAnimeStates.new_value)
     
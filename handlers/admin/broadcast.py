@@ -2,18 +2,19 @@
 handlers/admin/broadcast.py - Barcha foydalanuvchilarga xabar yuborish (Broadcast).
 """
 
-import asyncio
 import logging
 from aiogram import Router, F, Bot
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 
-from models.user import UserModel
+from models.broadcast import BroadcastModel
+from services.broadcast_service import BroadcastEngine
 from models.admin import AdminModel
 from utils.images import IMAGES
-from keyboards.reply import cancel_keyboard, admin_main_menu, confirm_keyboard
+from keyboards.reply import cancel_keyboard, confirm_keyboard
+from keyboards.inline import broadcast_control_keyboard
+from keyboards.callbacks import BroadcastCallback
 from filters.admin import is_admin
 
 
@@ -90,64 +91,68 @@ async def broadcast_process(message: Message, state: FSMContext, bot: Bot) -> No
     message_id = data['broadcast_message_id']
     from_chat_id = data['from_chat_id']
     
-    users = await UserModel.get_all_users()
-    total = len(users)
-    sent = 0
-    blocked = 0
-    errors = 0
-    
-    status_msg = await message.answer(
-        f"⏳ <b>Yuborish boshlandi...</b>\n"
-        f"Jami: {total} foydalanuvchi"
-    )
-    
-    for i, user in enumerate(users):
-        try:
-            await bot.copy_message(
-                chat_id=user['telegram_id'],
-                from_chat_id=from_chat_id,
-                message_id=message_id
-            )
-            sent += 1
-        except TelegramForbiddenError:
-            blocked += 1
-        except TelegramRetryAfter as e:
-            await asyncio.sleep(e.retry_after)
-            # Retry
-            try:
-                await bot.copy_message(
-                    chat_id=user['telegram_id'],
-                    from_chat_id=from_chat_id,
-                    message_id=message_id
-                )
-                sent += 1
-            except Exception:
-                errors += 1
-        except Exception as e:
-            logger.error(f"Broadcast error to {user['telegram_id']}: {e}")
-            errors += 1
-            
-        # Update status every 50 users
-        if (i + 1) % 50 == 0:
-            try:
-                await status_msg.edit_text(
-                    f"⏳ <b>Yuborish davom etmoqda... ({i+1}/{total})</b>\n\n"
-                    f"✅ Yuborildi: {sent}\n"
-                    f"🚫 Bloklagan: {blocked}\n"
-                    f"❌ Xatolik: {errors}"
-                )
-            except Exception:
-                pass
-        
-        # Anti-flood delay
-        await asyncio.sleep(0.05)
-
-    await status_msg.answer(
-        f"🏁 <b>Yuborish yakunlandi!</b>\n━━━━━━━━━━━━━━━━━━\n\n"
-        f"✅ <b>Yuborildi:</b> {sent}\n"
-        f"🚫 <b>Bloklagan:</b> {blocked}\n"
-        f"❌ <b>Xatolik:</b> {errors}\n\n"
-        f"Jami: {total}",
-        reply_markup=admin_main_menu()
-    )
-    await status_msg.delete()
+    # Yuborish fon vazifasida ishlaydi - admin handleri bloklanmaydi
+    await BroadcastEngine.create(bot, from_chat_id, message_id, message.chat.id)
+
+
+@router.callback_query(BroadcastCallback.filter(F.action == "pause"), is_admin)
+async def broadcast_pause(callback: CallbackQuery, callback_data: BroadcastCallback) -> None:
+    """Broadcastni pauza qilish."""
+    job_id = callback_data.job_id
+    if await BroadcastEngine.pause(job_id):
+        await callback.answer("⏸ Pauza qilindi")
+    else:
+        await callback.answer("⚠️ Bu job ishlamayapti - pauza qilib bo'lmaydi.", show_alert=True)
+
+
+@router.callback_query(BroadcastCallback.filter(F.action == "resume"), is_admin)
+async def broadcast_resume(callback: CallbackQuery, callback_data: BroadcastCallback, bot: Bot) -> None:
+    """Pauza qilingan broadcastni davom ettirish."""
+    job_id = callback_data.job_id
+    if await BroadcastEngine.resume(bot, job_id):
+        await callback.message.edit_reply_markup(
+            reply_markup=broadcast_control_keyboard(job_id, BroadcastModel.RUNNING)
+        )
+        await callback.answer("▶️ Davom ettirilmoqda")
+    else:
+        await callback.answer("⚠️ Bu jobni davom ettirib bo'lmaydi.", show_alert=True)
+
+
+@router.callback_query(BroadcastCallback.filter(F.action == "cancel"), is_admin)
+async def broadcast_cancel(callback: CallbackQuery, callback_data: BroadcastCallback) -> None:
+    """Broadcastni bekor qilish."""
+    job_id = callback_data.job_id
+    job = await BroadcastModel.get(job_id)
+    if not job or job["status"] in (BroadcastModel.CANCELLED, BroadcastModel.FINISHED):
+        await callback.answer("⚠️ Bu job allaqachon yakunlangan.", show_alert=True)
+        return
+    was_running = job["status"] == BroadcastModel.RUNNING
+    await BroadcastEngine.cancel(job_id)
+    if not was_running:
+        # Ishlayotgan engine holat xabarini o'zi yangilaydi
+        await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer("✖ Bekor qilindi")
+
+
+@router.message(F.text == "/broadcasts", is_admin)
+async def broadcast_jobs_list(message: Message) -> None:
+    """Oxirgi broadcast joblari va ularning natijalari."""
+    jobs = await BroadcastModel.get_recent(10)
+    if not jobs:
+        await message.answer("📭 Hali broadcast yuborilmagan.")
+        return
+
+    icons = {
+        BroadcastModel.RUNNING: "⏳",
+        BroadcastModel.PAUSED: "⏸",
+        BroadcastModel.CANCELLED: "✖",
+        BroadcastModel.FINISHED: "🏁",
+    }
+    text = "📤 <b>OXIRGI BROADCASTLAR</b>\n━━━━━━━━━━━━━━━━━━\n\n"
+    for job in jobs:
+        processed = job["sent"] + job["blocked"] + job["errors"]
+        text += (
+            f"{icons.get(job['status'], '•')} <b>#{job['id']}</b> {job['created_at']}\n"
+            f"   {processed}/{job['total']} | ✅ {job['sent']} 🚫 {job['blocked']} ❌ {job['errors']}\n"
+        )
+    await message.answer(text)
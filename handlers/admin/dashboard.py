@@ -18,6 +18,7 @@ from keyboards.inline import (
     admin_manage_keyboard,
     admin_action_keyboard
 )
+from keyboards.callbacks import DeleteAdminCallback, SetSettingCallback, ViewAdminCallback
 from keyboards.reply import cancel_keyboard, admin_main_menu
 from loader import bot
 from filters.admin import is_admin
@@ -97,9 +98,9 @@ async def toggle_maintenance_handler(callback: CallbackQuery) -> None:
     await SettingsModel.set("maintenance_mode", new_val)
     await dashboard_settings(callback)
 
-@router.callback_query(F.data.startswith("set_setting:"), is_admin)
-async def start_set_setting(callback: CallbackQuery, state: FSMContext) -> None:
-    key = callback.data.split(":")[1]
+@router.callback_query(SetSettingCallback.filter(), is_admin)
+async def start_set_setting(callback: CallbackQuery, callback_data: SetSettingCallback, state: FSMContext) -> None:
+    key = callback_data.key
     await state.update_data(setting_key=key)
     await state.set_state(DashboardStates.waiting_setting_value)
     
@@ -146,9 +147,9 @@ async def dashboard_admins(callback: CallbackQuery) -> None:
     await callback.message.edit_text(text, reply_markup=admin_manage_keyboard(admins))
     await callback.answer()
 
-@router.callback_query(F.data.startswith("view_admin:"), is_admin)
-async def view_admin_handler(callback: CallbackQuery) -> None:
-    admin_id = int(callback.data.split(":")[1])
+@router.callback_query(ViewAdminCallback.filter(), is_admin)
+async def view_admin_handler(callback: CallbackQuery, callback_data: ViewAdminCallback) -> None:
+    admin_id = callback_data.admin_id
     # Dastlabki adminlarni o'chirib bo'lmaydi (configdagilar)
     from config import ADMIN_IDS
     if admin_id in ADMIN_IDS:
@@ -159,9 +160,9 @@ async def view_admin_handler(callback: CallbackQuery) -> None:
     await callback.message.edit_text(text, reply_markup=admin_action_keyboard(admin_id))
     await callback.answer()
 
-@router.callback_query(F.data.startswith("delete_admin:"), is_admin)
-async def delete_admin_dashboard(callback: CallbackQuery) -> None:
-    admin_id = int(callback.data.split(":")[1])
+@router.callback_query(DeleteAdminCallback.filter(), is_admin)
+async def delete_admin_dashboard(callback: CallbackQuery, callback_data: DeleteAdminCallback) -> None:
+    admin_id = callback_data.admin_id
     success = await AdminModel.remove_admin(admin_id)
     if success:
         await callback.answer("✅ Admin muvaffaqiyatli o'chirildi.", show_alert=True)
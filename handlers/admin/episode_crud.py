@@ -18,6 +18,7 @@ from models.admin import AdminModel
 from filters.admin import is_admin
 from keyboards.reply import cancel_keyboard, vip_choice_keyboard, admin_main_menu
 from keyboards.inline import anime_select_keyboard, episodes_keyboard, admin_fix_media_keyboard
+from keyboards.callbacks import AnimeSelectCallback, DeleteEpisodeCallback, FixEpisodeVideoCallback
 
 logger = logging.getLogger(__name__)
 router = Router(name="admin_episode_crud")
@@ -44,7 +45,7 @@ async def smart_add_video(message: Message, state: FSMContext) -> None:
     await state.update_data(video_file_id=file_id)
     await state.set_state(SmartAddEpisodeStates.select_anime)
     
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     await message.answer(
         "<b>🎬 Qism qo'shish (Smart Add)</b>\n"
         "━━━━━━━━━━━━━━━━━━\n\n"
@@ -53,10 +54,10 @@ async def smart_add_video(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("smart_add_anime:"), is_admin)
-async def smart_add_anime_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "smart_add_anime"), is_admin)
+async def smart_add_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback, state: FSMContext) -> None:
     """Smart add uchun anime tanlandi."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.update_data(anime_id=anime_id)
     await state.set_state(SmartAddEpisodeStates.episode_number)
     
@@ -138,7 +139,7 @@ async def smart_add_finalize(message: Message, state: FSMContext) -> None:
 @router.message(F.text == "➕ Qism qo'shish", is_admin)
 async def add_episode_start(message: Message, state: FSMContext) -> None:
     """Qism qo'shish - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("⚠️ Avval anime qo'shing.")
         return
@@ -151,10 +152,10 @@ async def add_episode_start(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("add_ep_anime:"))
-async def add_episode_anime_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "add_ep_anime"))
+async def add_episode_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback, state: FSMContext) -> None:
     """Qism qo'shish uchun anime tanlangan."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.update_data(anime_id=anime_id, season_number=1) # Default season 1
     await state.set_state(AddEpisodeStates.episode_number)
 
@@ -255,7 +256,7 @@ async def add_episode_is_vip(message: Message, state: FSMContext) -> None:
 @router.message(F.text == "📝 Qism tahrirlash", is_admin)
 async def edit_episode_start(message: Message, state: FSMContext) -> None:
     """Qism tahrirlash - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("\u25B8 Hozircha animelar mavjud emas.")
         return
@@ -266,10 +267,10 @@ async def edit_episode_start(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("edit_ep_anime:"))
-async def edit_episode_anime_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "edit_ep_anime"))
+async def edit_episode_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback, state: FSMContext) -> None:
     """Tahrirlanadigan qism uchun anime tanlangan."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     episodes = await EpisodeModel.get_all_for_anime(anime_id)
 
     if not episodes:
@@ -370,7 +371,7 @@ async def edit_episode_save(message: Message, state: FSMContext) -> None:
 @router.message(F.text == "❌ Qism o'chirish", is_admin)
 async def delete_episode_start(message: Message) -> None:
     """Qism o'chirish - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("\u25B8 Hozircha animelar mavjud emas.")
         return
@@ -380,14 +381,14 @@ async def delete_episode_start(message: Message) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("del_ep_anime:"))
-async def delete_episode_anime_selected(callback: CallbackQuery) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "del_ep_anime"))
+async def delete_episode_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback) -> None:
     """O'chirish uchun anime tanlangan - qismlar ro'yxati."""
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Ruxsat yo'q.")
         return
 
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     episodes = await EpisodeModel.get_all_for_anime(anime_id)
 
     if not episodes:
@@ -400,7 +401,7 @@ async def delete_episode_anime_selected(callback: CallbackQuery) -> None:
     for ep in episodes:
         builder.button(
             text=f"{ep['episode_number']}-qism",
-            callback_data=f"del_ep_confirm:{ep['id']}",
+            callback_data=DeleteEpisodeCallback(episode_id=ep["id"]),
         )
     builder.adjust(3)
 
@@ -411,14 +412,14 @@ async def delete_episode_anime_selected(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("del_ep_confirm:"))
-async def delete_episode_confirmed(callback: CallbackQuery) -> None:
+@router.callback_query(DeleteEpisodeCallback.filter())
+async def delete_episode_confirmed(callback: CallbackQuery, callback_data: DeleteEpisodeCallback) -> None:
     """Qismni o'chirish."""
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Ruxsat yo'q.")
         return
 
-    episode_id = int(callback.data.split(":")[1])
+    episode_id = callback_data.episode_id
     episode = await EpisodeModel.get_by_id(episode_id)
 
     if not episode:
@@ -437,10 +438,10 @@ async def delete_episode_confirmed(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("fix_ep_video:"), is_admin)
-async def fix_episode_video_start(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(FixEpisodeVideoCallback.filter(), is_admin)
+async def fix_episode_video_start(callback: CallbackQuery, callback_data: FixEpisodeVideoCallback, state: FSMContext) -> None:
     """Quick fix for broken episode video."""
-    episode_id = int(callback.data.split(":")[1])
+    episode_id = callback_data.episode_id
     # Hozircha episode_crud da faqat text orqali yangilash bor
     # EditEpisodeStates ga video kiritish holatini qo'shishimiz kerak yoki new_value ga video ham qabul qiladigan qilishimiz kerak
     # Biz EditEpisodeStates ga video holatini qo'shamiz
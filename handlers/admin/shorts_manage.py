@@ -16,6 +16,13 @@ from models.shorts import ShortsModel
 from models.admin import AdminModel
 from keyboards.reply import cancel_keyboard, admin_main_menu
 from keyboards.inline import anime_select_keyboard, shorts_manage_keyboard, short_action_keyboard
+from keyboards.callbacks import (
+    AnimeSelectCallback,
+    DeleteShortCallback,
+    EditShortVideoCallback,
+    FixShortCallback,
+    ManageShortCallback,
+)
 from filters.admin import is_admin
 
 
@@ -31,7 +38,7 @@ router = Router(name="admin_shorts")
 @router.callback_query(F.data == "admin_manage_shorts", is_admin)
 async def manage_shorts_start(event: Message | CallbackQuery) -> None:
     """Shorts boshqarish menyusi."""
-    shorts = await ShortsModel.get_all(limit=100)
+    shorts = await ShortsModel.get_summaries(limit=100)
     text = (
         "<b>🎬 Shorts Boshqarish</b>\n"
         "━━━━━━━━━━━━━━━━━━\n\n"
@@ -58,7 +65,7 @@ async def add_short_direct(callback: CallbackQuery, state: FSMContext) -> None:
 async def add_short_start(message: Message, state: FSMContext) -> None:
 
     """Short qo'shish - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("\u25B8 Avval anime qo'shing.")
         return
@@ -69,10 +76,10 @@ async def add_short_start(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("add_short_anime:"))
-async def add_short_anime_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "add_short_anime"))
+async def add_short_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback, state: FSMContext) -> None:
     """Short uchun anime tanlangan."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.update_data(anime_id=anime_id)
     await state.set_state(AddShortsStates.video)
 
@@ -121,10 +128,10 @@ async def add_short_video_invalid(message: Message, state: FSMContext) -> None:
 # SHORTS TAHRIRLASH VA O'CHIRISH
 # ==============================================================
 
-@router.callback_query(F.data.startswith("manage_short:"), is_admin)
-async def manage_single_short(callback: CallbackQuery) -> None:
+@router.callback_query(ManageShortCallback.filter(), is_admin)
+async def manage_single_short(callback: CallbackQuery, callback_data: ManageShortCallback) -> None:
     """Bitta shortni boshqarish."""
-    short_id = int(callback.data.split(":")[1])
+    short_id = callback_data.short_id
     short = await ShortsModel.get_by_id(short_id)
     if not short:
         await callback.answer("Short topilmadi.")
@@ -142,11 +149,11 @@ async def manage_single_short(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("edit_short_video:"), is_admin)
-@router.callback_query(F.data.startswith("fix_short:"), is_admin)
-async def edit_short_video_start(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(EditShortVideoCallback.filter(), is_admin)
+@router.callback_query(FixShortCallback.filter(), is_admin)
+async def edit_short_video_start(callback: CallbackQuery, callback_data: EditShortVideoCallback | FixShortCallback, state: FSMContext) -> None:
     """Short videosini yangilash boshlash."""
-    short_id = int(callback.data.split(":")[1])
+    short_id = callback_data.short_id
     await state.update_data(edit_short_id=short_id)
     await state.set_state(EditShortsStates.waiting_video)
     
@@ -170,12 +177,11 @@ async def process_edit_short_video(message: Message, state: FSMContext) -> None:
         # ShortsModel da update metodi yo'q ekan, hozircha delete+create qilsak bo'ladi
         # Yoki shunchaki SQL execute qilsak bo'ladi. Direct SQL dan foydalanamiz (mukammallik uchun modelga metod qo'shamiz keyinroq)
         from database import Database
-        db = await Database.connect()
-        await db.execute(
-            "UPDATE shorts SET short_video_file_id = ? WHERE id = ?",
-            (file_id, short_id)
-        )
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute(
+                "UPDATE shorts SET short_video_file_id = ? WHERE id = ?",
+                (file_id, short_id)
+            )
         
         await message.answer(
             f"✅ <b>Short video muvaffaqiyatli yangilandi!</b> (ID: {short_id})",
@@ -186,18 +192,14 @@ async def process_edit_short_video(message: Message, state: FSMContext) -> None:
         await message.answer(f"✖ <b>Xatolik:</b> {e}", reply_markup=admin_main_menu())
 
 
-@router.callback_query(F.data.startswith("delete_short_confirm:"), is_admin)
-async def delete_short_process(callback: CallbackQuery) -> None:
+@router.callback_query(DeleteShortCallback.filter(), is_admin)
+async def delete_short_process(callback: CallbackQuery, callback_data: DeleteShortCallback) -> None:
     """Shortni o'chirish."""
-    short_id = int(callback.data.split(":")[1])
+    short_id = callback_data.short_id
     try:
-        # ShortsModel da delete ham yo'q ekan, qo'shib ketamiz
-        from database import Database
-        db = await Database.connect()
-        await db.execute("DELETE FROM shorts WHERE id = ?", (short_id,))
-        await db.execute("DELETE FROM shorts_views WHERE short_id = ?", (short_id,))
-        await db.commit()
-        
+        # short_views yozuvlari ON DELETE CASCADE orqali o'chadi
+        await ShortsModel.delete(short_id)
+
         await callback.answer("✅ Short o'chirildi.")
         await manage_shorts_start(callback)
     except Exception as e:
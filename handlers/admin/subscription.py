@@ -9,6 +9,7 @@ from filters.admin import is_admin
 from models.channel import ChannelModel
 from keyboards.reply import cancel_keyboard, admin_main_menu
 from keyboards.inline import admin_channels_keyboard
+from keyboards.callbacks import DeleteChannelCallback
 
 logger = logging.getLogger(__name__)
 router = Router(name="admin_subscription")
@@ -122,10 +123,10 @@ async def remove_channel_start(message: Message) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("del_channel:"), is_admin)
-async def remove_channel_callback(callback: CallbackQuery) -> None:
+@router.callback_query(DeleteChannelCallback.filter(), is_admin)
+async def remove_channel_callback(callback: CallbackQuery, callback_data: DeleteChannelCallback) -> None:
     """Kanalni o'chirish callbacki."""
-    channel_id = callback.data.split(":")[1]
+    channel_id = callback_data.channel_id
     
     try:
         await ChannelModel.remove(channel_id)
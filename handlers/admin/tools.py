@@ -11,6 +11,7 @@ from database import Database
 from config import DB_PATH, LOG_FILE
 from models.admin import AdminModel
 from filters.admin import is_admin
+from middlewares.throttling import ThrottlingMiddleware
 
 
 logger = logging.getLogger(__name__)
@@ -28,20 +29,25 @@ async def admin_tools_menu(message: Message):
 async def check_database(message: Message):
     """DB holatini tekshirish."""
     try:
-        db = await Database.connect()
-        # Integrity check
-        cursor = await db.execute("PRAGMA integrity_check")
-        row = await cursor.fetchone()
+        async with Database.read() as db:
+            # Integrity check
+            cursor = await db.execute("PRAGMA integrity_check")
+            row = await cursor.fetchone()
         integrity = row[0] if row else "Unknown"
         
         db_size = os.path.getsize(DB_PATH) / 1024 # KB
+        pool = Database.pool_stats()
         
         await message.reply(
             "✅ <b>Ma'lumotlar bazasi:</b>\n\n"
             f"▸ Holat: Ishlamoqda\n"
             f"▸ Integrity: <code>{integrity}</code>\n"
             f"▸ Fayl: <code>{DB_PATH}</code>\n"
-            f"▸ Hajm: {db_size:.2f} KB"
+            f"▸ Hajm: {db_size:.2f} KB\n\n"
+            "📚 <b>O'qish pooli:</b>\n"
+            f"▸ Ulanishlar: {pool['available']}/{pool['size']} bo'sh\n"
+            f"▸ So'rovlar: {pool['acquired']} (kutgan: {pool['waited']})\n"
+            f"▸ Kutish: o'rtacha {pool['wait_avg_ms']:.2f} ms, maks {pool['wait_max_ms']:.2f} ms"
         )
 
     except Exception as e:
@@ -62,3 +68,18 @@ async def system_info(message: Message):
     except Exception as e:
         await message.reply(f"❌ <b>Xatolik:</b>\n<code>{e}</code>")
 
+
+
+@router.message(F.text == "/throttle_stats", is_admin)
+async def throttle_stats(message: Message):
+    """Eng ko'p cheklangan (spam qilayotgan) foydalanuvchilar."""
+    stats = ThrottlingMiddleware.dropped_stats(10)
+    if not stats:
+        await message.answer("✅ Cheklangan foydalanuvchilar yo'q.")
+        return
+
+    text = "🚦 <b>Eng ko'p cheklanganlar:</b>\n\n"
+    for user_id, counters in stats:
+        details = ", ".join(f"{kind}: {count}" for kind, count in counters.items())
+        text += f"▸ <code>{user_id}</code> — {details}\n"
+    await message.answer(text)
@@ -13,6 +13,7 @@ from models.vip import VipModel
 from models.admin import AdminModel
 from services.vip_service import VipService
 from keyboards.reply import cancel_keyboard, admin_main_menu, vip_choice_keyboard
+from keyboards.callbacks import VipApproveCallback, VipRejectCallback
 from filters.admin import is_admin
 from loader import bot
 
@@ -143,14 +144,13 @@ async def delete_plan(message: Message) -> None:
 # VIP TO'LOVNI TASDIQLASH / RAD ETISH (CALLBACK)
 # ==============================================================
 
-@router.callback_query(F.data.startswith("vip_approve:"))
-async def approve_vip_payment(callback: CallbackQuery) -> None:
+@router.callback_query(VipApproveCallback.filter())
+async def approve_vip_payment(callback: CallbackQuery, callback_data: VipApproveCallback) -> None:
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Ruxsat yo'q.")
         return
-    parts = callback.data.split(":")
-    user_tg_id = int(parts[1])
-    plan_id = int(parts[2])
+    user_tg_id = callback_data.user_tg_id
+    plan_id = callback_data.plan_id
     result_text = await VipService.activate_vip(user_tg_id, plan_id)
     try:
         await bot.send_message(user_tg_id, result_text)
@@ -161,12 +161,12 @@ async def approve_vip_payment(callback: CallbackQuery) -> None:
     )
     await callback.answer("\u2714 Tasdiqlandi!")
 
-@router.callback_query(F.data.startswith("vip_reject:"))
-async def reject_vip_payment(callback: CallbackQuery) -> None:
+@router.callback_query(VipRejectCallback.filter())
+async def reject_vip_payment(callback: CallbackQuery, callback_data: VipRejectCallback) -> None:
     if callback.from_user.id not in ADMIN_IDS:
         await callback.answer("Ruxsat yo'q.")
         return
-    user_tg_id = int(callback.data.split(":")[1])
+    user_tg_id = callback_data.user_tg_id
     try:
         await bot.send_message(
             user_tg_id,
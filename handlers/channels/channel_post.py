@@ -18,7 +18,9 @@ from keyboards.inline import (
     channel_big_post_keyboard,
     channel_post_keyboard,
 )
+from keyboards.callbacks import AnimeSelectCallback
 from services.anime_service import AnimeService
+from services.media_service import MediaService
 from loader import bot
 
 logger = logging.getLogger(__name__)
@@ -30,7 +32,7 @@ async def is_admin(message: Message) -> bool:
 @router.message(F.text == "📢 Kanalga post", is_admin)
 async def channel_post_start(message: Message, state: FSMContext) -> None:
     """Kanalga post - anime tanlash."""
-    anime_list = await AnimeModel.get_all(limit=50)
+    anime_list = await AnimeModel.get_summaries(limit=50)
     if not anime_list:
         await message.answer("▹ Avval anime qo'shing.")
         return
@@ -42,10 +44,10 @@ async def channel_post_start(message: Message, state: FSMContext) -> None:
         reply_markup=anime_select_keyboard(anime_list, "ch_post_anime"),
     )
 
-@router.callback_query(F.data.startswith("ch_post_anime:"))
-async def channel_post_anime_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(AnimeSelectCallback.filter(F.action == "ch_post_anime"))
+async def channel_post_anime_selected(callback: CallbackQuery, callback_data: AnimeSelectCallback, state: FSMContext) -> None:
     """Anime tanlangan - kanal ID/username kiritishni so'rash."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.update_data(post_anime_id=anime_id)
     await state.set_state(ChannelPostStates.enter_channel)
     await callback.message.edit_text(
@@ -94,11 +96,14 @@ async def send_channel_post(message: Message, state: FSMContext) -> None:
             poster = AnimeService.get_poster(anime)
             
             if poster:
-                await bot.send_photo(
-                    chat_id=channel,
-                    photo=poster,
-                    caption=text,
-                    reply_markup=channel_big_post_keyboard(anime_id, bot_username),
+                await MediaService.deliver(
+                    lambda photo: bot.send_photo(
+                        chat_id=channel,
+                        photo=photo,
+                        caption=text,
+                        reply_markup=channel_big_post_keyboard(anime_id, bot_username),
+                    ),
+                    poster, "photo",
                 )
             else:
                 await bot.send_message(
@@ -6,25 +6,26 @@ Emoji va premium dizayn bilan.
 import math
 import logging
 
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from states.comment import CommentStates
 from models.comment import CommentModel
-from models.user import UserModel
+from models.user import UserContext
 from keyboards.reply import cancel_keyboard, user_main_menu
 from keyboards.inline import comments_list_keyboard
+from keyboards.callbacks import CommentCallback, CommentsListCallback
 from config import COMMENTS_PER_PAGE
 
 logger = logging.getLogger(__name__)
 router = Router(name="user_comments")
 
 
-@router.callback_query(F.data.startswith("comment:"))
-async def leave_comment_start(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(CommentCallback.filter())
+async def leave_comment_start(callback: CallbackQuery, callback_data: CommentCallback, state: FSMContext) -> None:
     """Izoh qoldirishni boshlash."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.set_state(CommentStates.waiting_text)
     await state.update_data(comment_anime_id=anime_id)
     
@@ -36,18 +37,17 @@ async def leave_comment_start(callback: CallbackQuery, state: FSMContext) -> Non
 
 
 @router.message(CommentStates.waiting_text)
-async def process_comment_text(message: Message, state: FSMContext) -> None:
+async def process_comment_text(message: Message, state: FSMContext, db_user: UserContext | None) -> None:
     """Izoh matnini saqlash."""
     data = await state.get_data()
     anime_id = data.get("comment_anime_id")
     text = message.text.strip()
     
-    user = await UserModel.get_by_telegram_id(message.from_user.id)
-    if not user:
+    if not db_user:
         await message.answer("❌ Xatolik!")
         return
 
-    await CommentModel.add(user["id"], anime_id, text)
+    await CommentModel.add(db_user.id, anime_id, text)
     await state.clear()
     
     await message.answer(
@@ -56,12 +56,11 @@ async def process_comment_text(message: Message, state: FSMContext) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("comments_list:"))
-async def show_comments(callback: CallbackQuery) -> None:
+@router.callback_query(CommentsListCallback.filter())
+async def show_comments(callback: CallbackQuery, callback_data: CommentsListCallback) -> None:
     """Izohlar ro'yxatini ko'rsatish."""
-    parts = callback.data.split(":")
-    anime_id = int(parts[1])
-    page = int(parts[2])
+    anime_id = callback_data.anime_id
+    page = callback_data.page
     
     total_count = await CommentModel.get_count(anime_id)
     total_pages = max(1, math.ceil(total_count / COMMENTS_PER_PAGE))
@@ -6,7 +6,7 @@ Sezon tanlash, qism tanlash, VIP tekshirish va video yuborish.
 import logging
 import math
 
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import CallbackQuery
 from aiogram.fsm.context import FSMContext
 
@@ -14,25 +14,30 @@ from models.anime import AnimeModel
 from models.episode import EpisodeModel
 from services.anime_service import AnimeService
 from services.vip_service import VipService
-from services.user_service import UserService
 from utils.images import IMAGES
-from keyboards.inline import seasons_keyboard, episodes_keyboard, episode_view_keyboard, vip_plans_keyboard
+from keyboards.inline import (
+    anime_view_keyboard, seasons_keyboard, episodes_keyboard, episode_view_keyboard, vip_plans_keyboard,
+)
+from keyboards.callbacks import AnimeDetailsCallback, EpisodeCallback, SeasonCallback, WatchCallback
 from config import EPISODES_PER_PAGE
 from services.media_service import MediaService
 
 
 from models.favorites import FavoritesModel
-from models.user import UserModel
+from models.user import UserContext
+from models.vip import VipModel
 
 
 logger = logging.getLogger(__name__)
 router = Router(name="episodes_view")
 
 
-@router.callback_query(F.data.startswith("anime_details:"))
-async def show_anime_details(callback: CallbackQuery) -> None:
+@router.callback_query(AnimeDetailsCallback.filter())
+async def show_anime_details(
+    callback: CallbackQuery, callback_data: AnimeDetailsCallback, db_user: UserContext | None
+) -> None:
     """Anime ma'lumotlarini qayta ko'rsatish (Seamless 'Back' navigation)."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     anime = await AnimeModel.get_by_id(anime_id)
     
     if not anime:
@@ -40,8 +45,7 @@ async def show_anime_details(callback: CallbackQuery) -> None:
         return
 
     # Sevimlilarda bormi-yo'qligini tekshirish
-    db_user = await UserModel.get_by_telegram_id(callback.from_user.id)
-    is_fav = await FavoritesModel.is_favorite(db_user["id"], anime_id) if db_user else False
+    is_fav = await FavoritesModel.is_favorite(db_user.id, anime_id) if db_user else False
     
     text = await AnimeService.get_anime_info_text(anime_id)
     poster = AnimeService.get_poster(anime)
@@ -62,10 +66,10 @@ async def show_anime_details(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("watch:"))
-async def show_seasons(callback: CallbackQuery) -> None:
+@router.callback_query(WatchCallback.filter())
+async def show_seasons(callback: CallbackQuery, callback_data: WatchCallback) -> None:
     """Anime sezonlarini ko'rsatish (Skip if single season)."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     anime = await AnimeModel.get_by_id(anime_id)
 
     if not anime:
@@ -99,13 +103,12 @@ async def show_seasons(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("season:"))
-async def show_episodes(callback: CallbackQuery) -> None:
+@router.callback_query(SeasonCallback.filter())
+async def show_episodes(callback: CallbackQuery, callback_data: SeasonCallback) -> None:
     """Sezon qismlarini ko'rsatish (paginatsiya bilan)."""
-    parts = callback.data.split(":")
-    anime_id = int(parts[1])
-    season = int(parts[2])
-    page = int(parts[3])
+    anime_id = callback_data.anime_id
+    season = callback_data.season
+    page = callback_data.page
 
     anime = await AnimeModel.get_by_id(anime_id)
     if not anime:
@@ -151,10 +154,12 @@ async def _show_episodes_internal(callback: CallbackQuery, anime: dict, season:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("episode:"))
-async def watch_episode(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(EpisodeCallback.filter())
+async def watch_episode(
+    callback: CallbackQuery, callback_data: EpisodeCallback, state: FSMContext, db_user: UserContext | None
+) -> None:
     """Qismni tomosha qilish - videoni yuborish."""
-    episode_id = int(callback.data.split(":")[1])
+    episode_id = callback_data.episode_id
     episode = await EpisodeModel.get_by_id(episode_id)
 
     if not episode:
@@ -168,8 +173,7 @@ async def watch_episode(callback: CallbackQuery, state: FSMContext) -> None:
 
     # VIP tekshirish (anime yoki qism VIP bo'lsa)
     if anime["is_vip"] or episode["is_vip"]:
-        is_vip = await UserService.is_vip_active(callback.from_user.id)
-        if not is_vip:
+        if not (db_user and db_user.is_vip):
             # Plan tanlashdan oldin anime kontekstini saqlab qo'yamiz
             await state.update_data(context_anime_id=anime["id"], context_anime_title=anime["title"])
             
@@ -179,10 +183,13 @@ async def watch_episode(callback: CallbackQuery, state: FSMContext) -> None:
             
             # Posterni o'chirib, VIP rejalarni ko'rsatish
             try:
-                await callback.message.answer_photo(
-                    photo=IMAGES["VIP"],
-                    caption=plans_text,
-                    reply_markup=kb
+                await MediaService.deliver(
+                    lambda photo: callback.message.answer_photo(
+                        photo=photo,
+                        caption=plans_text,
+                        reply_markup=kb
+                    ),
+                    IMAGES["VIP"], "photo"
                 )
                 await callback.message.delete()
             except Exception:
@@ -12,18 +12,19 @@ from aiogram.fsm.context import FSMContext
 
 from states.search import SearchStates
 from models.anime import AnimeModel
-from models.user import UserModel
+from models.user import UserContext
 from models.favorites import FavoritesModel
 from keyboards.reply import search_menu, user_main_menu, cancel_keyboard
 from keyboards.inline import (
     search_results_keyboard,
     anime_view_keyboard,
 )
+from keyboards.callbacks import SearchPageCallback, AnimeDetailsCallback
 from services.anime_service import AnimeService
 from services.search_service import SearchService
 from services.media_service import MediaService
 from utils.images import IMAGES
-from config import SEARCH_RESULTS_PER_PAGE, SEARCH_RESULTS_PER_PAGE
+from utils.callback_store import CallbackStore
 
 logger = logging.getLogger(__name__)
 router = Router(name="user_search")
@@ -35,10 +36,13 @@ async def show_search_menu(message: Message, state: FSMContext) -> None:
     """Qidiruv menyusini ko'rsatish."""
     await state.clear()
     try:
-        await message.answer_photo(
-            photo=IMAGES["SEARCH"],
-            caption="<b>🔍 Anime qidirish</b>\n\nQidiruv turini tanlang:",
-            reply_markup=search_menu(),
+        await MediaService.deliver(
+            lambda photo: message.answer_photo(
+                photo=photo,
+                caption="<b>🔍 Anime qidirish</b>\n\nQidiruv turini tanlang:",
+                reply_markup=search_menu(),
+            ),
+            IMAGES["SEARCH"], "photo",
         )
     except Exception as e:
         logger.error(f"Error sending search photo: {e}")
@@ -94,11 +98,11 @@ async def search_top(message: Message) -> None:
     medals = ["🥇", "🥈", "🥉", "◈", "◈"]
     for i, anime in enumerate(results[:5]):
         medal = medals[i] if i < len(medals) else "◈"
-        text += f"{medal} <b>{anime['title']}</b>\n   └ 👁 {anime['views']} • ⏳ {anime.get('status', '??')}\n"
+        text += f"{medal} <b>{anime.title}</b>\n   └ 👁 {anime.views} • ⏳ {anime.status or '??'}\n"
     
     await message.answer(
         text,
-        reply_markup=search_results_keyboard(results, 0, total_pages, "top", "all"),
+        reply_markup=search_results_keyboard(results, 0, total_pages, "top"),
     )
 
 
@@ -109,7 +113,7 @@ async def search_new(message: Message) -> None:
     if not results:
         await message.answer("ℹ️ Hozircha animelar yo'q.")
         return
-    await _show_search_results(message, results, 0, total_pages, "latest", "all")
+    await _show_search_results(message, results, 0, total_pages, "latest")
 
 
 @router.message(F.text == "💎 VIP animelar")
@@ -119,18 +123,18 @@ async def search_vip(message: Message) -> None:
     if not results:
         await message.answer("ℹ️ Hozircha VIP animelar yo'q.")
         return
-    await _show_search_results(message, results, 0, total_pages, "vip", "all")
+    await _show_search_results(message, results, 0, total_pages, "vip")
 
 
 
 @router.message(F.text == "🎲 Tasodifiy anime")
-async def search_random(message: Message) -> None:
+async def search_random(message: Message, db_user: UserContext | None) -> None:
     """Tasodifiy anime ko'rsatish."""
     anime = await SearchService.get_random_anime()
     if not anime:
         await message.answer("ℹ️ Hozircha animelar yo'q.")
         return
-    await _show_anime_view(message, anime["id"])
+    await _show_anime_view(message, anime["id"], db_user)
 
 
 
@@ -157,7 +161,7 @@ async def process_search_title(message: Message, state: FSMContext) -> None:
 
 
 @router.message(SearchStates.waiting_code)
-async def process_search_code(message: Message, state: FSMContext) -> None:
+async def process_search_code(message: Message, state: FSMContext, db_user: UserContext | None) -> None:
     code = message.text.strip().lower()
     await state.clear()
     anime = await AnimeModel.get_by_code(code)
@@ -165,7 +169,7 @@ async def process_search_code(message: Message, state: FSMContext) -> None:
         await message.answer(f"❌ <b>Kod '{code}'</b> bo'yicha anime topilmadi.", reply_markup=search_menu())
         return
     # To'g'ridan-to'g'ri anime sahifasini ochish
-    await _show_anime_view(message, anime["id"])
+    await _show_anime_view(message, anime["id"], db_user)
 
 
 @router.message(SearchStates.waiting_genre)
@@ -181,7 +185,7 @@ async def process_search_genre(message: Message, state: FSMContext) -> None:
 
 # ---- Yordamchi funksiyalar ----
 
-async def _show_search_results(message: Message, results: list, page: int, total_pages: int, q_type: str, q_val: str) -> None:
+async def _show_search_results(message: Message, results: list, page: int, total_pages: int, q_type: str, q_val: str = "") -> None:
     """Qidiruv natijalarini inline keyboard bilan ko'rsatish."""
     text = (
         f"<b>🔍 Qidiruv natijalari:</b>\n"
@@ -196,7 +200,7 @@ async def _show_search_results(message: Message, results: list, page: int, total
     )
 
 
-async def _show_anime_view(message: Message, anime_id: int) -> None:
+async def _show_anime_view(message: Message, anime_id: int, db_user: UserContext | None) -> None:
     """Anime sahifasini rasm va ma'lumotlar bilan ko'rsatish."""
     anime = await AnimeModel.get_by_id(anime_id)
     if not anime:
@@ -204,8 +208,7 @@ async def _show_anime_view(message: Message, anime_id: int) -> None:
         return
 
     await AnimeModel.increment_views(anime_id)
-    db_user = await UserModel.get_by_telegram_id(message.from_user.id)
-    is_fav = await FavoritesModel.is_favorite(db_user["id"], anime_id) if db_user else False
+    is_fav = await FavoritesModel.is_favorite(db_user.id, anime_id) if db_user else False
     
     text = await AnimeService.get_anime_info_text(anime_id)
     poster = AnimeService.get_poster(anime)
@@ -229,15 +232,18 @@ async def _show_anime_view(message: Message, anime_id: int) -> None:
 
 # ---- Pagination Callbacklar ----
 
-@router.callback_query(F.data.startswith("search_page:"))
-async def process_search_pagination(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    q_type = parts[1]
-    q_val = parts[2]
-    page = int(parts[3])
-    
-    offset = page * SEARCH_RESULTS_PER_PAGE
-    
+@router.callback_query(SearchPageCallback.filter())
+async def process_search_pagination(callback: CallbackQuery, callback_data: SearchPageCallback) -> None:
+    q_type = callback_data.kind
+    page = callback_data.page
+    q_val = ""
+    if callback_data.token:
+        context = CallbackStore.get(callback_data.token)
+        if context is None:
+            await callback.answer("⌛ Qidiruv eskirgan. Iltimos, qaytadan qidiring.", show_alert=True)
+            return
+        q_val = context["query"]
+
     if q_type == "title":
         results, total_pages = await SearchService.search_by_title(q_val, page=page)
     elif q_type == "genre":
@@ -258,10 +264,12 @@ async def process_search_pagination(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("anime_details:"))
-async def show_anime_callback(callback: CallbackQuery) -> None:
+@router.callback_query(AnimeDetailsCallback.filter())
+async def show_anime_callback(
+    callback: CallbackQuery, callback_data: AnimeDetailsCallback, db_user: UserContext | None
+) -> None:
     """Natijalardan anime tanlanganda ko'rsatish (Seamless Audit)."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     
     anime = await AnimeModel.get_by_id(anime_id)
     if not anime:
@@ -269,8 +277,7 @@ async def show_anime_callback(callback: CallbackQuery) -> None:
         return
 
     await AnimeModel.increment_views(anime_id)
-    db_user = await UserModel.get_by_telegram_id(callback.from_user.id)
-    is_fav = await FavoritesModel.is_favorite(db_user["id"], anime_id) if db_user else False
+    is_fav = await FavoritesModel.is_favorite(db_user.id, anime_id) if db_user else False
     
     text = await AnimeService.get_anime_info_text(anime_id)
     poster = AnimeService.get_poster(anime)
@@ -3,13 +3,14 @@ handlers/user/comments.py - Izoh qoldirish handleri.
 """
 
 import logging
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from states.comment import CommentStates
-from models.user import UserModel
+from models.user import UserContext
 from models.comments import CommentsModel
 from keyboards.inline import comments_list_keyboard, anime_view_keyboard
+from keyboards.callbacks import CommentCallback, CommentsListCallback
 import math
 
 logger = logging.getLogger(__name__)
@@ -17,34 +18,32 @@ router = Router(name="user_comments")
 
 COMMENTS_PER_PAGE = 5
 
-@router.callback_query(F.data.startswith("comment:"))
-async def start_comment(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(CommentCallback.filter())
+async def start_comment(callback: CallbackQuery, callback_data: CommentCallback, state: FSMContext) -> None:
     """Izoh yozish jarayonini boshlash."""
-    anime_id = int(callback.data.split(":")[1])
+    anime_id = callback_data.anime_id
     await state.set_state(CommentStates.waiting_text)
     await state.update_data(comment_anime_id=anime_id)
     await callback.message.answer("\u270E Izohingizni yozing:")
     await callback.answer()
 
 @router.message(CommentStates.waiting_text)
-async def save_comment(message: Message, state: FSMContext) -> None:
+async def save_comment(message: Message, state: FSMContext, db_user: UserContext | None) -> None:
     """Izohni saqlash."""
     data = await state.get_data()
     await state.clear()
     anime_id = data.get("comment_anime_id")
-    user = await UserModel.get_by_telegram_id(message.from_user.id)
-    if not user:
+    if not db_user:
         await message.answer("Avval /start buyrug'ini yuboring.")
         return
-    await CommentsModel.add(user["id"], anime_id, message.text.strip())
+    await CommentsModel.add(db_user.id, anime_id, message.text.strip())
     await message.answer("\u2714 Izohingiz qo'shildi!")
 
-@router.callback_query(F.data.startswith("comments_list:"))
-async def show_comments(callback: CallbackQuery) -> None:
+@router.callback_query(CommentsListCallback.filter())
+async def show_comments(callback: CallbackQuery, callback_data: CommentsListCallback) -> None:
     """Izohlar ro'yxatini ko'rsatish."""
-    parts = callback.data.split(":")
-    anime_id = int(parts[1])
-    page = int(parts[2])
+    anime_id = callback_data.anime_id
+    page = callback_data.page
     total = await CommentsModel.get_comment_count(anime_id)
     total_pages = max(1, math.ceil(total / COMMENTS_PER_PAGE))
     offset = page * COMMENTS_PER_PAGE
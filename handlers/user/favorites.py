@@ -1,10 +1,11 @@
 import logging
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
-from models.user import UserModel
+from models.user import UserContext
 from models.favorites import FavoritesModel
 from utils.images import IMAGES
 from keyboards.inline import favorites_keyboard, anime_view_keyboard
+from keyboards.callbacks import FavoriteCallback, UnfavoriteCallback
 from services.media_service import MediaService
 
 
@@ -13,14 +14,13 @@ router = Router(name="user_favorites")
 
 
 @router.message(F.text == "⭐️ Sevimlilar")
-async def show_favorites(message: Message) -> None:
+async def show_favorites(message: Message, db_user: UserContext | None) -> None:
     """Foydalanuvchi sevimlilarini ro'yxatini ko'rsatish."""
-    user = await UserModel.get_by_telegram_id(message.from_user.id)
-    if not user:
+    if not db_user:
         await message.answer("❌ Avval /start buyrug'ini bosing.")
         return
 
-    favs = await FavoritesModel.get_by_user(user["id"])
+    favs = await FavoritesModel.get_summaries(db_user.id)
     
     if not favs:
         text = (
@@ -50,14 +50,15 @@ async def show_favorites(message: Message) -> None:
     await message.answer(text, reply_markup=favorites_keyboard(favs))
 
 
-@router.callback_query(F.data.startswith("fav:"))
-async def add_favorite_callback(callback: CallbackQuery) -> None:
+@router.callback_query(FavoriteCallback.filter())
+async def add_favorite_callback(
+    callback: CallbackQuery, callback_data: FavoriteCallback, db_user: UserContext | None
+) -> None:
     """Anime sahifasidan sevimlilarga qo'shish."""
-    anime_id = int(callback.data.split(":")[1])
-    user = await UserModel.get_by_telegram_id(callback.from_user.id)
-    
-    if user:
-        added = await FavoritesModel.add(user["id"], anime_id)
+    anime_id = callback_data.anime_id
+
+    if db_user:
+        added = await FavoritesModel.add(db_user.id, anime_id)
         if added:
             await callback.answer("✅ Sevimlilarga qo'shildi!", show_alert=False)
             # Klaviatura holatini yangilash
@@ -70,14 +71,15 @@ async def add_favorite_callback(callback: CallbackQuery) -> None:
         await callback.answer("❌ Xatolik!")
 
 
-@router.callback_query(F.data.startswith("unfav:"))
-async def remove_favorite_callback(callback: CallbackQuery) -> None:
+@router.callback_query(UnfavoriteCallback.filter())
+async def remove_favorite_callback(
+    callback: CallbackQuery, callback_data: UnfavoriteCallback, db_user: UserContext | None
+) -> None:
     """Anime sahifasidan sevimlilardan chiqarish."""
-    anime_id = int(callback.data.split(":")[1])
-    user = await UserModel.get_by_telegram_id(callback.from_user.id)
-    
-    if user:
-        await FavoritesModel.remove(user["id"], anime_id)
+    anime_id = callback_data.anime_id
+
+    if db_user:
+        await FavoritesModel.remove(db_user.id, anime_id)
         await callback.answer("🗑 Sevimlilardan chiqarildi!", show_alert=False)
         # Klaviatura holatini yangilash
         await callback.message.edit_reply_markup(
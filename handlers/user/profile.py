@@ -14,9 +14,6 @@ router = Router(name="user_profile")
 @router.message(F.text == "/profile")
 async def show_profile(message: Message) -> None:
     """Foydalanuvchi profilini ko'rsatish."""
-    # VIP muddatini tekshirish va yangilash
-    await UserService.check_and_expire_vip(message.from_user.id)
-    
     # Profil matnini olish (emoji va formatlash service ichida)
     text = await UserService.get_profile_text(message.from_user.id)
     try:
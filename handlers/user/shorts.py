@@ -7,8 +7,9 @@ import logging
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from models.shorts import ShortsModel
-from models.user import UserModel
+from models.user import UserContext
 from keyboards.inline import shorts_keyboard
+from keyboards.callbacks import ShortNavCallback
 from services.media_service import MediaService
 
 
@@ -18,7 +19,7 @@ router = Router(name="user_shorts")
 
 
 @router.message(F.text == "🎬 Shorts")
-async def show_shorts_start(message: Message) -> None:
+async def show_shorts_start(message: Message, db_user: UserContext | None) -> None:
     """Birinchi short videoni ko'rsatish."""
     shorts = await ShortsModel.get_all(limit=50)
     if not shorts:
@@ -29,9 +30,8 @@ async def show_shorts_start(message: Message) -> None:
     total = len(shorts)
     
     # Ko'rishlar sonini oshirish (Unik)
-    db_user = await UserModel.get_by_telegram_id(message.from_user.id)
     if db_user:
-        await ShortsModel.increment_views(first_short["id"], db_user["id"])
+        await ShortsModel.increment_views(first_short["id"], db_user.id)
     
     # Yangilangan ma'lumotni olish (views o'zgarishi uchun)
     updated_short = await ShortsModel.get_by_id(first_short["id"])
@@ -55,10 +55,12 @@ async def show_shorts_start(message: Message) -> None:
 
 
 
-@router.callback_query(F.data.startswith("short_nav:"))
-async def navigate_shorts(callback: CallbackQuery) -> None:
+@router.callback_query(ShortNavCallback.filter())
+async def navigate_shorts(
+    callback: CallbackQuery, callback_data: ShortNavCallback, db_user: UserContext | None
+) -> None:
     """Shortslar o'rtasida navigatsiya."""
-    index = int(callback.data.split(":")[1])
+    index = callback_data.index
     shorts = await ShortsModel.get_all(limit=50)
     
     if not shorts or index >= len(shorts) or index < 0:
@@ -69,9 +71,8 @@ async def navigate_shorts(callback: CallbackQuery) -> None:
     total = len(shorts)
     
     # Ko'rishlar sonini oshirish (Unik)
-    db_user = await UserModel.get_by_telegram_id(callback.from_user.id)
     if db_user:
-        await ShortsModel.increment_views(current["id"], db_user["id"])
+        await ShortsModel.increment_views(current["id"], db_user.id)
     
     # Yangilangan ma'lumotni olish
     updated_short = await ShortsModel.get_by_id(current["id"])
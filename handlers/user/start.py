@@ -10,16 +10,16 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.filters import CommandStart, Command
 from aiogram.fsm.context import FSMContext
 
-from models.user import UserModel
+from models.user import UserContext
 from models.anime import AnimeModel
 from models.favorites import FavoritesModel
 from models.admin import AdminModel
+from models.channel import ChannelModel
 from keyboards.reply import user_main_menu, admin_main_menu
 from keyboards.inline import anime_view_keyboard
 from services.anime_service import AnimeService
 from services.media_service import MediaService
-
-from services.user_service import UserService
+from middlewares.subscription import SubscriptionMiddleware
 from utils.images import IMAGES
 from config import ADMIN_IDS
 
@@ -29,24 +29,14 @@ low_priority_router = Router(name="user_low_priority")
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, state: FSMContext) -> None:
+async def cmd_start(message: Message, state: FSMContext, db_user: UserContext | None) -> None:
     """
     /start buyrug'i handleri.
-    Foydalanuvchini ro'yxatdan o'tkazadi va deep linklarni qayta ishlaydi.
+    Deep linklarni qayta ishlaydi (ro'yxatdan o'tkazish UserContextMiddleware da).
     """
     await state.clear()
     user = message.from_user
 
-    # Foydalanuvchini ro'yxatdan o'tkazish
-    await UserModel.create_or_update(
-        telegram_id=user.id,
-        full_name=user.full_name or "",
-        username=user.username or "",
-    )
-
-    # VIP tekshirish
-    await UserService.check_and_expire_vip(user.id)
-
     # Deep link argumentlarini tekshirish
     args = message.text.split(maxsplit=1)
     if len(args) > 1:
@@ -59,9 +49,8 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
                 anime = await AnimeModel.get_by_id(anime_id)
                 if anime:
                     await AnimeModel.increment_views(anime_id)
-                    db_user = await UserModel.get_by_telegram_id(user.id)
                     is_fav = await FavoritesModel.is_favorite(
-                        db_user["id"], anime_id
+                        db_user.id, anime_id
                     ) if db_user else False
                     
                     text = await AnimeService.get_anime_info_text(anime_id)
@@ -95,9 +84,8 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
         if param.startswith("fav_"):
             try:
                 anime_id = int(param.replace("fav_", ""))
-                db_user = await UserModel.get_by_telegram_id(user.id)
                 if db_user:
-                    added = await FavoritesModel.add(db_user["id"], anime_id)
+                    added = await FavoritesModel.add(db_user.id, anime_id)
                     if added:
                         await message.answer("⭐️ <b>Muvaffaqiyatli sevimlilarga qo'shildi!</b>")
                     else:
@@ -194,7 +182,9 @@ async def callback_back(callback: CallbackQuery, state: FSMContext) -> None:
 @router.callback_query(F.data == "check_subscription")
 async def check_sub(callback: CallbackQuery) -> None:
     """Obunani tekshirish."""
-    # Bu yerda aslida haqiqiy tekshiruv middleware'da
+    # Bu yerda aslida haqiqiy tekshiruv middleware'da.
+    # Keshdagi natijalarni o'chiramiz - keyingi xabarda qayta tekshiriladi.
+    SubscriptionMiddleware.forget_user(callback.from_user.id, await ChannelModel.get_all())
     await callback.message.answer(
         "<b>✅ Obuna tasdiqlandi!</b>\n\nFoydalanishda davom eting.",
         reply_markup=user_main_menu(),
@@ -203,7 +193,7 @@ async def check_sub(callback: CallbackQuery) -> None:
 
 
 @low_priority_router.message(F.text)
-async def global_code_search(message: Message, state: FSMContext) -> None:
+async def global_code_search(message: Message, state: FSMContext, db_user: UserContext | None) -> None:
     """Foydalanuvchi anime kodini yuborganda qidirish."""
     code = message.text.strip().lower()
     
@@ -221,8 +211,7 @@ async def global_code_search(message: Message, state: FSMContext) -> None:
     anime_id = anime["id"]
     await AnimeModel.increment_views(anime_id)
     
-    user = await UserModel.get_by_telegram_id(message.from_user.id)
-    is_fav = await FavoritesModel.is_favorite(user["id"], anime_id) if user else False
+    is_fav = await FavoritesModel.is_favorite(db_user.id, anime_id) if db_user else False
     
     text = await AnimeService.get_anime_info_text(anime_id)
     poster = AnimeService.get_poster(anime)
@@ -16,6 +16,7 @@ from services.vip_service import VipService
 from services.user_service import UserService
 from utils.images import IMAGES
 from keyboards.inline import vip_plans_keyboard, vip_payment_keyboard, vip_admin_approve_keyboard, vip_details_keyboard
+from keyboards.callbacks import VipDetailsCallback, VipPaidCallback, VipPlanCallback
 from loader import bot
 
 logger = logging.getLogger(__name__)
@@ -75,10 +76,10 @@ async def vip_plans_back_handler(callback: CallbackQuery, state: FSMContext) ->
 
     await callback.answer()
 
-@router.callback_query(F.data.startswith("vip_details:"))
-async def view_vip_details(callback: CallbackQuery) -> None:
+@router.callback_query(VipDetailsCallback.filter())
+async def view_vip_details(callback: CallbackQuery, callback_data: VipDetailsCallback) -> None:
     """Reja tafsilotlarini ko'rsatish."""
-    plan_id = int(callback.data.split(":")[1])
+    plan_id = callback_data.plan_id
     plan = await VipModel.get_plan(plan_id)
     if not plan:
         await callback.answer("Reja topilmadi.", show_alert=True)
@@ -102,10 +103,10 @@ async def view_vip_details(callback: CallbackQuery) -> None:
 
     await callback.answer()
 
-@router.callback_query(F.data.startswith("vip_plan:"))
-async def select_vip_plan(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(VipPlanCallback.filter())
+async def select_vip_plan(callback: CallbackQuery, callback_data: VipPlanCallback, state: FSMContext) -> None:
     """VIP reja tanlash - karta raqami plan dan ko'rsatiladi."""
-    plan_id = int(callback.data.split(":")[1])
+    plan_id = callback_data.plan_id
     text = await VipService.get_payment_text(plan_id)
     await state.set_state(VipPaymentStates.waiting_screenshot)
     await state.update_data(plan_id=plan_id)
@@ -121,8 +122,8 @@ async def select_vip_plan(callback: CallbackQuery, state: FSMContext) -> None:
 
     await callback.answer("💳 To'lov ma'lumotlari yuborildi.")
 
-@router.callback_query(F.data.startswith("vip_paid:"))
-async def vip_paid_prompt(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(VipPaidCallback.filter())
+async def vip_paid_prompt(callback: CallbackQuery, callback_data: VipPaidCallback, state: FSMContext) -> None:
     text = "\u25B8 To'lov screenshotini rasm sifatida yuboring:"
     from services.media_service import MediaService
     await MediaService.edit_photo_caption(
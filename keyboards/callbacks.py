@@ -0,0 +1,144 @@
+"""
+keyboards/callbacks.py - Inline tugmalar uchun callback_data sxemalari.
+Har bir prefiks uchun bitta CallbackData klassi: klaviaturalar .pack(),
+handlerlar .filter() ishlatadi - satrlarni qo'lda bo'lish shart emas.
+Uzun matnlar (qidiruv so'rovi) utils/callback_store.py da saqlanadi.
+"""
+
+from aiogram.filters.callback_data import CallbackData
+
+
+# ---- Anime va qismlar ----
+
+class AnimeDetailsCallback(CallbackData, prefix="anime_details"):
+    anime_id: int
+
+
+class WatchCallback(CallbackData, prefix="watch"):
+    anime_id: int
+
+
+class SeasonCallback(CallbackData, prefix="season"):
+    anime_id: int
+    season: int
+    page: int
+
+
+class EpisodeCallback(CallbackData, prefix="episode"):
+    episode_id: int
+
+
+class FavoriteCallback(CallbackData, prefix="fav"):
+    anime_id: int
+
+
+class UnfavoriteCallback(CallbackData, prefix="unfav"):
+    anime_id: int
+
+
+# ---- Qidiruv ----
+
+class SearchPageCallback(CallbackData, prefix="search_page"):
+    # title | genre | top | latest | vip
+    kind: str
+    # CallbackStore tokeni (so'rov matni); top/latest/vip uchun bo'sh
+    token: str
+    page: int
+
+
+# ---- Izohlar ----
+
+class CommentCallback(CallbackData, prefix="comment"):
+    anime_id: int
+
+
+class CommentsListCallback(CallbackData, prefix="comments_list"):
+    anime_id: int
+    page: int
+
+
+# ---- Shorts ----
+
+class ShortNavCallback(CallbackData, prefix="short_nav"):
+    index: int
+
+
+# ---- VIP ----
+
+class VipDetailsCallback(CallbackData, prefix="vip_details"):
+    plan_id: int
+
+
+class VipPlanCallback(CallbackData, prefix="vip_plan"):
+    plan_id: int
+
+
+class VipPaidCallback(CallbackData, prefix="vip_paid"):
+    plan_id: int
+
+
+class VipApproveCallback(CallbackData, prefix="vip_approve"):
+    user_tg_id: int
+    plan_id: int
+
+
+class VipRejectCallback(CallbackData, prefix="vip_reject"):
+    user_tg_id: int
+
+
+# ---- Admin ----
+
+class AnimeSelectCallback(CallbackData, prefix="anime_select"):
+    # anime_select_keyboard dagi amal (edit_anime_select, add_ep_anime, ...)
+    action: str
+    anime_id: int
+
+
+class DeleteEpisodeCallback(CallbackData, prefix="del_ep_confirm"):
+    episode_id: int
+
+
+class DeleteChannelCallback(CallbackData, prefix="del_channel"):
+    channel_id: str
+
+
+class SetSettingCallback(CallbackData, prefix="set_setting"):
+    key: str
+
+
+class ViewAdminCallback(CallbackData, prefix="view_admin"):
+    admin_id: int
+
+
+class DeleteAdminCallback(CallbackData, prefix="delete_admin"):
+    admin_id: int
+
+
+class ManageShortCallback(CallbackData, prefix="manage_short"):
+    short_id: int
+
+
+class EditShortVideoCallback(CallbackData, prefix="edit_short_video"):
+    short_id: int
+
+
+class DeleteShortCallback(CallbackData, prefix="delete_short_confirm"):
+    short_id: int
+
+
+class FixShortCallback(CallbackData, prefix="fix_short"):
+    short_id: int
+
+
+class FixAnimePosterCallback(CallbackData, prefix="fix_anime_poster"):
+    anime_id: int
+
+
+class FixEpisodeVideoCallback(CallbackData, prefix="fix_ep_video"):
+    episode_id: int
+
+
+class BroadcastCallback(CallbackData, prefix="bc"):
+    # pause | resume | cancel
+    action: str
+    job_id: int
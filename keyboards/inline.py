@@ -6,6 +6,23 @@ Anime ko'rish, navigatsiya, pagination va VIP uchun premium dizayn.
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from keyboards.callbacks import (
+    AnimeDetailsCallback, WatchCallback, SeasonCallback, EpisodeCallback,
+    FavoriteCallback, UnfavoriteCallback, SearchPageCallback,
+    CommentCallback, CommentsListCallback, ShortNavCallback,
+    VipDetailsCallback, VipPlanCallback, VipPaidCallback,
+    VipApproveCallback, VipRejectCallback,
+    AnimeSelectCallback, DeleteChannelCallback, SetSettingCallback,
+    ViewAdminCallback, DeleteAdminCallback,
+    ManageShortCallback, EditShortVideoCallback, DeleteShortCallback,
+    FixShortCallback, FixAnimePosterCallback, FixEpisodeVideoCallback,
+    BroadcastCallback,
+)
+from models.anime import AnimeSummary
+from models.catalog import EpisodeEntry
+from models.shorts import ShortSummary
+from utils.callback_store import CallbackStore
+
 
 # ==============================================================
 # ANIME KO'RISH TUGMALARI
@@ -16,20 +33,20 @@ def anime_view_keyboard(anime_id: int, is_favorite: bool = False) -> InlineKeybo
     builder = InlineKeyboardBuilder()
     
     # Row 1: Primary action
-    builder.row(InlineKeyboardButton(text="▶️ Tomosha qilish", callback_data=f"watch:{anime_id}"))
+    builder.row(InlineKeyboardButton(text="▶️ Tomosha qilish", callback_data=WatchCallback(anime_id=anime_id).pack()))
     
     # Row 2: Secondary actions
     fav_text = "⭐ Sevimlilarda" if is_favorite else "➕ Sevimlilarga"
-    fav_action = "unfav" if is_favorite else "fav"
+    fav_callback = UnfavoriteCallback if is_favorite else FavoriteCallback
     builder.row(
-        InlineKeyboardButton(text=fav_text, callback_data=f"{fav_action}:{anime_id}"),
+        InlineKeyboardButton(text=fav_text, callback_data=fav_callback(anime_id=anime_id).pack()),
         InlineKeyboardButton(text="🔗 Ulashish", switch_inline_query=f"anime_{anime_id}")
     )
     
     # Row 3: Community
     builder.row(
-        InlineKeyboardButton(text="✍️ Izohlar", callback_data=f"comments_list:{anime_id}:0"),
-        InlineKeyboardButton(text="💬 Fikr bildirish", callback_data=f"comment:{anime_id}")
+        InlineKeyboardButton(text="✍️ Izohlar", callback_data=CommentsListCallback(anime_id=anime_id, page=0).pack()),
+        InlineKeyboardButton(text="💬 Fikr bildirish", callback_data=CommentCallback(anime_id=anime_id).pack())
     )
     
     # Row 4: Navigation
@@ -46,9 +63,9 @@ def seasons_keyboard(anime_id: int, seasons: list[int]) -> InlineKeyboardMarkup:
     """Anime sezonlari ro'yxati tugmalari."""
     builder = InlineKeyboardBuilder()
     for s in seasons:
-        builder.button(text=f"{s}-sezon", callback_data=f"season:{anime_id}:{s}:0")
+        builder.button(text=f"{s}-sezon", callback_data=SeasonCallback(anime_id=anime_id, season=s, page=0))
     builder.adjust(2)
-    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=f"anime_details:{anime_id}"))
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=AnimeDetailsCallback(anime_id=anime_id).pack()))
     return builder.as_markup()
 
 
@@ -59,7 +76,7 @@ def seasons_keyboard(anime_id: int, seasons: list[int]) -> InlineKeyboardMarkup:
 def episodes_keyboard(
     anime_id: int,
     season: int,
-    episodes: list[dict],
+    episodes: list[EpisodeEntry],
     page: int,
     total_pages: int,
     is_single_season: bool = False,
@@ -70,27 +87,29 @@ def episodes_keyboard(
     # 4 tadan qilib taxlaymiz - juda qulay
     for ep in episodes:
         builder.button(
-            text=f"{ep['episode_number']}",
-            callback_data=f"episode:{ep['id']}",
+            text=f"{ep.episode_number}",
+            callback_data=EpisodeCallback(episode_id=ep.id),
         )
     builder.adjust(4)
 
     # Paginatsiya
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton(text="◀️", callback_data=f"season:{anime_id}:{season}:{page - 1}"))
+        nav_buttons.append(InlineKeyboardButton(text="◀️", callback_data=SeasonCallback(anime_id=anime_id, season=season, page=page - 1).pack()))
     
     nav_buttons.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
     
     if page < total_pages - 1:
-        nav_buttons.append(InlineKeyboardButton(text="▶️", callback_data=f"season:{anime_id}:{season}:{page + 1}"))
+        nav_buttons.append(InlineKeyboardButton(text="▶️", callback_data=SeasonCallback(anime_id=anime_id, season=season, page=page + 1).pack()))
 
     if len(nav_buttons) > 1:
         builder.row(*nav_buttons)
 
     # Orqaga
     back_text = "⬅️ Orqaga"
-    back_callback = f"anime_details:{anime_id}" if is_single_season else f"watch:{anime_id}"
+    back_callback = (
+        AnimeDetailsCallback(anime_id=anime_id) if is_single_season else WatchCallback(anime_id=anime_id)
+    ).pack()
     builder.row(InlineKeyboardButton(text=back_text, callback_data=back_callback))
 
     return builder.as_markup()
@@ -105,11 +124,11 @@ def episode_view_keyboard(anime_id: int, episode_id: int) -> InlineKeyboardMarku
     builder = InlineKeyboardBuilder()
     
     # Row 1: Listga qaytish
-    builder.row(InlineKeyboardButton(text="📁 Barcha qismlar", callback_data=f"watch:{anime_id}"))
+    builder.row(InlineKeyboardButton(text="📁 Barcha qismlar", callback_data=WatchCallback(anime_id=anime_id).pack()))
     
     # Row 2: Secondary
     builder.row(
-        InlineKeyboardButton(text="🏠 Anime sahifasi", callback_data=f"anime_details:{anime_id}"),
+        InlineKeyboardButton(text="🏠 Anime sahifasi", callback_data=AnimeDetailsCallback(anime_id=anime_id).pack()),
         InlineKeyboardButton(text="🚀 Ulashish", switch_inline_query=f"anime_{anime_id}")
     )
     
@@ -121,17 +140,20 @@ def episode_view_keyboard(anime_id: int, episode_id: int) -> InlineKeyboardMarku
 # ==============================================================
 
 def search_results_keyboard(
-    results: list[dict], page: int, total_pages: int, query_type: str, query_val: str
+    results: list[AnimeSummary], page: int, total_pages: int, query_type: str, query_val: str = ""
 ) -> InlineKeyboardMarkup:
     """Qidiruv natijalari va pagination tugmalari."""
     builder = InlineKeyboardBuilder()
 
     for anime in results:
         builder.button(
-            text=f"📺 {anime['title']}",
-            callback_data=f"anime_details:{anime['id']}",
+            text=f"📺 {anime.title}",
+            callback_data=AnimeDetailsCallback(anime_id=anime.id),
         )
 
+    # So'rov matni callback_data ga sig'maydi - serverda saqlanadi
+    token = CallbackStore.put({"query": query_val}) if query_val else ""
+
     builder.adjust(1)
 
     # Pagination
@@ -140,7 +162,7 @@ def search_results_keyboard(
         nav_buttons.append(
             InlineKeyboardButton(
                 text="⬅️ Oldingi",
-                callback_data=f"search_page:{query_type}:{query_val}:{page - 1}",
+                callback_data=SearchPageCallback(kind=query_type, token=token, page=page - 1).pack(),
             )
         )
     if total_pages > 1:
@@ -154,7 +176,7 @@ def search_results_keyboard(
         nav_buttons.append(
             InlineKeyboardButton(
                 text="Keyingi ➡️",
-                callback_data=f"search_page:{query_type}:{query_val}:{page + 1}",
+                callback_data=SearchPageCallback(kind=query_type, token=token, page=page + 1).pack(),
             )
         )
 
@@ -168,13 +190,13 @@ def search_results_keyboard(
 # SEVIMLILAR RO'YXATI
 # ==============================================================
 
-def favorites_keyboard(favorites: list[dict]) -> InlineKeyboardMarkup:
+def favorites_keyboard(favorites: list[AnimeSummary]) -> InlineKeyboardMarkup:
     """Foydalanuvchi sevimlilari ro'yxati."""
     builder = InlineKeyboardBuilder()
     for anime in favorites:
         builder.button(
-            text=f"⭐️ {anime['title']}",
-            callback_data=f"anime:{anime['id']}",
+            text=f"⭐️ {anime.title}",
+            callback_data=AnimeDetailsCallback(anime_id=anime.id),
         )
     builder.adjust(1)
     if not favorites:
@@ -199,7 +221,7 @@ def shorts_keyboard(short_id: int, anime_id: int, index: int, total: int) -> Inl
         nav.append(
             InlineKeyboardButton(
                 text="⬅️ Oldingi",
-                callback_data=f"short_nav:{index - 1}",
+                callback_data=ShortNavCallback(index=index - 1).pack(),
             )
         )
     nav.append(
@@ -212,7 +234,7 @@ def shorts_keyboard(short_id: int, anime_id: int, index: int, total: int) -> Inl
         nav.append(
             InlineKeyboardButton(
                 text="Keyingi ➡️",
-                callback_data=f"short_nav:{index + 1}",
+                callback_data=ShortNavCallback(index=index + 1).pack(),
             )
         )
     buttons.append(nav)
@@ -220,7 +242,7 @@ def shorts_keyboard(short_id: int, anime_id: int, index: int, total: int) -> Inl
     buttons.append([
         InlineKeyboardButton(
             text="📺 To'liq anime",
-            callback_data=f"anime:{anime_id}",
+            callback_data=AnimeDetailsCallback(anime_id=anime_id).pack(),
         )
     ])
 
@@ -239,7 +261,7 @@ def vip_plans_keyboard(plans: list[dict], is_vip: bool = False, anime_title: str
         text = anime_title if anime_title else plan['name']
         builder.button(
             text=f"💎 {text}",
-            callback_data=f"vip_details:{plan['id']}",
+            callback_data=VipDetailsCallback(plan_id=plan["id"]),
         )
     builder.adjust(1)
     
@@ -248,7 +270,7 @@ def vip_plans_keyboard(plans: list[dict], is_vip: bool = False, anime_title: str
             InlineKeyboardButton(text="🎖 VIP Qo'llab-quvvatlash", url="https://t.me/DEV_BR0")
         )
         builder.row(
-            InlineKeyboardButton(text="🎁 Eksklyuziv animelar", callback_data="search_page:vip:all:0")
+            InlineKeyboardButton(text="🎁 Eksklyuziv animelar", callback_data=SearchPageCallback(kind="vip", token="", page=0).pack())
         )
         
     builder.row(
@@ -264,7 +286,7 @@ def vip_details_keyboard(plan: dict) -> InlineKeyboardMarkup:
     # Narx tugmasi endi to'lovga o'tkazadi
     builder.button(
         text=f"💰 {plan['price']} so'm | ⏳ {plan['duration_days']} kun",
-        callback_data=f"vip_plan:{plan['id']}"
+        callback_data=VipPlanCallback(plan_id=plan["id"])
     )
     builder.button(
         text="⬅️ Orqaga",
@@ -282,7 +304,7 @@ def vip_payment_keyboard(plan_id: int) -> InlineKeyboardMarkup:
             [
                 InlineKeyboardButton(
                     text="✅ Screenshot yubordim",
-                    callback_data=f"vip_paid:{plan_id}",
+                    callback_data=VipPaidCallback(plan_id=plan_id).pack(),
                 ),
             ],
             [
@@ -302,11 +324,11 @@ def vip_admin_approve_keyboard(user_tg_id: int, plan_id: int) -> InlineKeyboardM
             [
                 InlineKeyboardButton(
                     text="✅ Tasdiqlash",
-                    callback_data=f"vip_approve:{user_tg_id}:{plan_id}",
+                    callback_data=VipApproveCallback(user_tg_id=user_tg_id, plan_id=plan_id).pack(),
                 ),
                 InlineKeyboardButton(
                     text="❌ Rad etish",
-                    callback_data=f"vip_reject:{user_tg_id}",
+                    callback_data=VipRejectCallback(user_tg_id=user_tg_id).pack(),
                 ),
             ],
         ]
@@ -342,7 +364,7 @@ def admin_channels_keyboard(channels: list[dict]) -> InlineKeyboardMarkup:
     for ch in channels:
         builder.button(
             text=f"❌ {ch['channel_name']}",
-            callback_data=f"del_channel:{ch['channel_id']}",
+            callback_data=DeleteChannelCallback(channel_id=str(ch["channel_id"])),
         )
     builder.adjust(1)
     return builder.as_markup()
@@ -352,13 +374,13 @@ def admin_channels_keyboard(channels: list[dict]) -> InlineKeyboardMarkup:
 # ADMIN: ANIME TANLASH
 # ==============================================================
 
-def anime_select_keyboard(anime_list: list[dict], action: str) -> InlineKeyboardMarkup:
+def anime_select_keyboard(anime_list: list[AnimeSummary], action: str) -> InlineKeyboardMarkup:
     """Admin uchun anime tanlash."""
     builder = InlineKeyboardBuilder()
     for a in anime_list:
         builder.button(
-            text=f"📺 {a['title']} [{a['code']}]",
-            callback_data=f"{action}:{a['id']}",
+            text=f"📺 {a.title} [{a.code}]",
+            callback_data=AnimeSelectCallback(action=action, anime_id=a.id),
         )
     builder.adjust(1)
     return builder.as_markup()
@@ -377,7 +399,7 @@ def comments_list_keyboard(
         nav.append(
             InlineKeyboardButton(
                 text="⬅️ Oldingi",
-                callback_data=f"comments_list:{anime_id}:{page - 1}",
+                callback_data=CommentsListCallback(anime_id=anime_id, page=page - 1).pack(),
             )
         )
     if total_pages > 1:
@@ -391,7 +413,7 @@ def comments_list_keyboard(
         nav.append(
             InlineKeyboardButton(
                 text="Keyingi ➡️",
-                callback_data=f"comments_list:{anime_id}:{page + 1}",
+                callback_data=CommentsListCallback(anime_id=anime_id, page=page + 1).pack(),
             )
         )
 
@@ -401,7 +423,7 @@ def comments_list_keyboard(
     buttons.append([
         InlineKeyboardButton(
             text="⬅️ Orqaga",
-            callback_data=f"anime:{anime_id}",
+            callback_data=AnimeDetailsCallback(anime_id=anime_id).pack(),
         )
     ])
 
@@ -459,14 +481,14 @@ def admin_settings_keyboard(maintenance: str) -> InlineKeyboardMarkup:
     """Bot sozlamalari menyusi."""
     builder = InlineKeyboardBuilder()
     
-    builder.button(text="🙋‍♂️ Support Havolasi", callback_data="set_setting:support_link")
-    builder.button(text="📢 Kanal Havolasi", callback_data="set_setting:news_channel")
+    builder.button(text="🙋‍♂️ Support Havolasi", callback_data=SetSettingCallback(key="support_link"))
+    builder.button(text="📢 Kanal Havolasi", callback_data=SetSettingCallback(key="news_channel"))
     
     m_text = "🟢 Texnik ishlar: ON" if maintenance == "ON" else "🔴 Texnik ishlar: OFF"
     builder.button(text=m_text, callback_data="toggle_maintenance")
     
-    builder.button(text="💳 Karta Raqami", callback_data="set_setting:vip_card_number")
-    builder.button(text="👤 Karta Egasi (Ism)", callback_data="set_setting:vip_card_name")
+    builder.button(text="💳 Karta Raqami", callback_data=SetSettingCallback(key="vip_card_number"))
+    builder.button(text="👤 Karta Egasi (Ism)", callback_data=SetSettingCallback(key="vip_card_name"))
     
     builder.button(text="⬅️ Orqaga", callback_data="admin_dashboard")
     
@@ -481,7 +503,7 @@ def admin_manage_keyboard(admins: list) -> InlineKeyboardMarkup:
     for a in admins:
         builder.button(
             text=f"👤 {a['full_name']} ({a['role']})", 
-            callback_data=f"view_admin:{a['telegram_id']}"
+            callback_data=ViewAdminCallback(admin_id=a["telegram_id"])
         )
     
     builder.button(text="➕ Yangi Admin", callback_data="add_new_admin")
@@ -495,7 +517,7 @@ def admin_action_keyboard(admin_id: int) -> InlineKeyboardMarkup:
     """Tanlangan admin uchun amallar."""
     builder = InlineKeyboardBuilder()
     
-    builder.button(text="❌ Adminlikdan olish", callback_data=f"delete_admin:{admin_id}")
+    builder.button(text="❌ Adminlikdan olish", callback_data=DeleteAdminCallback(admin_id=admin_id))
     builder.button(text="⬅️ Orqaga", callback_data="admin_admins")
     
     builder.adjust(1)
@@ -515,24 +537,24 @@ def admin_fix_media_keyboard(context_info: str, media_type: str) -> InlineKeyboa
     if match:
         obj_id = match.group(1)
         if "Shorts" in context_info:
-            builder.button(text="🔧 Videoni yangilash", callback_data=f"fix_short:{obj_id}")
+            builder.button(text="🔧 Videoni yangilash", callback_data=FixShortCallback(short_id=int(obj_id)))
         elif "Anime" in context_info:
-            builder.button(text="🖼 Posterni yangilash", callback_data=f"fix_anime_poster:{obj_id}")
+            builder.button(text="🖼 Posterni yangilash", callback_data=FixAnimePosterCallback(anime_id=int(obj_id)))
         elif "Episode" in context_info:
-            builder.button(text="🎞 Videoni yangilash", callback_data=f"fix_ep_video:{obj_id}")
+            builder.button(text="🎞 Videoni yangilash", callback_data=FixEpisodeVideoCallback(episode_id=int(obj_id)))
             
     builder.button(text="🛠 Dashboard", callback_data="admin_dashboard")
     builder.adjust(1)
     return builder.as_markup()
 
 
-def shorts_manage_keyboard(shorts: list[dict]) -> InlineKeyboardMarkup:
+def shorts_manage_keyboard(shorts: list[ShortSummary]) -> InlineKeyboardMarkup:
     """Shorts boshqarish ro'yxati."""
     builder = InlineKeyboardBuilder()
     for s in shorts:
         builder.button(
-            text=f"🎬 {s['anime_title']} (ID: {s['id']})",
-            callback_data=f"manage_short:{s['id']}"
+            text=f"🎬 {s.anime_title} (ID: {s.id})",
+            callback_data=ManageShortCallback(short_id=s.id)
         )
     
     builder.button(text="➕ Yangi Shorts", callback_data="add_short_direct")
@@ -544,8 +566,20 @@ def shorts_manage_keyboard(shorts: list[dict]) -> InlineKeyboardMarkup:
 def short_action_keyboard(short_id: int) -> InlineKeyboardMarkup:
     """Tanlangan short uchun amallar."""
     builder = InlineKeyboardBuilder()
-    builder.button(text="📝 Videoni yangilash", callback_data=f"edit_short_video:{short_id}")
-    builder.button(text="❌ O'chirish", callback_data=f"delete_short_confirm:{short_id}")
+    builder.button(text="📝 Videoni yangilash", callback_data=EditShortVideoCallback(short_id=short_id))
+    builder.button(text="❌ O'chirish", callback_data=DeleteShortCallback(short_id=short_id))
     builder.button(text="⬅️ Orqaga", callback_data="admin_manage_shorts")
     builder.adjust(1)
     return builder.as_markup()
+
+
+def broadcast_control_keyboard(job_id: int, status: str) -> InlineKeyboardMarkup:
+    """Broadcast jarayonini boshqarish (pauza / davom ettirish / bekor qilish)."""
+    builder = InlineKeyboardBuilder()
+    if status == "paused":
+        builder.button(text="▶️ Davom ettirish", callback_data=BroadcastCallback(action="resume", job_id=job_id))
+    else:
+        builder.button(text="⏸ Pauza", callback_data=BroadcastCallback(action="pause", job_id=job_id))
+    builder.button(text="✖ Bekor qilish", callback_data=BroadcastCallback(action="cancel", job_id=job_id))
+    builder.adjust(2)
+    return builder.as_markup()
@@ -1,21 +1,43 @@
 """
 loader.py - Initializes core bot components.
-Creates Bot instance, Dispatcher, and MemoryStorage.
+Creates Bot instance, Dispatcher, and SQLite FSM storage.
 """
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
-from config import BOT_TOKEN
+from config import (
+    BOT_TOKEN, TELEGRAM_API_URL, WORKERS, WORKER_INDEX,
+    OUT_GLOBAL_RATE, OUT_CHAT_RATE, OUT_CHAT_BURST, OUT_GROUP_RATE, OUT_GROUP_BURST,
+)
+from utils.fsm_storage import SQLiteStorage
+from utils.rate_limit import OutboundLimiter
+from utils.telegram_session import ThrottledSession
+
+# ---- FSM storage (SQLite, survives restarts) ----
+storage = SQLiteStorage()
+
+# ---- Outgoing request limiter (global budget is split between workers) ----
+limiter = OutboundLimiter(
+    global_rate=OUT_GLOBAL_RATE / (WORKERS if WORKER_INDEX is not None else 1),
+    chat_rate=OUT_CHAT_RATE,
+    chat_burst=OUT_CHAT_BURST,
+    group_rate=OUT_GROUP_RATE,
+    group_burst=OUT_GROUP_BURST,
+)
 
-# ---- FSM storage (in-memory) ----
-storage = MemoryStorage()
+# ---- HTTP session (custom Bot API server if configured) ----
+if TELEGRAM_API_URL:
+    session = ThrottledSession(limiter, api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+else:
+    session = ThrottledSession(limiter)
 
 # ---- Bot instance with HTML parse mode ----
 bot = Bot(
     token=BOT_TOKEN,
+    session=session,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML),
 )
 
@@ -1,7 +1,7 @@
 """
 main.py - Botning asosiy kirish nuqtasi.
 Ma'lumotlar bazasini yaratish, routerlarni ro'yxatdan o'tkazish,
-middleware qo'shish va pollingni boshlash.
+middleware qo'shish va polling yoki webhook rejimini boshlash.
 """
 
 import asyncio
@@ -11,7 +11,7 @@ import sys
 
 from config import LOG_DIR, LOG_FILE
 from database import Database
-from loader import bot, dp
+from loader import bot, dp, storage
 
 # ---- Logging sozlash (file + console) ----
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -81,26 +81,90 @@ def register_middlewares() -> None:
     from middlewares.throttling import ThrottlingMiddleware
     from middlewares.subscription import SubscriptionMiddleware
     from middlewares.maintenance import MaintenanceMiddleware
+    from middlewares.user_context import UserContextMiddleware
+    from config import (
+        THROTTLE_MESSAGE_RATE, THROTTLE_MESSAGE_BURST,
+        THROTTLE_CALLBACK_RATE, THROTTLE_CALLBACK_BURST,
+    )
 
     dp.update.outer_middleware(LoggingMiddleware())
     dp.update.outer_middleware(MaintenanceMiddleware())
-    dp.message.middleware(ThrottlingMiddleware())
+    dp.update.outer_middleware(UserContextMiddleware())
+    dp.message.middleware(
+        ThrottlingMiddleware("message", THROTTLE_MESSAGE_RATE, THROTTLE_MESSAGE_BURST)
+    )
+    dp.callback_query.middleware(
+        ThrottlingMiddleware("callback_query", THROTTLE_CALLBACK_RATE, THROTTLE_CALLBACK_BURST)
+    )
     dp.message.middleware(SubscriptionMiddleware())
 
 
 async def on_startup() -> None:
     """Bot ishga tushganda bajariladigan funksiya."""
-    from config import DB_PATH
+    from config import DB_PATH, WORKER_INDEX, CACHE_SYNC_INTERVAL
     import os
-    
-    # Papka mavjudligini tekshirish
-    db_dir = os.path.dirname(DB_PATH)
-    os.makedirs(db_dir, exist_ok=True)
 
-    logger.info("Ma'lumotlar bazasi yaratilmoqda...")
+    # Worker jarayonlarida migratsiyalarni supervisor allaqachon bajargan -
+    # u yerda bu faqat sxema versiyasini o'qish (va FTS5 borligini aniqlash)
+    if WORKER_INDEX is None:
+        # Papka mavjudligini tekshirish
+        db_dir = os.path.dirname(DB_PATH)
+        os.makedirs(db_dir, exist_ok=True)
+
+        logger.info("Ma'lumotlar bazasi yaratilmoqda...")
     await Database.create_tables()
     logger.info("Ma'lumotlar bazasi tayyor.")
 
+    # FSM holatlarini saqlash (flush + sweeper)
+    storage.start()
+
+    # Adminlar ro'yxati va sozlamalarni xotiraga yuklash
+    from models.admin import AdminModel
+    from models.settings import SettingsModel
+    await AdminModel.load()
+    await SettingsModel.load()
+
+    # VIP muddatlari (is_vip_active bazaga murojaat qilmaydi)
+    from models.user import UserModel
+    await UserModel.load_vips()
+
+    # URL -> file_id reyestri (rasmlar Telegramga qayta yuklanmasligi uchun)
+    from models.media_cache import MediaCacheModel
+    await MediaCacheModel.load()
+
+    # Ko'rishlar hisoblagichini (write-behind) ishga tushirish
+    from models.view_counter import ViewCounter
+    ViewCounter.start()
+
+    # Boshqa workerlardagi o'zgarishlarda keshlarni tozalash
+    if WORKER_INDEX is not None:
+        from models.cache_sync import CacheSync
+        from models.catalog import CatalogCache
+        from models.channel import ChannelModel
+        CacheSync.listen(CacheSync.CATALOG, CatalogCache.clear)
+        CacheSync.listen(CacheSync.ADMINS, AdminModel.load)
+        CacheSync.listen(CacheSync.SETTINGS, SettingsModel.load)
+        CacheSync.listen(CacheSync.CHANNELS, ChannelModel.invalidate)
+        CacheSync.listen(CacheSync.MEDIA, MediaCacheModel.invalidate)
+        CacheSync.listen(CacheSync.VIP, UserModel.load_vips)
+        await CacheSync.start(CACHE_SYNC_INTERVAL)
+
+    # Uzilib qolgan broadcastlarni oxirgi joydan davom ettirish (faqat bitta jarayonda)
+    if not WORKER_INDEX:
+        from services.broadcast_service import BroadcastEngine
+        await BroadcastEngine.resume_interrupted(bot)
+
+        # Muddati tugagan VIP larni fonda bekor qilish
+        from config import VIP_SWEEP_INTERVAL
+        from services.vip_service import VipService
+        VipService.start_expiry_sweeper(VIP_SWEEP_INTERVAL)
+
+        # IMAGES rasmlarini oldindan yuklab, file_id larini saqlash (fonda)
+        from config import MEDIA_WARMUP_CHAT_ID
+        from services.media_service import MediaService
+        from utils.images import IMAGES
+        if MEDIA_WARMUP_CHAT_ID:
+            MediaService.start_warm_up(bot, MEDIA_WARMUP_CHAT_ID, list(IMAGES.values()))
 
     bot_info = await bot.get_me()
     logger.info("Bot ishga tushdi: @%s", bot_info.username)
@@ -109,11 +173,110 @@ async def on_startup() -> None:
 async def on_shutdown() -> None:
     """Bot to'xtaganda bajariladigan funksiya."""
     logger.info("Bot to'xtatilmoqda...")
+
+    # Broadcastlarni to'xtatish (progress saqlanadi, keyingi startda davom etadi)
+    from services.broadcast_service import BroadcastEngine
+    await BroadcastEngine.shutdown()
+
+    from services.media_service import MediaService
+    await MediaService.stop_warm_up()
+
+    from services.vip_service import VipService
+    await VipService.stop_expiry_sweeper()
+
+    # Yig'ilgan media xatoliklarini adminlarga yuborib qo'yish
+    from services.media_alerts import MediaAlerts
+    await MediaAlerts.stop()
+
+    from models.cache_sync import CacheSync
+    await CacheSync.stop()
+
+    # Navbatdagi foydalanuvchi upsertlarini yozish (short_views ularga bog'liq)
+    from models.user import UserModel
+    await UserModel.flush_upserts()
+
+    # Buferdagi ko'rishlarni bazaga yozib qo'yish
+    from models.view_counter import ViewCounter
+    await ViewCounter.stop()
+
+    # Buferdagi FSM holatlarini yozib qo'yish
+    await storage.close()
+
     await Database.close()
     await bot.session.close()
     logger.info("Bot to'xtatildi.")
 
 
+async def run_polling() -> None:
+    """Long polling rejimi."""
+    logger.info("Webhook tozalanmoqda va eski xabarlar o'chirilmoqda...")
+    await bot.delete_webhook(drop_pending_updates=True)
+
+    logger.info("Polling boshlanmoqda...")
+    await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+
+
+async def run_webhook() -> None:
+    """
+    Webhook rejimi - aiohttp server.
+    POST {WEBHOOK_PATH} - Telegram updatelari (secret token tekshiriladi),
+    GET /health - holat tekshiruvi. To'xtashda jarayondagi updatelar kutiladi.
+    """
+    import secrets
+    import signal
+    from aiohttp import web
+    from aiogram.webhook.aiohttp_server import setup_application
+    from config import (
+        WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET,
+        WEBAPP_HOST, WEBAPP_PORT, WEBHOOK_DRAIN_TIMEOUT,
+    )
+    from utils.webhook import DrainingRequestHandler
+
+    if not WEBHOOK_URL:
+        raise ValueError("BOT_MODE=webhook uchun WEBHOOK_URL o'rnatilishi kerak.")
+
+    # Secret berilmagan bo'lsa har ishga tushishda yangisi yaratiladi
+    secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+
+    app = web.Application()
+    handler = DrainingRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret,
+        drain_timeout=WEBHOOK_DRAIN_TIMEOUT,
+    )
+    # Handler dp.shutdown dan oldin ro'yxatdan o'tadi - avval updatelar tugaydi,
+    # keyin baza yopiladi
+    handler.register(app, path=WEBHOOK_PATH)
+    app.router.add_get("/health", handler.health)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT)
+    await site.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    try:
+        await bot.set_webhook(
+            url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info("Webhook ishga tushdi: %s%s (port %s)", WEBHOOK_URL, WEBHOOK_PATH, WEBAPP_PORT)
+        await stop.wait()
+    finally:
+        logger.info("Webhook server to'xtatilmoqda...")
+        await runner.cleanup()
+
+
 async def main() -> None:
     """Asosiy funksiya - botni ishga tushirish."""
     register_routers()
@@ -122,8 +285,7 @@ async def main() -> None:
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
-    from config import BOT_TOKEN
-
+    from config import BOT_TOKEN, BOT_MODE, WORKERS
 
     try:
         # Bot username ni olish (tokenni tekshirish)
@@ -133,12 +295,14 @@ async def main() -> None:
         logger.info(f"TOKEN: {BOT_TOKEN[:10]}...{BOT_TOKEN[-5:]}")
         logger.info("="*40)
 
-        logger.info("Webhook tozalanmoqda va eski xabarlar o'chirilmoqda...")
-        await bot.delete_webhook(drop_pending_updates=True)
-        
-        logger.info("Polling boshlanmoqda...")
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
-
+        if WORKERS > 1:
+            # Supervisor: updatelar worker jarayonlarga taqsimlanadi
+            from supervisor import run_supervisor
+            await run_supervisor(BOT_MODE)
+        elif BOT_MODE == "webhook":
+            await run_webhook()
+        else:
+            await run_polling()
 
     except Exception as e:
         logger.critical("Bot ishga tushishda xatolik: %s", str(e))
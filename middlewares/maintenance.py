@@ -6,6 +6,7 @@ from aiogram.types import Message, Update
 from models.settings import SettingsModel
 from models.admin import AdminModel
 from utils.images import IMAGES
+from services.media_service import MediaService
 
 logger = logging.getLogger(__name__)
 
@@ -13,24 +14,33 @@ logger = logging.getLogger(__name__)
 class MaintenanceMiddleware(BaseMiddleware):
     """Botda texnik ishlar ketayotganini tekshirish."""
 
+    def __init__(self) -> None:
+        # Texnik ishlar rejimi SettingsModel obunasi orqali yangilanadi
+        self.maintenance = False
+        SettingsModel.subscribe(self._on_setting)
+
+    def _on_setting(self, key: str, value: str) -> None:
+        if key == "maintenance_mode":
+            self.maintenance = value == "ON"
+
     async def __call__(
         self,
         handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
         event: Update,
         data: Dict[str, Any],
     ) -> Any:
-        # Faqat xabarlar (Message) uchun tekshiramiz
-        if not isinstance(event, Message):
-            return await handler(event, data)
+        # Admin ekanligini bir marta aniqlab, filtrlar uchun data ga qo'yamiz
+        user = data.get("event_from_user")
+        is_admin = await AdminModel.is_admin(user.id) if user else False
+        data["is_admin"] = is_admin
 
-        # Admin ekanligini tekshirish
-        is_admin = await AdminModel.is_admin(event.from_user.id)
-        if is_admin:
+        # Faqat xabarlar (Message) uchun tekshiramiz
+        message = event.message if isinstance(event, Update) else event
+        if not isinstance(message, Message) or is_admin:
             return await handler(event, data)
 
         # Texnik ishlar rejimini tekshirish
-        maintenance = await SettingsModel.get("maintenance_mode", "OFF")
-        if maintenance == "ON":
+        if self.maintenance:
             caption = (
                 "🛠 <b>TEXNIK ISHLAR</b>\n"
                 "━━━━━━━━━━━━━━━━━━\n\n"
@@ -38,13 +48,13 @@ class MaintenanceMiddleware(BaseMiddleware):
                 "⏳ <i>Iltimos, birozdan so'ng qayta urinib ko'ring. Noqulayliklar uchun uzr so'raymiz!</i>"
             )
             try:
-                await event.answer_photo(
-                    photo=IMAGES["MAINTENANCE"],
-                    caption=caption
+                await MediaService.deliver(
+                    lambda photo: message.answer_photo(photo=photo, caption=caption),
+                    IMAGES["MAINTENANCE"], "photo"
                 )
             except Exception as e:
                 logger.error(f"Error sending maintenance photo: {e}")
-                await event.answer(caption)
+                await message.answer(caption)
             return
 
         return await handler(event, data)
@@ -1,8 +1,11 @@
 """
 middlewares/subscription.py - Majburiy obuna tekshirish middleware.
 Foydalanuvchi barcha kanallarga obuna bo'lganini tekshiradi.
+Natijalar (user_id, channel_id) bo'yicha TTL bilan keshlanadi,
+keshda yo'q kanallar parallel tekshiriladi.
 """
 
+import asyncio
 import logging
 from typing import Any, Awaitable, Callable, Dict
 
@@ -10,8 +13,10 @@ from aiogram import BaseMiddleware, Bot
 from aiogram.types import Message
 from aiogram.enums import ChatMemberStatus
 
+from config import SUBSCRIPTION_TTL, SUBSCRIPTION_NEGATIVE_TTL, SUBSCRIPTION_CACHE_SIZE
 from models.channel import ChannelModel
 from keyboards.inline import subscription_keyboard
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +24,37 @@ logger = logging.getLogger(__name__)
 class SubscriptionMiddleware(BaseMiddleware):
     """Foydalanuvchining barcha majburiy kanallarga obuna bo'lganini tekshirish."""
 
+    # (user_id, channel_id) -> obuna bo'lganmi (True/False)
+    _cache = TTLCache(maxsize=SUBSCRIPTION_CACHE_SIZE)
+
+    @classmethod
+    async def _is_member(cls, bot: Bot, user_id: int, channel_id: str) -> bool:
+        """Bitta kanalga a'zolikni Telegramdan tekshirish va keshlash."""
+        try:
+            member = await bot.get_chat_member(chat_id=channel_id, user_id=user_id)
+        except Exception as e:
+            logger.warning(
+                "Kanal tekshirishda xatolik | channel=%s | xato=%s",
+                channel_id,
+                str(e),
+            )
+            # Tekshirib bo'lmasa foydalanuvchini to'smaymiz (keshlanmaydi)
+            return True
+
+        subscribed = member.status not in (
+            ChatMemberStatus.LEFT,
+            ChatMemberStatus.KICKED,
+        )
+        ttl = SUBSCRIPTION_TTL if subscribed else SUBSCRIPTION_NEGATIVE_TTL
+        cls._cache.set((user_id, channel_id), subscribed, ttl)
+        return subscribed
+
+    @classmethod
+    def forget_user(cls, user_id: int, channels: list[dict]) -> None:
+        """Foydalanuvchining keshlangan natijalarini o'chirish."""
+        for ch in channels:
+            cls._cache.pop((user_id, ch["channel_id"]))
+
     async def __call__(
         self,
         handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
@@ -37,32 +73,32 @@ class SubscriptionMiddleware(BaseMiddleware):
             # Majburiy obuna kanallari yo'q
             return await handler(event, data)
 
-        # Har bir kanalni tekshirish
+        # Avval keshdan, qolganlarini parallel tekshirish
         not_subscribed = []
+        unknown = []
         for ch in channels:
-            try:
-                member = await bot.get_chat_member(
-                    chat_id=ch["channel_id"],
-                    user_id=user.id,
-                )
-                if member.status in (
-                    ChatMemberStatus.LEFT,
-                    ChatMemberStatus.KICKED,
-                ):
-                    not_subscribed.append(ch)
-            except Exception as e:
-                logger.warning(
-                    "Kanal tekshirishda xatolik | channel=%s | xato=%s",
-                    ch["channel_id"],
-                    str(e),
-                )
+            cached = self._cache.get((user.id, ch["channel_id"]))
+            if cached is None:
+                unknown.append(ch)
+            elif not cached:
+                not_subscribed.append(ch)
+
+        if unknown:
+            results = await asyncio.gather(
+                *(self._is_member(bot, user.id, ch["channel_id"]) for ch in unknown)
+            )
+            not_subscribed.extend(ch for ch, ok in zip(unknown, results) if not ok)
 
         if not_subscribed:
+            # Kanallar tartibini saqlash
+            missing = {ch["channel_id"] for ch in not_subscribed}
             await event.answer(
                 "<b>🔒 Majburiy obuna</b>\n"
                 "━━━━━━━━━━━━━━━━━━\n\n"
                 "Botdan foydalanish uchun quyidagi kanallarga obuna bo'ling:\n",
-                reply_markup=subscription_keyboard(not_subscribed),
+                reply_markup=subscription_keyboard(
+                    [ch for ch in channels if ch["channel_id"] in missing]
+                ),
             )
             return  # Handlerga o'tkazmaslik
 
@@ -1,47 +1,79 @@
 """
 middlewares/throttling.py - Tezlikni cheklash (rate limiting) middleware.
 Spam va flood xabarlarni oldini oladi.
+Har bir foydalanuvchi uchun token bucket ishlatiladi; xabarlar va
+callback querylar uchun alohida limitlar bor.
 """
 
-import time
 import logging
+from collections import OrderedDict
 from typing import Any, Awaitable, Callable, Dict
 
 from aiogram import BaseMiddleware
-from aiogram.types import Message
+from aiogram.types import TelegramObject
+
+from config import THROTTLE_STORE_SIZE
+from utils.rate_limit import KeyedRateLimiter
 
 logger = logging.getLogger(__name__)
 
-# Har bir foydalanuvchi uchun oxirgi xabar vaqtini saqlash
-_user_last_message: Dict[int, float] = {}
 
-# Minimal interval (soniyada)
-THROTTLE_RATE: float = 0.5
+class ThrottlingMiddleware(BaseMiddleware):
+    """Foydalanuvchi xabarlari / callbacklarini tezlik bo'yicha cheklash."""
+
+    # user_id -> {kind: tashlab yuborilgan eventlar soni}, eng eskisi birinchi
+    _dropped: OrderedDict[int, Dict[str, int]] = OrderedDict()
 
+    def __init__(self, kind: str, rate: float, burst: float) -> None:
+        """
+        kind  - event turi nomi (statistika uchun): "message", "callback_query"
+        rate  - soniyasiga ruxsat etilgan eventlar
+        burst - ketma-ket ruxsat etilgan maksimal eventlar
+        """
+        self.kind = kind
+        self.limiter = KeyedRateLimiter(rate, burst, maxsize=THROTTLE_STORE_SIZE)
 
-class ThrottlingMiddleware(BaseMiddleware):
-    """Foydalanuvchi xabarlarini tezlik bo'yicha cheklash."""
+    @classmethod
+    def _count_drop(cls, user_id: int, kind: str) -> int:
+        counters = cls._dropped.pop(user_id, None) or {}
+        counters[kind] = counters.get(kind, 0) + 1
+        cls._dropped[user_id] = counters
+        if len(cls._dropped) > THROTTLE_STORE_SIZE:
+            cls._dropped.popitem(last=False)
+        return counters[kind]
+
+    @classmethod
+    def dropped_stats(cls, limit: int = 10) -> list[tuple[int, Dict[str, int]]]:
+        """Eng ko'p cheklangan foydalanuvchilar: [(user_id, {kind: count}), ...]."""
+        ranked = sorted(
+            cls._dropped.items(), key=lambda item: sum(item[1].values()), reverse=True
+        )
+        return [(user_id, dict(counters)) for user_id, counters in ranked[:limit]]
+
+    @classmethod
+    def get_dropped(cls, user_id: int) -> Dict[str, int]:
+        """Bitta foydalanuvchining cheklangan eventlari soni."""
+        return dict(cls._dropped.get(user_id, {}))
 
     async def __call__(
         self,
-        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
-        event: Message,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        """Agar foydalanuvchi juda tez xabar yuborayotgan bo'lsa, e'tiborga olmaslik."""
-        user = event.from_user
+        """Agar foydalanuvchi juda tez yuborayotgan bo'lsa, e'tiborga olmaslik."""
+        user = getattr(event, "from_user", None)
         if user is None:
             return await handler(event, data)
 
-        user_id = user.id
-        now = time.time()
-        last_time = _user_last_message.get(user_id, 0)
-
-        if now - last_time < THROTTLE_RATE:
-            logger.warning(
-                "Throttle | user_id=%s | juda tez xabar yubormoqda", user_id
-            )
-            return  # Xabarni e'tiborga olmaslik
+        if not self.limiter.hit(user.id):
+            count = self._count_drop(user.id, self.kind)
+            # Logni to'ldirmaslik uchun faqat har 10-chisini yozamiz
+            if count % 10 == 1:
+                logger.warning(
+                    "Throttle | user_id=%s | %s | juda tez (jami: %s)",
+                    user.id, self.kind, count,
+                )
+            return  # Eventni e'tiborga olmaslik
 
-        _user_last_message[user_id] = now
         return await handler(event, data)
@@ -0,0 +1,42 @@
+"""
+middlewares/user_context.py - Joriy foydalanuvchini aniqlash middleware.
+Har bir update uchun foydalanuvchi bir marta (xotiradagi LRU dan)
+aniqlanadi va handlerlarga data["db_user"] sifatida beriladi.
+Yangi foydalanuvchilar shu yerda ro'yxatdan o'tkaziladi.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from models.user import UserModel
+
+logger = logging.getLogger(__name__)
+
+
+class UserContextMiddleware(BaseMiddleware):
+    """data["db_user"] ga UserContext qo'yish (botlar va user yo'q updatelar uchun None)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        db_user = None
+        if user is not None and not user.is_bot:
+            try:
+                db_user = await UserModel.get_context(
+                    user.id,
+                    user.full_name,
+                    user.username,
+                    # MaintenanceMiddleware allaqachon aniqlagan
+                    is_admin=data.get("is_admin", False),
+                )
+            except Exception as e:
+                logger.error(f"Foydalanuvchini aniqlab bo'lmadi ({user.id}): {e}")
+        data["db_user"] = db_user
+        return await handler(event, data)
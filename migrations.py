@@ -0,0 +1,422 @@
+"""
+migrations.py - Versioned schema migrations.
+Each step has a version number and runs once, in its own transaction; the
+schema_version table records what was applied and how long it took.
+Startup on an up-to-date database is a single version read.
+
+To change the schema, append a step - never edit one that has shipped.
+A step that cannot run yet raises MigrationDeferred; it is not recorded
+and is retried on the next start.
+"""
+
+import logging
+import time
+from typing import Awaitable, Callable, NamedTuple
+
+import aiosqlite
+
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationDeferred(Exception):
+    """Raised by a step that cannot be applied in this environment (yet)."""
+
+
+class Migration(NamedTuple):
+    """One schema step. `analyze` refreshes planner statistics after the run."""
+
+    version: int
+    name: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+    analyze: bool = False
+
+
+def _sql(*statements: str) -> Callable[[aiosqlite.Connection], Awaitable[None]]:
+    """Build a step from plain statements (executescript would commit mid-step)."""
+    async def apply(db: aiosqlite.Connection) -> None:
+        for statement in statements:
+            await db.execute(statement)
+    return apply
+
+
+async def _add_column(db: aiosqlite.Connection, table: str, column: str, ddl: str) -> None:
+    """ALTER TABLE ... ADD COLUMN unless the column already exists."""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    if column not in {row["name"] for row in await cursor.fetchall()}:
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# ---- Steps ----
+
+_base_schema = _sql(
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        telegram_id INTEGER UNIQUE NOT NULL,
+        full_name TEXT NOT NULL DEFAULT '',
+        username TEXT DEFAULT '',
+        is_vip INTEGER NOT NULL DEFAULT 0,
+        vip_expire_date TEXT DEFAULT NULL,
+        joined_date TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS anime (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        code TEXT UNIQUE NOT NULL,
+        description TEXT DEFAULT '',
+        genre TEXT DEFAULT '',
+        season_count INTEGER NOT NULL DEFAULT 1,
+        total_episodes INTEGER NOT NULL DEFAULT 0,
+        poster_file_id TEXT DEFAULT '',
+        poster_url TEXT DEFAULT '',
+        status TEXT DEFAULT 'Tugallangan',
+        translator TEXT DEFAULT 'AniBro',
+        is_vip INTEGER NOT NULL DEFAULT 0,
+        views INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS episodes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        anime_id INTEGER NOT NULL,
+        season_number INTEGER NOT NULL DEFAULT 1,
+        episode_number INTEGER NOT NULL,
+        title TEXT DEFAULT '',
+        video_file_id TEXT NOT NULL,
+        is_vip INTEGER NOT NULL DEFAULT 0,
+        views INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS favorites (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        anime_id INTEGER NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE,
+        UNIQUE(user_id, anime_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        anime_id INTEGER NOT NULL,
+        comment_text TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS channels (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel_id TEXT UNIQUE NOT NULL,
+        channel_name TEXT NOT NULL DEFAULT '',
+        channel_link TEXT NOT NULL DEFAULT '',
+        added_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vip_plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        price INTEGER NOT NULL,
+        duration_days INTEGER NOT NULL,
+        card_number TEXT DEFAULT ''
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS admins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        telegram_id INTEGER UNIQUE NOT NULL,
+        full_name TEXT DEFAULT '',
+        role TEXT DEFAULT 'admin',
+        added_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS shorts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        anime_id INTEGER NOT NULL,
+        short_video_file_id TEXT NOT NULL,
+        views INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS short_views (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        short_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        viewed_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (short_id) REFERENCES shorts(id) ON DELETE CASCADE,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        UNIQUE(short_id, user_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_anime_code ON anime(code)",
+    "CREATE INDEX IF NOT EXISTS idx_anime_genre ON anime(genre)",
+    "CREATE INDEX IF NOT EXISTS idx_anime_views ON anime(views DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_anime_created ON anime(created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_episodes_anime ON episodes(anime_id)",
+    "CREATE INDEX IF NOT EXISTS idx_episodes_views ON episodes(views DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_favorites_user ON favorites(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_comments_anime ON comments(anime_id)",
+    "CREATE INDEX IF NOT EXISTS idx_shorts_anime ON shorts(anime_id)",
+    "CREATE INDEX IF NOT EXISTS idx_shorts_views ON shorts(views DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_short_views_short ON short_views(short_id)",
+    "CREATE INDEX IF NOT EXISTS idx_users_joined ON users(joined_date DESC)",
+)
+
+
+async def _anime_poster_url(db: aiosqlite.Connection) -> None:
+    await _add_column(db, "anime", "poster_url", "TEXT DEFAULT ''")
+
+
+async def _channels_channel_name(db: aiosqlite.Connection) -> None:
+    await _add_column(db, "channels", "channel_name", "TEXT DEFAULT ''")
+
+
+async def _anime_status_translator(db: aiosqlite.Connection) -> None:
+    await _add_column(db, "anime", "status", "TEXT DEFAULT 'Tugallangan'")
+    await _add_column(db, "anime", "translator", "TEXT DEFAULT 'AniBro'")
+
+
+async def _anime_fts(db: aiosqlite.Connection) -> None:
+    """FTS5 index over anime title/description/genre, kept in sync by triggers."""
+    try:
+        await db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS anime_fts USING fts5(
+                title, description, genre,
+                content='anime', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except aiosqlite.OperationalError as e:
+        # sqlite FTS5 siz kompilyatsiya qilingan - LIKE qidiruvi ishlatiladi
+        raise MigrationDeferred(f"FTS5 is not available, falling back to LIKE search: {e}") from e
+
+    await _sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS anime_fts_ai AFTER INSERT ON anime BEGIN
+            INSERT INTO anime_fts (rowid, title, description, genre)
+            VALUES (new.id, new.title, new.description, new.genre);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS anime_fts_ad AFTER DELETE ON anime BEGIN
+            INSERT INTO anime_fts (anime_fts, rowid, title, description, genre)
+            VALUES ('delete', old.id, old.title, old.description, old.genre);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS anime_fts_au AFTER UPDATE OF title, description, genre ON anime BEGIN
+            INSERT INTO anime_fts (anime_fts, rowid, title, description, genre)
+            VALUES ('delete', old.id, old.title, old.description, old.genre);
+            INSERT INTO anime_fts (rowid, title, description, genre)
+            VALUES (new.id, new.title, new.description, new.genre);
+        END
+        """,
+        "INSERT INTO anime_fts (anime_fts) VALUES ('rebuild')",
+    )(db)
+
+
+_broadcast_jobs = _sql(
+    """
+    CREATE TABLE IF NOT EXISTS broadcast_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_chat_id INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        admin_chat_id INTEGER NOT NULL,
+        status_message_id INTEGER DEFAULT NULL,
+        status TEXT NOT NULL DEFAULT 'running',
+        last_user_id INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        sent INTEGER NOT NULL DEFAULT 0,
+        blocked INTEGER NOT NULL DEFAULT 0,
+        errors INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        finished_at TEXT DEFAULT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS broadcast_recipients (
+        job_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        PRIMARY KEY (job_id, user_id),
+        FOREIGN KEY (job_id) REFERENCES broadcast_jobs(id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_broadcast_jobs_status ON broadcast_jobs(status)",
+)
+
+_fsm_storage = _sql(
+    """
+    CREATE TABLE IF NOT EXISTS fsm_storage (
+        key TEXT PRIMARY KEY,
+        state TEXT DEFAULT NULL,
+        data TEXT NOT NULL DEFAULT '{}',
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_fsm_storage_expires ON fsm_storage(expires_at)",
+)
+
+_cache_versions = _sql(
+    """
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+)
+
+_media_cache = _sql(
+    """
+    CREATE TABLE IF NOT EXISTS media_cache (
+        url TEXT PRIMARY KEY,
+        file_id TEXT NOT NULL,
+        media_type TEXT NOT NULL,
+        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+    ) WITHOUT ROWID
+    """,
+)
+
+# (views, id) / (created_at, id) replace the single-column indexes;
+# keyset pages order by both columns
+_anime_keyset_indexes = _sql(
+    "CREATE INDEX IF NOT EXISTS idx_anime_views_id ON anime(views, id)",
+    "CREATE INDEX IF NOT EXISTS idx_anime_created_id ON anime(created_at, id)",
+    "DROP INDEX IF EXISTS idx_anime_views",
+    "DROP INDEX IF EXISTS idx_anime_created",
+)
+
+# idx_episodes_anime is a prefix of the composite index
+_episodes_season_index = _sql(
+    """
+    CREATE INDEX IF NOT EXISTS idx_episodes_anime_season
+        ON episodes(anime_id, season_number, episode_number)
+    """,
+    "DROP INDEX IF EXISTS idx_episodes_anime",
+)
+
+_users_vip_expire_index = _sql(
+    "CREATE INDEX IF NOT EXISTS idx_users_vip_expire ON users(vip_expire_date) WHERE is_vip = 1",
+)
+
+
+async def _broadcast_jobs_owner(db: aiosqlite.Connection) -> None:
+    await _add_column(db, "broadcast_jobs", "owner", "TEXT DEFAULT NULL")
+
+
+# Ordered by version; versions are never reused or renumbered
+MIGRATIONS: list[Migration] = [
+    Migration(1, "base_schema", _base_schema),
+    Migration(2, "anime_poster_url", _anime_poster_url),
+    Migration(3, "channels_channel_name", _channels_channel_name),
+    Migration(4, "anime_status_translator", _anime_status_translator),
+    Migration(5, "anime_fts", _anime_fts, analyze=True),
+    Migration(6, "broadcast_jobs", _broadcast_jobs),
+    Migration(7, "fsm_storage", _fsm_storage),
+    Migration(8, "cache_versions", _cache_versions),
+    Migration(9, "media_cache", _media_cache),
+    Migration(10, "anime_keyset_indexes", _anime_keyset_indexes, analyze=True),
+    Migration(11, "episodes_season_index", _episodes_season_index, analyze=True),
+    Migration(12, "users_vip_expire_index", _users_vip_expire_index, analyze=True),
+    Migration(13, "broadcast_jobs_owner", _broadcast_jobs_owner),
+]
+
+
+# ---- Runner ----
+
+async def read_state(db: aiosqlite.Connection) -> tuple[int, bool]:
+    """Return (number of applied steps, anime_fts exists) with one query.
+
+    The count rather than the highest version is compared with MIGRATIONS,
+    so a deferred step keeps the database pending.
+    """
+    try:
+        cursor = await db.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM schema_version),
+                EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'anime_fts')
+        """)
+    except aiosqlite.OperationalError:
+        # No schema_version yet: a fresh database (or one from before migrations)
+        return 0, False
+    applied, has_fts = await cursor.fetchone()
+    return applied, bool(has_fts)
+
+
+async def migrate() -> tuple[int, bool]:
+    """Apply pending steps in order; returns the state afterwards (see read_state).
+
+    Every step runs in its own BEGIN IMMEDIATE transaction through
+    Database.write(), so the write lock is released between steps
+    (index builds on large tables do not hold it for the whole run)
+    and WAL readers keep working meanwhile. The version is re-checked
+    inside the transaction, so concurrent runners apply each step once.
+    A step that raises MigrationDeferred is rolled back and left pending.
+    """
+    db = await Database.connect()
+    applied, has_fts = await read_state(db)
+    if applied >= len(MIGRATIONS):
+        return applied, has_fts
+
+    async with Database.write() as db:
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TEXT NOT NULL DEFAULT (datetime('now')),
+                duration_ms REAL NOT NULL
+            )
+        """)
+        cursor = await db.execute("SELECT version FROM schema_version")
+        done = {row["version"] for row in await cursor.fetchall()}
+
+    analyze = False
+    for step in MIGRATIONS:
+        if step.version in done:
+            continue
+        started = time.perf_counter()
+        try:
+            async with Database.write() as db:
+                cursor = await db.execute("SELECT 1 FROM schema_version WHERE version = ?", (step.version,))
+                if await cursor.fetchone() is not None:
+                    continue
+                await step.apply(db)
+                duration_ms = (time.perf_counter() - started) * 1000
+                await db.execute(
+                    "INSERT INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)",
+                    (step.version, step.name, duration_ms),
+                )
+        except MigrationDeferred as e:
+            logger.warning("Migration %s (%s) deferred: %s", step.version, step.name, e)
+            continue
+        analyze = analyze or step.analyze
+        logger.info("Migration %s (%s) applied in %.1f ms", step.version, step.name, duration_ms)
+
+    if analyze:
+        started = time.perf_counter()
+        async with Database.write() as db:
+            await db.execute("ANALYZE")
+        logger.info("ANALYZE finished in %.1f ms", (time.perf_counter() - started) * 1000)
+
+    return await read_state(await Database.connect())
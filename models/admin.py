@@ -4,56 +4,71 @@ models/admin.py - Adminlarni boshqarish modeli.
 
 from database import Database
 from config import ADMIN_IDS
+from models.cache_sync import CacheSync
 
 
 class AdminModel:
     """Adminlar jadvali bilan ishlash."""
 
+    # Bazadagi adminlar telegram_id lari (xotirada); None - hali yuklanmagan
+    _ids: set[int] | None = None
+
+    @staticmethod
+    async def load() -> set[int]:
+        """Bazadagi adminlar ro'yxatini xotiraga yuklash."""
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT telegram_id FROM admins")
+            rows = await cursor.fetchall()
+        AdminModel._ids = {r["telegram_id"] for r in rows}
+        return AdminModel._ids
+
     @staticmethod
     async def is_admin(telegram_id: int) -> bool:
         """Foydalanuvchi admin ekanligini tekshirish."""
         # Avval config dagi asosiy adminlarni tekshiramiz
         if telegram_id in ADMIN_IDS:
             return True
-        
-        # Keyin bazadagi qo'shilgan adminlarni tekshiramiz
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT 1 FROM admins WHERE telegram_id = ?", (telegram_id,)
-        )
-        row = await cursor.fetchone()
-        return row is not None
+
+        # Keyin bazadagi qo'shilgan adminlarni (xotiradagi nusxadan)
+        ids = AdminModel._ids
+        if ids is None:
+            ids = await AdminModel.load()
+        return telegram_id in ids
 
     @staticmethod
     async def add_admin(telegram_id: int, full_name: str = "", role: str = "admin") -> bool:
         """Yangi admin qo'shish."""
-        db = await Database.connect()
-        try:
-            # INSERT OR IGNORE ishlatishimiz mumkin, lekin errorni bilish yaxshi
-            await db.execute(
-                "INSERT INTO admins (telegram_id, full_name, role) VALUES (?, ?, ?)",
-                (int(telegram_id), str(full_name), str(role)),
-            )
-            await db.commit()
-            return True
-        except Exception as e:
-            from main import logger
-            logger.error(f"Admin qo'shishda xato: {e}")
-            return False
+        async with Database.write() as db:
+            try:
+                # INSERT OR IGNORE ishlatishimiz mumkin, lekin errorni bilish yaxshi
+                await db.execute(
+                    "INSERT INTO admins (telegram_id, full_name, role) VALUES (?, ?, ?)",
+                    (int(telegram_id), str(full_name), str(role)),
+                )
+                await CacheSync.bump(db, CacheSync.ADMINS)
+                added = True
+            except Exception as e:
+                from main import logger
+                logger.error(f"Admin qo'shishda xato: {e}")
+                added = False
+        if added:
+            await AdminModel.load()
+        return added
 
 
     @staticmethod
     async def remove_admin(telegram_id: int) -> bool:
         """Adminni o'chirish."""
-        db = await Database.connect()
-        await db.execute("DELETE FROM admins WHERE telegram_id = ?", (telegram_id,))
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute("DELETE FROM admins WHERE telegram_id = ?", (telegram_id,))
+            await CacheSync.bump(db, CacheSync.ADMINS)
+        await AdminModel.load()
         return True
 
     @staticmethod
     async def get_all() -> list[dict]:
         """Barcha adminlarni olish."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM admins ORDER BY added_at DESC")
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM admins ORDER BY added_at DESC")
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
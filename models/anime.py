@@ -3,12 +3,45 @@ models/anime.py - Anime model with async CRUD operations.
 Handles anime creation, editing, deletion, search, and view counting.
 """
 
+import re
+from typing import NamedTuple
+
+import aiosqlite
+
 from database import Database
+from config import SEARCH_VIEWS_WEIGHT, SEARCH_VIEWS_HALF
+from models.view_counter import ViewCounter
+from models.catalog import CatalogCache
+from models.cache_sync import CacheSync
+
+
+class AnimeSummary(NamedTuple):
+    """Compact anime record for list views (no description or file ids)."""
+
+    id: int
+    title: str
+    code: str
+    views: int
+    status: str | None
+    created_at: str
 
 
 class AnimeModel:
     """Provides async database operations for the anime table."""
 
+    # Columns read for list views, in AnimeSummary field order
+    SUMMARY_COLUMNS = "id, title, code, views, status, created_at"
+
+    # Paged listings: kind -> (WHERE clause, keyset columns). Rows are ordered
+    # by the keyset columns descending; the last one is always the unique id.
+    LISTINGS: dict[str, tuple[str, tuple[str, str]]] = {
+        "top": ("1", ("views", "id")),
+        "latest": ("1", ("created_at", "id")),
+        "vip": ("is_vip = 1", ("created_at", "id")),
+        "genre": ("genre LIKE ?", ("views", "id")),
+        "title": ("title LIKE ?", ("views", "id")),
+    }
+
     @staticmethod
     async def create(
         title: str,
@@ -31,46 +64,61 @@ class AnimeModel:
         if not poster_file_id and not poster_url:
             raise ValueError("Anime uchun poster (file_id yoki URL) talab qilinadi!")
 
-        db = await Database.connect()
-        cursor = await db.execute(
-            """
-            INSERT INTO anime (title, code, description, genre, season_count,
-                               total_episodes, poster_file_id, poster_url, status, translator, is_vip)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                str(title).strip(), 
-                str(code).strip().lower(), 
-                str(description).strip(), 
-                str(genre).strip(), 
-                int(season_count), 
-                int(total_episodes), 
-                str(poster_file_id).strip(), 
-                str(poster_url).strip(), 
-                str(status).strip(),
-                str(translator).strip(),
-                int(is_vip)
-            ),
-        )
-        await db.commit()
-        return cursor.lastrowid
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO anime (title, code, description, genre, season_count,
+                                   total_episodes, poster_file_id, poster_url, status, translator, is_vip)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    str(title).strip(), 
+                    str(code).strip().lower(), 
+                    str(description).strip(), 
+                    str(genre).strip(), 
+                    int(season_count), 
+                    int(total_episodes), 
+                    str(poster_file_id).strip(), 
+                    str(poster_url).strip(), 
+                    str(status).strip(),
+                    str(translator).strip(),
+                    int(is_vip)
+                ),
+            )
+            return cursor.lastrowid
 
 
     @staticmethod
     async def get_by_id(anime_id: int) -> dict | None:
-        """Fetch an anime by its internal ID."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM anime WHERE id = ?", (anime_id,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        """Fetch an anime by its internal ID (served from CatalogCache when possible)."""
+        anime = CatalogCache.get_anime(anime_id)
+        if anime is None:
+            generation = CatalogCache.generation()
+            async with Database.read() as db:
+                cursor = await db.execute("SELECT * FROM anime WHERE id = ?", (anime_id,))
+                row = await cursor.fetchone()
+            if not row:
+                return None
+            anime = dict(row)
+            CatalogCache.put_anime(anime, generation)
+        return ViewCounter.apply("anime", anime)
 
     @staticmethod
     async def get_by_code(code: str) -> dict | None:
-        """Fetch an anime by its unique code."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM anime WHERE code = ?", (code,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        """Fetch an anime by its unique code (served from CatalogCache when possible)."""
+        anime_id = CatalogCache.get_anime_id(code)
+        if anime_id is not None:
+            return await AnimeModel.get_by_id(anime_id)
+
+        generation = CatalogCache.generation()
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM anime WHERE code = ?", (code,))
+            row = await cursor.fetchone()
+        if not row:
+            return None
+        anime = dict(row)
+        CatalogCache.put_anime(anime, generation)
+        return ViewCounter.apply("anime", anime)
 
     @staticmethod
     async def update(anime_id: int, **kwargs) -> None:
@@ -92,104 +140,176 @@ class AnimeModel:
             
         set_clause = ", ".join(f"{k} = ?" for k in kwargs)
         values = list(kwargs.values()) + [anime_id]
-        db = await Database.connect()
-        await db.execute(f"UPDATE anime SET {set_clause} WHERE id = ?", values)
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute(f"UPDATE anime SET {set_clause} WHERE id = ?", values)
+            await CacheSync.bump(db, CacheSync.CATALOG)
+        CatalogCache.invalidate_anime(anime_id)
 
 
     @staticmethod
     async def delete(anime_id: int) -> None:
         """Delete an anime record by its ID."""
-        db = await Database.connect()
-        await db.execute("DELETE FROM anime WHERE id = ?", (anime_id,))
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute("DELETE FROM anime WHERE id = ?", (anime_id,))
+            await CacheSync.bump(db, CacheSync.CATALOG)
+        # Qismlar ON DELETE CASCADE bilan o'chadi
+        CatalogCache.invalidate_anime(anime_id)
+        CatalogCache.invalidate_episodes(anime_id)
 
     @staticmethod
     async def increment_views(anime_id: int) -> None:
-        """Increment the view count of an anime by 1."""
-        db = await Database.connect()
-        await db.execute("UPDATE anime SET views = views + 1 WHERE id = ?", (anime_id,))
-        await db.commit()
-
-    @staticmethod
-    async def search_by_title(query: str, limit: int = 20) -> list[dict]:
-        """Search anime by title using LIKE pattern matching."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime WHERE title LIKE ? ORDER BY views DESC LIMIT ?",
-            (f"%{query}%", limit),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        """Increment the view count of an anime by 1 (buffered, see ViewCounter)."""
+        ViewCounter.add("anime", anime_id)
 
     @staticmethod
-    async def search_by_genre(genre: str, limit: int = 20) -> list[dict]:
-        """Search anime by genre using LIKE pattern matching."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime WHERE genre LIKE ? ORDER BY views DESC LIMIT ?",
-            (f"%{genre}%", limit),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+    def _fts_query(query: str) -> str:
+        """Build an FTS5 MATCH expression: every word as a quoted prefix term."""
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{w}"*' for w in words)
 
     @staticmethod
-    async def get_top(limit: int = 10) -> list[dict]:
-        """Get the most viewed anime."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime ORDER BY views DESC LIMIT ?", (limit,)
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+    def _listing_params(kind: str, value: str) -> tuple[str, tuple[str, str], list]:
+        where, keys = AnimeModel.LISTINGS[kind]
+        params = [f"%{value}%"] if "?" in where else []
+        return where, keys, params
 
     @staticmethod
-    async def get_latest(limit: int = 10) -> list[dict]:
-        """Get the most recently added anime."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime ORDER BY created_at DESC LIMIT ?", (limit,)
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+    async def list_page(
+        kind: str,
+        value: str = "",
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple | None = None,
+    ) -> tuple[list[AnimeSummary], tuple | None]:
+        """Read one page of a listing (see LISTINGS) as summary rows.
+
+        With `after` (the keyset of the previous page's last row) the page is
+        located through the index; otherwise OFFSET is used. Returns the rows
+        and the keyset of the last row (the `after` for the next page).
+        """
+        where, keys, params = AnimeModel._listing_params(kind, value)
+        if after is not None:
+            where = f"({where}) AND ({keys[0]}, {keys[1]}) < (?, ?)"
+            params += list(after)
+            offset = 0
+        async with Database.read() as db:
+            cursor = await db.execute(
+                f"""
+                SELECT {AnimeModel.SUMMARY_COLUMNS} FROM anime WHERE {where}
+                ORDER BY {keys[0]} DESC, {keys[1]} DESC LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset),
+            )
+            rows = await cursor.fetchall()
+        # The cursor uses the stored values, before pending views are added
+        last = (rows[-1][keys[0]], rows[-1][keys[1]]) if rows else None
+        return [AnimeModel._summary(r) for r in rows], last
 
     @staticmethod
-    async def get_vip_anime(limit: int = 20) -> list[dict]:
-        """Get all VIP-exclusive anime."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime WHERE is_vip = 1 ORDER BY created_at DESC LIMIT ?",
-            (limit,),
+    def _summary(row) -> AnimeSummary:
+        """Build an AnimeSummary from a SUMMARY_COLUMNS row, with pending views."""
+        return AnimeSummary(
+            row[0], row[1], row[2], row[3] + ViewCounter.pending("anime", row[0]), row[4], row[5]
         )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+
+    @staticmethod
+    async def get_summaries(limit: int = 100, offset: int = 0) -> list[AnimeSummary]:
+        """Newest anime as summary records (for selection lists)."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                f"""
+                SELECT {AnimeModel.SUMMARY_COLUMNS} FROM anime
+                ORDER BY created_at DESC LIMIT ? OFFSET ?
+                """,
+                (limit, offset),
+            )
+            rows = await cursor.fetchall()
+        return [AnimeModel._summary(r) for r in rows]
+
+    @staticmethod
+    async def count_listing(kind: str, value: str = "") -> int:
+        """Number of rows in a listing."""
+        where, _, params = AnimeModel._listing_params(kind, value)
+        async with Database.read() as db:
+            cursor = await db.execute(f"SELECT COUNT(*) AS cnt FROM anime WHERE {where}", params)
+            row = await cursor.fetchone()
+            return row["cnt"] if row else 0
+
+    @staticmethod
+    async def search_fulltext_page(query: str, limit: int = 5, offset: int = 0) -> list[AnimeSummary] | None:
+        """One page of full-text search results as summary rows.
+
+        Ranking is an expression, so pages are read with OFFSET. Returns None
+        when FTS5 is not available (callers fall back to the "title" listing).
+        """
+        if not Database.has_fts5:
+            return None
+        match = AnimeModel._fts_query(query)
+        if not match:
+            return []
+        columns = ", ".join(f"a.{c.strip()}" for c in AnimeModel.SUMMARY_COLUMNS.split(","))
+        try:
+            async with Database.read() as db:
+                cursor = await db.execute(
+                    f"""
+                    SELECT {columns} FROM anime_fts
+                    INNER JOIN anime a ON a.id = anime_fts.rowid
+                    WHERE anime_fts MATCH ?
+                    ORDER BY bm25(anime_fts, 10.0, 1.0, 3.0)
+                             * (1.0 + ? * a.views / (a.views + ?))
+                    LIMIT ? OFFSET ?
+                    """,
+                    (match, SEARCH_VIEWS_WEIGHT, float(SEARCH_VIEWS_HALF), limit, offset),
+                )
+                rows = await cursor.fetchall()
+        except aiosqlite.OperationalError:
+            return None
+        return [AnimeModel._summary(r) for r in rows]
+
+    @staticmethod
+    async def count_fulltext(query: str) -> int | None:
+        """Number of full-text matches, or None when FTS5 is not available."""
+        if not Database.has_fts5:
+            return None
+        match = AnimeModel._fts_query(query)
+        if not match:
+            return 0
+        try:
+            async with Database.read() as db:
+                cursor = await db.execute(
+                    "SELECT COUNT(*) AS cnt FROM anime_fts WHERE anime_fts MATCH ?", (match,)
+                )
+                row = await cursor.fetchone()
+        except aiosqlite.OperationalError:
+            return None
+        return row["cnt"] if row else 0
 
     @staticmethod
     async def get_all(limit: int = 100, offset: int = 0) -> list[dict]:
         """Get all anime with pagination."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime ORDER BY created_at DESC LIMIT ? OFFSET ?",
-            (limit, offset),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT * FROM anime ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            )
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
 
     @staticmethod
     async def get_count() -> int:
         """Return the total number of anime records."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT COUNT(*) as cnt FROM anime")
-        row = await cursor.fetchone()
-        return row["cnt"] if row else 0
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT COUNT(*) as cnt FROM anime")
+            row = await cursor.fetchone()
+            return row["cnt"] if row else 0
 
     @staticmethod
     async def get_random(limit: int = 1) -> list[dict]:
         """Get random anime record(s)."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM anime ORDER BY RANDOM() LIMIT ?", (limit,)
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT * FROM anime ORDER BY RANDOM() LIMIT ?", (limit,)
+            )
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
 
@@ -0,0 +1,177 @@
+"""
+models/broadcast.py - Broadcast jobs model with async CRUD operations.
+Persists broadcast progress so a job can be paused, resumed, cancelled
+and continued after a restart.
+
+Progress is tracked with a cursor: every user with id <= last_user_id
+has been handled. Recipients above the cursor that finished out of order
+are kept in broadcast_recipients until the cursor passes them.
+
+A running job has an owner (the process sending it). Jobs are started
+only through claim(), and progress from a process that lost ownership
+is not saved.
+"""
+
+from database import Database
+
+
+class BroadcastModel:
+    """Provides async database operations for the broadcast_jobs tables."""
+
+    # Job statuses
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    FINISHED = "finished"
+
+    @staticmethod
+    async def create(
+        from_chat_id: int, message_id: int, admin_chat_id: int, total: int, owner: str
+    ) -> int:
+        """Create a new running broadcast job owned by `owner` and return its ID."""
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO broadcast_jobs (from_chat_id, message_id, admin_chat_id, total, owner)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (from_chat_id, message_id, admin_chat_id, total, owner),
+            )
+            return cursor.lastrowid
+
+    @staticmethod
+    async def pause(job_id: int) -> bool:
+        """Pause a running job. Returns False if it is not running."""
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                UPDATE broadcast_jobs SET status = 'paused'
+                WHERE id = ? AND status = 'running'
+                RETURNING id
+                """,
+                (job_id,),
+            )
+            return await cursor.fetchone() is not None
+
+    @staticmethod
+    async def claim(job_id: int, owner: str, status: str) -> bool:
+        """Atomically move a job from `status` to running under `owner`.
+
+        Returns False if the job is not in `status` any more, e.g. another
+        process has already claimed it.
+        """
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                UPDATE broadcast_jobs SET status = 'running', owner = ?
+                WHERE id = ? AND status = ?
+                RETURNING id
+                """,
+                (owner, job_id, status),
+            )
+            return await cursor.fetchone() is not None
+
+    @staticmethod
+    async def get(job_id: int) -> dict | None:
+        """Fetch a broadcast job by its ID."""
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM broadcast_jobs WHERE id = ?", (job_id,))
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+
+    @staticmethod
+    async def get_recent(limit: int = 10) -> list[dict]:
+        """Get the most recent broadcast jobs."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT * FROM broadcast_jobs ORDER BY id DESC LIMIT ?", (limit,)
+            )
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
+
+    @staticmethod
+    async def get_by_status(status: str) -> list[dict]:
+        """Get all jobs with the given status."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT * FROM broadcast_jobs WHERE status = ? ORDER BY id", (status,)
+            )
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
+
+    @staticmethod
+    async def set_status_message(job_id: int, status_message_id: int) -> None:
+        """Remember the admin's progress message for a job."""
+        async with Database.write() as db:
+            await db.execute(
+                "UPDATE broadcast_jobs SET status_message_id = ? WHERE id = ?",
+                (status_message_id, job_id),
+            )
+
+    @staticmethod
+    async def set_status(job_id: int, status: str) -> None:
+        """Change job status. Cancelled/finished jobs get a finished_at timestamp."""
+        async with Database.write() as db:
+            if status in (BroadcastModel.CANCELLED, BroadcastModel.FINISHED):
+                await db.execute(
+                    "UPDATE broadcast_jobs SET status = ?, finished_at = datetime('now') WHERE id = ?",
+                    (status, job_id),
+                )
+                await db.execute("DELETE FROM broadcast_recipients WHERE job_id = ?", (job_id,))
+            else:
+                await db.execute(
+                    "UPDATE broadcast_jobs SET status = ? WHERE id = ?", (status, job_id)
+                )
+
+    @staticmethod
+    async def get_done_user_ids(job_id: int) -> set[int]:
+        """Users above the cursor that already have an outcome for this job."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                """
+                SELECT r.user_id FROM broadcast_recipients r
+                INNER JOIN broadcast_jobs j ON j.id = r.job_id
+                WHERE r.job_id = ? AND r.user_id > j.last_user_id
+                """,
+                (job_id,),
+            )
+            rows = await cursor.fetchall()
+            return {r["user_id"] for r in rows}
+
+    @staticmethod
+    async def checkpoint(
+        job_id: int,
+        owner: str,
+        last_user_id: int,
+        sent: int,
+        blocked: int,
+        errors: int,
+        outcomes: list[tuple[int, str]],
+    ) -> bool:
+        """Persist progress: recipient outcomes, counters and the cursor, in one transaction.
+
+        Nothing is written unless the job is still owned by `owner`.
+        """
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                UPDATE broadcast_jobs
+                SET last_user_id = ?, sent = ?, blocked = ?, errors = ?
+                WHERE id = ? AND owner = ?
+                RETURNING id
+                """,
+                (last_user_id, sent, blocked, errors, job_id, owner),
+            )
+            if await cursor.fetchone() is None:
+                return False
+            if outcomes:
+                await db.executemany(
+                    "INSERT OR REPLACE INTO broadcast_recipients (job_id, user_id, state) VALUES (?, ?, ?)",
+                    [(job_id, user_id, state) for user_id, state in outcomes],
+                )
+            # Rows at or below the cursor are covered by last_user_id
+            await db.execute(
+                "DELETE FROM broadcast_recipients WHERE job_id = ? AND user_id <= ?",
+                (job_id, last_user_id),
+            )
+        return True
@@ -0,0 +1,103 @@
+"""
+models/cache_sync.py - Cross-process cache invalidation.
+When the bot runs as several worker processes, each one has its own
+in-memory caches. Writers bump a named version in the cache_versions
+table inside their write transaction; every worker polls the table and
+runs the registered invalidation callbacks when a version changes.
+"""
+
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Callable
+
+import aiosqlite
+
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class CacheSync:
+    """Version counters for process-local caches."""
+
+    # Cache names used by the models
+    CATALOG = "catalog"
+    ADMINS = "admins"
+    SETTINGS = "settings"
+    CHANNELS = "channels"
+    MEDIA = "media"
+    VIP = "vip"
+
+    # name -> last version seen by this process
+    _versions: dict[str, int] = {}
+    # name -> invalidation callbacks (sync or async, no arguments)
+    _listeners: dict[str, list[Callable[[], Awaitable[None] | None]]] = {}
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    async def bump(db: aiosqlite.Connection, name: str) -> None:
+        """Increment a cache version. Call inside a Database.write() block."""
+        cursor = await db.execute(
+            """
+            INSERT INTO cache_versions (name, version) VALUES (?, 1)
+            ON CONFLICT(name) DO UPDATE SET version = version + 1
+            RETURNING version
+            """,
+            (name,),
+        )
+        row = await cursor.fetchone()
+        # Our own bump needs no reload here (the caller already invalidated);
+        # if another process bumped in between, the poller still sees the gap.
+        if row and row[0] == CacheSync._versions.get(name, 0) + 1:
+            CacheSync._versions[name] = row[0]
+
+    @staticmethod
+    def listen(name: str, callback: Callable[[], Awaitable[None] | None]) -> None:
+        """Register a callback that drops the named cache."""
+        CacheSync._listeners.setdefault(name, []).append(callback)
+
+    @staticmethod
+    async def _read_versions() -> dict[str, int]:
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT name, version FROM cache_versions")
+            rows = await cursor.fetchall()
+            return {r["name"]: r["version"] for r in rows}
+
+    @staticmethod
+    async def poll() -> None:
+        """Run callbacks for every cache whose version changed elsewhere."""
+        for name, version in (await CacheSync._read_versions()).items():
+            if CacheSync._versions.get(name) == version:
+                continue
+            CacheSync._versions[name] = version
+            for callback in CacheSync._listeners.get(name, []):
+                try:
+                    result = callback()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error("Cache invalidation failed (%s): %s", name, e)
+
+    @staticmethod
+    async def _run(interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await CacheSync.poll()
+            except Exception as e:
+                logger.error("Cache sync loop error: %s", e)
+
+    @staticmethod
+    async def start(interval: float) -> None:
+        """Remember the current versions and start polling."""
+        CacheSync._versions = await CacheSync._read_versions()
+        if CacheSync._task is None or CacheSync._task.done():
+            CacheSync._task = asyncio.get_running_loop().create_task(CacheSync._run(interval))
+
+    @staticmethod
+    async def stop() -> None:
+        if CacheSync._task is not None:
+            CacheSync._task.cancel()
+            await asyncio.gather(CacheSync._task, return_exceptions=True)
+            CacheSync._task = None
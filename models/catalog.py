@@ -0,0 +1,131 @@
+"""
+models/catalog.py - Process-local anime catalog cache.
+Keeps anime rows by id and by code together with a per-anime season
+index of episodes, so hot read paths do not touch the database. Entries
+are invalidated by AnimeModel/EpisodeModel write methods.
+
+Fills race with invalidations and view flushes: a reader takes
+generation() before its database read and passes it to put_*(), which
+drops the row if anything was invalidated or flushed in between. Both maps are LRU-bounded by
+CATALOG_CACHE_SIZE, and anime rows expire after CATALOG_ANIME_TTL.
+"""
+
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from config import CATALOG_CACHE_SIZE, CATALOG_ANIME_TTL
+
+
+class EpisodeEntry(NamedTuple):
+    """Narrow episode record kept in the season index."""
+
+    id: int
+    episode_number: int
+    is_vip: int
+
+
+class CatalogCache:
+    """In-memory cache of anime rows and per-season episode indexes."""
+
+    # anime_id -> (expires_at, anime row as stored in the database), LRU first
+    _anime: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+    # code -> anime_id
+    _codes: dict[str, int] = {}
+    # anime_id -> {season_number: episodes ordered by episode_number}, LRU first
+    _episodes: OrderedDict[int, dict[int, list[EpisodeEntry]]] = OrderedDict()
+    # Bumped by every invalidation
+    _generation: int = 0
+
+    @classmethod
+    def generation(cls) -> int:
+        """Current generation; take it before reading the rows you will put()."""
+        return cls._generation
+
+    @classmethod
+    def get_anime(cls, anime_id: int) -> dict | None:
+        """Return a copy of a cached anime row, or None on a miss."""
+        item = cls._anime.get(anime_id)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            cls._drop_anime(anime_id)
+            return None
+        cls._anime.move_to_end(anime_id)
+        return dict(item[1])
+
+    @classmethod
+    def get_anime_id(cls, code: str) -> int | None:
+        """Return the cached anime id for a code, or None on a miss."""
+        return cls._codes.get(code)
+
+    @classmethod
+    def put_anime(cls, row: dict, generation: int) -> None:
+        """Store an anime row read at `generation` (ignored if it is stale)."""
+        if generation != cls._generation:
+            return
+        cls._drop_anime(row["id"])
+        cls._anime[row["id"]] = (time.monotonic() + CATALOG_ANIME_TTL, dict(row))
+        cls._codes[row["code"]] = row["id"]
+        while len(cls._anime) > CATALOG_CACHE_SIZE:
+            cls._drop_anime(next(iter(cls._anime)))
+
+    @classmethod
+    def add_views(cls, deltas: dict[int, int]) -> None:
+        """Apply flushed view deltas to cached rows (called by ViewCounter).
+
+        Also starts a new generation: a fill that read the rows before the
+        flush would otherwise cache the lower, pre-flush counts.
+        """
+        if deltas:
+            cls._generation += 1
+        for anime_id, delta in deltas.items():
+            item = cls._anime.get(anime_id)
+            if item is not None:
+                item[1]["views"] += delta
+
+    @classmethod
+    def invalidate_anime(cls, anime_id: int) -> None:
+        """Drop an anime row and its code mapping."""
+        cls._generation += 1
+        cls._drop_anime(anime_id)
+
+    @classmethod
+    def _drop_anime(cls, anime_id: int) -> None:
+        item = cls._anime.pop(anime_id, None)
+        if item is not None and cls._codes.get(item[1]["code"]) == anime_id:
+            del cls._codes[item[1]["code"]]
+
+    @classmethod
+    def get_episodes(cls, anime_id: int) -> dict[int, list[EpisodeEntry]] | None:
+        """Return {season_number: episodes} for an anime, or None on a miss."""
+        seasons = cls._episodes.get(anime_id)
+        if seasons is not None:
+            cls._episodes.move_to_end(anime_id)
+        return seasons
+
+    @classmethod
+    def put_episodes(
+        cls, anime_id: int, seasons: dict[int, list[EpisodeEntry]], generation: int
+    ) -> None:
+        """Store the season index of an anime read at `generation` (ignored if stale)."""
+        if generation != cls._generation:
+            return
+        cls._episodes[anime_id] = seasons
+        cls._episodes.move_to_end(anime_id)
+        while len(cls._episodes) > CATALOG_CACHE_SIZE:
+            cls._episodes.popitem(last=False)
+
+    @classmethod
+    def invalidate_episodes(cls, anime_id: int) -> None:
+        """Drop the season index of an anime."""
+        cls._generation += 1
+        cls._episodes.pop(anime_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop everything."""
+        cls._generation += 1
+        cls._anime.clear()
+        cls._codes.clear()
+        cls._episodes.clear()
@@ -1,46 +1,68 @@
 """
 models/channel.py - Channel model with async CRUD operations.
 Handles forced subscription channel management.
+The channel list is cached in memory and invalidated by add/remove.
 """
 
 from database import Database
+from models.cache_sync import CacheSync
 
 
 class ChannelModel:
     """Provides async database operations for the channels table."""
 
+    # Cached result of get_all(); None means not loaded
+    _cache: list[dict] | None = None
+    # Bumped on every invalidation so a load that raced a write is not cached
+    _generation: int = 0
+
     @staticmethod
     async def add(channel_id: str, channel_name: str, channel_link: str) -> int:
         """Add a new channel for forced subscription. Returns the record ID."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "INSERT OR IGNORE INTO channels (channel_id, channel_name, channel_link) VALUES (?, ?, ?)",
-            (channel_id, channel_name, channel_link),
-        )
-        await db.commit()
-        return cursor.lastrowid
+        async with Database.write() as db:
+            cursor = await db.execute(
+                "INSERT OR IGNORE INTO channels (channel_id, channel_name, channel_link) VALUES (?, ?, ?)",
+                (channel_id, channel_name, channel_link),
+            )
+            channel_pk = cursor.lastrowid
+            await CacheSync.bump(db, CacheSync.CHANNELS)
+        ChannelModel.invalidate()
+        return channel_pk
 
     @staticmethod
     async def remove(channel_id: str) -> None:
         """Remove a channel from forced subscription list."""
-        db = await Database.connect()
-        await db.execute("DELETE FROM channels WHERE channel_id = ?", (channel_id,))
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute("DELETE FROM channels WHERE channel_id = ?", (channel_id,))
+            await CacheSync.bump(db, CacheSync.CHANNELS)
+        ChannelModel.invalidate()
 
     @staticmethod
     async def get_all() -> list[dict]:
-        """Retrieve all forced subscription channels."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM channels ORDER BY added_at DESC")
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        """Retrieve all forced subscription channels (served from cache)."""
+        channels = ChannelModel._cache
+        if channels is None:
+            generation = ChannelModel._generation
+            async with Database.read() as db:
+                cursor = await db.execute("SELECT * FROM channels ORDER BY added_at DESC")
+                rows = await cursor.fetchall()
+                channels = [dict(r) for r in rows]
+            if generation == ChannelModel._generation:
+                ChannelModel._cache = channels
+        return [dict(c) for c in channels]
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the cached channel list."""
+        ChannelModel._cache = None
+        ChannelModel._generation += 1
 
     @staticmethod
     async def get_by_channel_id(channel_id: str) -> dict | None:
         """Fetch a channel record by its Telegram channel ID."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM channels WHERE channel_id = ?", (channel_id,)
-        )
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT * FROM channels WHERE channel_id = ?", (channel_id,)
+            )
+            row = await cursor.fetchone()
+            return dict(row) if row else None
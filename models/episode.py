@@ -1,9 +1,13 @@
 """
 models/episode.py - Episode model with async CRUD operations.
 Handles episode creation, editing, deletion, and retrieval with pagination.
+Season listings are served from a cached per-anime index (CatalogCache).
 """
 
 from database import Database
+from models.view_counter import ViewCounter
+from models.catalog import CatalogCache, EpisodeEntry
+from models.cache_sync import CacheSync
 
 
 class EpisodeModel:
@@ -23,77 +27,89 @@ class EpisodeModel:
         if not anime_id or not video_file_id:
             raise ValueError("Anime ID va Video File ID bo'sh bo'lishi mumkin emas!")
         
-        db = await Database.connect()
-        cursor = await db.execute(
-            """
-            INSERT INTO episodes (anime_id, season_number, episode_number, title, video_file_id, is_vip)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                int(anime_id), 
-                int(season_number), 
-                int(episode_number), 
-                str(title).strip(), 
-                str(video_file_id).strip(), 
-                int(is_vip)
-            ),
-        )
-        await db.commit()
-        return cursor.lastrowid
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO episodes (anime_id, season_number, episode_number, title, video_file_id, is_vip)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    int(anime_id), 
+                    int(season_number), 
+                    int(episode_number), 
+                    str(title).strip(), 
+                    str(video_file_id).strip(), 
+                    int(is_vip)
+                ),
+            )
+            episode_id = cursor.lastrowid
+            await CacheSync.bump(db, CacheSync.CATALOG)
+        CatalogCache.invalidate_episodes(int(anime_id))
+        return episode_id
 
 
     @staticmethod
     async def get_by_id(episode_id: int) -> dict | None:
         """Fetch an episode by its internal ID."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM episodes WHERE id = ?", (episode_id,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM episodes WHERE id = ?", (episode_id,))
+            row = await cursor.fetchone()
+            return ViewCounter.apply("episodes", dict(row)) if row else None
+
+    @staticmethod
+    async def get_season_index(anime_id: int) -> dict[int, list[EpisodeEntry]]:
+        """Return {season_number: episodes} for an anime (cached in CatalogCache).
+
+        Built with one range scan over idx_episodes_anime_season and kept
+        until an episode of this anime is created, updated or deleted.
+        """
+        seasons = CatalogCache.get_episodes(anime_id)
+        if seasons is None:
+            generation = CatalogCache.generation()
+            async with Database.read() as db:
+                cursor = await db.execute(
+                    """
+                    SELECT id, season_number, episode_number, is_vip FROM episodes
+                    WHERE anime_id = ?
+                    ORDER BY season_number ASC, episode_number ASC
+                    """,
+                    (anime_id,),
+                )
+                rows = await cursor.fetchall()
+            seasons = {}
+            for row in rows:
+                seasons.setdefault(row["season_number"], []).append(
+                    EpisodeEntry(row["id"], row["episode_number"], row["is_vip"])
+                )
+            CatalogCache.put_episodes(anime_id, seasons, generation)
+        return seasons
+
+    @staticmethod
+    async def get_season_counts(anime_id: int) -> dict[int, int]:
+        """Return {season_number: episode_count} for an anime."""
+        seasons = await EpisodeModel.get_season_index(anime_id)
+        return {season: len(episodes) for season, episodes in seasons.items()}
 
     @staticmethod
     async def get_seasons(anime_id: int) -> list[int]:
         """Get a sorted list of distinct season numbers for an anime."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT DISTINCT season_number FROM episodes WHERE anime_id = ? ORDER BY season_number",
-            (anime_id,),
-        )
-        rows = await cursor.fetchall()
-        return [row["season_number"] for row in rows]
+        return sorted(await EpisodeModel.get_season_index(anime_id))
 
     @staticmethod
     async def get_by_season(
         anime_id: int, season_number: int, limit: int = 50, offset: int = 0
-    ) -> list[dict]:
-        """Get episodes for a specific anime season with pagination."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            """
-            SELECT * FROM episodes
-            WHERE anime_id = ? AND season_number = ?
-            ORDER BY episode_number ASC
-            LIMIT ? OFFSET ?
-            """,
-            (anime_id, season_number, limit, offset),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+    ) -> list[EpisodeEntry]:
+        """Get a page of episodes for an anime season from the season index."""
+        seasons = await EpisodeModel.get_season_index(anime_id)
+        return seasons.get(season_number, [])[offset:offset + limit]
 
     @staticmethod
     async def get_episode_count(anime_id: int, season_number: int | None = None) -> int:
         """Count episodes for an anime, optionally filtered by season."""
-        db = await Database.connect()
+        seasons = await EpisodeModel.get_season_index(anime_id)
         if season_number is not None:
-            cursor = await db.execute(
-                "SELECT COUNT(*) as cnt FROM episodes WHERE anime_id = ? AND season_number = ?",
-                (anime_id, season_number),
-            )
-        else:
-            cursor = await db.execute(
-                "SELECT COUNT(*) as cnt FROM episodes WHERE anime_id = ?", (anime_id,)
-            )
-        row = await cursor.fetchone()
-        return row["cnt"] if row else 0
+            return len(seasons.get(season_number, ()))
+        return sum(len(episodes) for episodes in seasons.values())
 
     @staticmethod
     async def update(episode_id: int, **kwargs) -> None:
@@ -111,46 +127,52 @@ class EpisodeModel:
             
         set_clause = ", ".join(f"{k} = ?" for k in kwargs)
         values = list(kwargs.values()) + [episode_id]
-        db = await Database.connect()
-        await db.execute(f"UPDATE episodes SET {set_clause} WHERE id = ?", values)
-        await db.commit()
+        async with Database.write() as db:
+            cursor = await db.execute("SELECT anime_id FROM episodes WHERE id = ?", (episode_id,))
+            row = await cursor.fetchone()
+            await db.execute(f"UPDATE episodes SET {set_clause} WHERE id = ?", values)
+            await CacheSync.bump(db, CacheSync.CATALOG)
+        if row:
+            CatalogCache.invalidate_episodes(row["anime_id"])
+        if "anime_id" in kwargs:
+            CatalogCache.invalidate_episodes(int(kwargs["anime_id"]))
 
 
     @staticmethod
     async def delete(episode_id: int) -> None:
         """Delete an episode by its ID."""
-        db = await Database.connect()
-        await db.execute("DELETE FROM episodes WHERE id = ?", (episode_id,))
-        await db.commit()
+        async with Database.write() as db:
+            cursor = await db.execute("SELECT anime_id FROM episodes WHERE id = ?", (episode_id,))
+            row = await cursor.fetchone()
+            await db.execute("DELETE FROM episodes WHERE id = ?", (episode_id,))
+            await CacheSync.bump(db, CacheSync.CATALOG)
+        if row:
+            CatalogCache.invalidate_episodes(row["anime_id"])
 
     @staticmethod
     async def increment_views(episode_id: int) -> None:
-        """Increment the view count of an episode by 1."""
-        db = await Database.connect()
-        await db.execute(
-            "UPDATE episodes SET views = views + 1 WHERE id = ?", (episode_id,)
-        )
-        await db.commit()
+        """Increment the view count of an episode by 1 (buffered, see ViewCounter)."""
+        ViewCounter.add("episodes", episode_id)
 
     @staticmethod
     async def get_all_for_anime(anime_id: int) -> list[dict]:
         """Get all episodes for an anime ordered by season and episode number."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            """
-            SELECT * FROM episodes WHERE anime_id = ?
-            ORDER BY season_number ASC, episode_number ASC
-            """,
-            (anime_id,),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        async with Database.read() as db:
+            cursor = await db.execute(
+                """
+                SELECT * FROM episodes WHERE anime_id = ?
+                ORDER BY season_number ASC, episode_number ASC
+                """,
+                (anime_id,),
+            )
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
 
     @staticmethod
     async def get_total_count() -> int:
         """Return the total number of episodes in the database."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT COUNT(*) as cnt FROM episodes")
-        row = await cursor.fetchone()
-        return row["cnt"] if row else 0
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT COUNT(*) as cnt FROM episodes")
+            row = await cursor.fetchone()
+            return row["cnt"] if row else 0
 
@@ -4,6 +4,7 @@ Handles user favorite anime bookmarking.
 """
 
 from database import Database
+from models.anime import AnimeSummary
 
 
 class FavoritesModel:
@@ -12,50 +13,65 @@ class FavoritesModel:
     @staticmethod
     async def add(user_id: int, anime_id: int) -> bool:
         """Add an anime to user's favorites. Returns True if added, False if already exists."""
-        db = await Database.connect()
-        try:
-            await db.execute(
-                "INSERT INTO favorites (user_id, anime_id) VALUES (?, ?)",
-                (user_id, anime_id),
-            )
-            await db.commit()
-            return True
-        except Exception:
-            return False
+        async with Database.write() as db:
+            try:
+                await db.execute(
+                    "INSERT INTO favorites (user_id, anime_id) VALUES (?, ?)",
+                    (user_id, anime_id),
+                )
+                return True
+            except Exception:
+                return False
 
     @staticmethod
     async def remove(user_id: int, anime_id: int) -> None:
         """Remove an anime from user's favorites."""
-        db = await Database.connect()
-        await db.execute(
-            "DELETE FROM favorites WHERE user_id = ? AND anime_id = ?",
-            (user_id, anime_id),
-        )
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute(
+                "DELETE FROM favorites WHERE user_id = ? AND anime_id = ?",
+                (user_id, anime_id),
+            )
 
     @staticmethod
     async def get_by_user(user_id: int) -> list[dict]:
         """Get all favorite anime for a user with anime details."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            """
-            SELECT a.* FROM anime a
-            INNER JOIN favorites f ON a.id = f.anime_id
-            WHERE f.user_id = ?
-            ORDER BY f.id DESC
-            """,
-            (user_id,),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        async with Database.read() as db:
+            cursor = await db.execute(
+                """
+                SELECT a.* FROM anime a
+                INNER JOIN favorites f ON a.id = f.anime_id
+                WHERE f.user_id = ?
+                ORDER BY f.id DESC
+                """,
+                (user_id,),
+            )
+            rows = await cursor.fetchall()
+            return [dict(r) for r in rows]
+
+    @staticmethod
+    async def get_summaries(user_id: int) -> list[AnimeSummary]:
+        """Get a user's favorite anime as summary records (for the list view)."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                """
+                SELECT a.id, a.title, a.code, a.views, a.status, a.created_at
+                FROM favorites f
+                INNER JOIN anime a ON a.id = f.anime_id
+                WHERE f.user_id = ?
+                ORDER BY f.id DESC
+                """,
+                (user_id,),
+            )
+            rows = await cursor.fetchall()
+        return [AnimeSummary(*r) for r in rows]
 
     @staticmethod
     async def is_favorite(user_id: int, anime_id: int) -> bool:
         """Check if an anime is in the user's favorites."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT id FROM favorites WHERE user_id = ? AND anime_id = ?",
-            (user_id, anime_id),
-        )
-        row = await cursor.fetchone()
-        return row is not None
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT id FROM favorites WHERE user_id = ? AND anime_id = ?",
+                (user_id, anime_id),
+            )
+            row = await cursor.fetchone()
+            return row is not None
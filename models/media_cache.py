@@ -0,0 +1,78 @@
+"""
+models/media_cache.py - Telegram file_id registry for remote media URLs.
+After a URL is sent once, Telegram returns a file_id for the uploaded copy.
+Reusing it skips the remote download on every later send. The mapping is
+kept in the media_cache table and mirrored in memory.
+"""
+
+import logging
+
+from database import Database
+from models.cache_sync import CacheSync
+
+logger = logging.getLogger(__name__)
+
+
+class MediaCacheModel:
+    """Maps remote media URLs to Telegram file_ids."""
+
+    # url -> file_id; None means not loaded
+    _ids: dict[str, str] | None = None
+
+    @staticmethod
+    def is_url(media: str | None) -> bool:
+        """Only http(s) URLs are cached; file_ids are already reusable."""
+        return bool(media) and media.startswith(("http://", "https://"))
+
+    @staticmethod
+    async def load() -> dict[str, str]:
+        """Load the whole registry into memory."""
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT url, file_id FROM media_cache")
+            rows = await cursor.fetchall()
+        MediaCacheModel._ids = {r["url"]: r["file_id"] for r in rows}
+        return MediaCacheModel._ids
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the in-memory copy; the next lookup reloads it."""
+        MediaCacheModel._ids = None
+
+    @staticmethod
+    async def get(url: str) -> str | None:
+        """Return the cached file_id for a URL, if any."""
+        ids = MediaCacheModel._ids
+        if ids is None:
+            ids = await MediaCacheModel.load()
+        return ids.get(url)
+
+    @staticmethod
+    async def set(url: str, file_id: str, media_type: str) -> None:
+        """Remember the file_id Telegram returned for a URL."""
+        ids = MediaCacheModel._ids
+        if ids is not None and ids.get(url) == file_id:
+            return
+        async with Database.write() as db:
+            await db.execute(
+                """
+                INSERT INTO media_cache (url, file_id, media_type) VALUES (?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    file_id = excluded.file_id,
+                    media_type = excluded.media_type,
+                    updated_at = datetime('now')
+                """,
+                (url, file_id, media_type),
+            )
+            await CacheSync.bump(db, CacheSync.MEDIA)
+        if MediaCacheModel._ids is not None:
+            MediaCacheModel._ids[url] = file_id
+
+    @staticmethod
+    async def forget(url: str) -> None:
+        """Drop a file_id that Telegram no longer accepts."""
+        async with Database.write() as db:
+            await db.execute("DELETE FROM media_cache WHERE url = ?", (url,))
+            await CacheSync.bump(db, CacheSync.MEDIA)
+        if MediaCacheModel._ids is not None:
+            MediaCacheModel._ids.pop(url, None)
+        logger.info("Media cache entry dropped: %s", url)
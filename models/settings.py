@@ -1,35 +1,81 @@
 """
 models/settings.py - Bot sozlamalari modeli (key-value).
+Sozlamalar xotirada (snapshot) saqlanadi: bir marta yuklanadi va set()
+da yangilanadi. O'zgarishlar obunachilarga (subscribe) xabar qilinadi.
 """
 
+import logging
+from typing import Callable
+
 from database import Database
+from models.cache_sync import CacheSync
+
+logger = logging.getLogger(__name__)
 
 
 class SettingsModel:
     """Bot sozlamalari bilan ishlash."""
 
+    # key -> value; None - hali yuklanmagan. set() butun dictni almashtiradi.
+    _snapshot: dict[str, str] | None = None
+    # callback(key, value) - sozlama o'zgarganda chaqiriladi
+    _subscribers: list[Callable[[str, str], None]] = []
+
+    @staticmethod
+    async def load() -> dict:
+        """Barcha sozlamalarni bazadan xotiraga yuklash."""
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM settings")
+            rows = await cursor.fetchall()
+        SettingsModel._snapshot = {r["key"]: r["value"] for r in rows}
+        for key, value in SettingsModel._snapshot.items():
+            SettingsModel._notify(key, value)
+        return SettingsModel._snapshot
+
+    @staticmethod
+    def subscribe(callback: Callable[[str, str], None]) -> None:
+        """Sozlama o'zgarishlariga obuna bo'lish (yuklangan qiymatlar ham yuboriladi)."""
+        SettingsModel._subscribers.append(callback)
+        if SettingsModel._snapshot is not None:
+            for key, value in SettingsModel._snapshot.items():
+                callback(key, value)
+
+    @staticmethod
+    def _notify(key: str, value: str) -> None:
+        for callback in SettingsModel._subscribers:
+            try:
+                callback(key, value)
+            except Exception as e:
+                logger.error(f"Settings subscriber error ({key}): {e}")
+
     @staticmethod
     async def get(key: str, default: str = "") -> str:
         """Sozlamani olish."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        row = await cursor.fetchone()
-        return row["value"] if row else default
+        snapshot = SettingsModel._snapshot
+        if snapshot is None:
+            snapshot = await SettingsModel.load()
+        return snapshot.get(key, default)
 
     @staticmethod
     async def set(key: str, value: str) -> None:
         """Sozlamani o'rnatish."""
-        db = await Database.connect()
-        await db.execute(
-            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-            (key, value),
-        )
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+            await CacheSync.bump(db, CacheSync.SETTINGS)
+        if SettingsModel._snapshot is None:
+            await SettingsModel.load()
+            return
+        # Yangi dict bilan almashtiramiz - o'quvchilar hech qachon yarim holatni ko'rmaydi
+        SettingsModel._snapshot = {**SettingsModel._snapshot, key: value}
+        SettingsModel._notify(key, value)
 
     @staticmethod
     async def get_all() -> dict:
         """Barcha sozlamalarni olish."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM settings")
-        rows = await cursor.fetchall()
-        return {r["key"]: r["value"] for r in rows}
+        snapshot = SettingsModel._snapshot
+        if snapshot is None:
+            snapshot = await SettingsModel.load()
+        return dict(snapshot)
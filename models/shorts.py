@@ -3,7 +3,18 @@ models/shorts.py - Shorts model with async CRUD operations.
 Handles short anime clips management and view counting.
 """
 
+from typing import NamedTuple
+
 from database import Database
+from models.view_counter import ViewCounter
+
+
+class ShortSummary(NamedTuple):
+    """Compact short record for list views (no video file id)."""
+
+    id: int
+    anime_id: int
+    anime_title: str
 
 
 class ShortsModel:
@@ -16,70 +27,86 @@ class ShortsModel:
         if not anime_id or not short_video_file_id:
             raise ValueError("Anime ID va Video File ID bo'sh bo'lishi mumkin emas!")
 
-        db = await Database.connect()
-        cursor = await db.execute(
-            "INSERT INTO shorts (anime_id, short_video_file_id) VALUES (?, ?)",
-            (int(anime_id), str(short_video_file_id).strip()),
-        )
-        await db.commit()
-        return cursor.lastrowid
+        async with Database.write() as db:
+            cursor = await db.execute(
+                "INSERT INTO shorts (anime_id, short_video_file_id) VALUES (?, ?)",
+                (int(anime_id), str(short_video_file_id).strip()),
+            )
+            return cursor.lastrowid
 
     @staticmethod
     async def get_by_id(short_id: int) -> dict | None:
         """Fetch a short clip by its ID."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM shorts WHERE id = ?", (short_id,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM shorts WHERE id = ?", (short_id,))
+            row = await cursor.fetchone()
+            return ViewCounter.apply("shorts", dict(row)) if row else None
 
     @staticmethod
     async def get_all(limit: int = 50, offset: int = 0) -> list[dict]:
         """Get all shorts with anime info, paginated."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            """
-            SELECT s.*, a.title as anime_title, a.code as anime_code
-            FROM shorts s
-            INNER JOIN anime a ON s.anime_id = a.id
-            ORDER BY s.created_at DESC
-            LIMIT ? OFFSET ?
-            """,
-            (limit, offset),
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+        async with Database.read() as db:
+            cursor = await db.execute(
+                """
+                SELECT s.*, a.title as anime_title, a.code as anime_code
+                FROM shorts s
+                INNER JOIN anime a ON s.anime_id = a.id
+                ORDER BY s.created_at DESC
+                LIMIT ? OFFSET ?
+                """,
+                (limit, offset),
+            )
+            rows = await cursor.fetchall()
+            return [ViewCounter.apply("shorts", dict(r)) for r in rows]
 
     @staticmethod
-    async def increment_views(short_id: int, user_id: int) -> bool:
-        """Foydalanuvchi uchun unik ko'rishni saqlash va hisobni oshirish."""
-        db = await Database.connect()
-        try:
-            # Unik ko'rishni qo'shishga urinamiz
-            await db.execute(
-                "INSERT INTO short_views (short_id, user_id) VALUES (?, ?)",
-                (short_id, user_id)
+    async def get_summaries(limit: int = 50, offset: int = 0) -> list[ShortSummary]:
+        """Newest shorts as summary records (for the admin list)."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                """
+                SELECT s.id, s.anime_id, a.title
+                FROM shorts s
+                INNER JOIN anime a ON s.anime_id = a.id
+                ORDER BY s.created_at DESC
+                LIMIT ? OFFSET ?
+                """,
+                (limit, offset),
             )
-            # Agar muvaffaqiyatli bo'lsa (UNIQUE constraint buzilmasa), jami ko'rishni oshiramiz
-            await db.execute(
-                "UPDATE shorts SET views = views + 1 WHERE id = ?", (short_id,)
+            rows = await cursor.fetchall()
+        return [ShortSummary(*r) for r in rows]
+
+    @staticmethod
+    async def increment_views(short_id: int, user_id: int) -> bool:
+        """Foydalanuvchi uchun unik ko'rishni saqlash va hisobni oshirish (buferlangan)."""
+        if ViewCounter.has_short_view(short_id, user_id):
+            return False
+
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT 1 FROM short_views WHERE short_id = ? AND user_id = ?",
+                (short_id, user_id),
             )
-            await db.commit()
+            if await cursor.fetchone():
+                # Allaqachon ko'rgan
+                return False
+
+            # short_views qatori va views hisobi keyingi flush'da yoziladi
+            ViewCounter.add_short_view(short_id, user_id)
             return True
-        except Exception:
-            # Allaqachon ko'rgan bo'lsa xatolik beradi, ignore qilamiz
-            return False
 
     @staticmethod
     async def delete(short_id: int) -> None:
         """Delete a short clip by its ID."""
-        db = await Database.connect()
-        await db.execute("DELETE FROM shorts WHERE id = ?", (short_id,))
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute("DELETE FROM shorts WHERE id = ?", (short_id,))
+        # Buffered views of a deleted short have nothing to point at
+        ViewCounter.discard("shorts", short_id)
 
     @staticmethod
     async def get_count() -> int:
         """Return the total number of shorts."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT COUNT(*) as cnt FROM shorts")
-        row = await cursor.fetchone()
-        return row["cnt"] if row else 0
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT COUNT(*) as cnt FROM shorts")
+            row = await cursor.fetchone()
+            return row["cnt"] if row else 0
@@ -3,94 +3,326 @@ models/user.py - User model with async CRUD operations.
 Handles user registration, VIP status, and profile queries.
 """
 
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, NamedTuple
+
+from config import USER_CACHE_SIZE, USER_UPSERT_WINDOW, USER_UPSERT_BATCH, USER_SCAN_CHUNK
 from database import Database
+from models.cache_sync import CacheSync
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT statement (3 bound parameters each)
+UPSERT_CHUNK = 300
+
+# Format of users.vip_expire_date (sorts lexicographically in time order)
+VIP_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class UserRecord(NamedTuple):
+    """Compact users row yielded by bulk scans (iter_users)."""
+
+    id: int
+    telegram_id: int
+    full_name: str
+    username: str
+    is_vip: int
+    vip_expire_date: str | None
+    joined_date: str
+
+
+RECORD_COLUMNS = "id, telegram_id, full_name, username, is_vip, vip_expire_date, joined_date"
+
+
+class UserContext(NamedTuple):
+    """The current user, resolved once per update (see UserContextMiddleware)."""
+
+    id: int
+    telegram_id: int
+    full_name: str
+    username: str
+    is_admin: bool
+
+    @property
+    def vip_until(self) -> datetime | None:
+        """VIP expiry from the in-memory map, or None if not VIP."""
+        return UserModel.get_vip_expiry(self.telegram_id)
+
+    @property
+    def is_vip(self) -> bool:
+        """True while the VIP period has not ended."""
+        vip_until = self.vip_until
+        return vip_until is not None and datetime.now() < vip_until
 
 
 class UserModel:
     """Provides async database operations for the users table."""
 
+    # telegram_id -> VIP expiry for every user with is_vip = 1 (see load_vips)
+    _vip_until: dict[int, datetime] = {}
+    # telegram_id -> (id, full_name, username), least recently used first
+    _identities: OrderedDict[int, tuple[int, str, str]] = OrderedDict()
+    # telegram_id -> (full_name, username, waiting futures), not yet written
+    _pending_upserts: dict[int, tuple[str, str, list[asyncio.Future]]] = {}
+    _upsert_timer: asyncio.TimerHandle | None = None
+    # Running batch writes (referenced so they are not garbage collected)
+    _upsert_tasks: set[asyncio.Task] = set()
+
     @staticmethod
     async def create_or_update(telegram_id: int, full_name: str, username: str) -> dict | None:
-        """Register a new user or update existing user info. Returns the user row."""
+        """Register a new user or update existing user info. Returns the user row.
+
+        Calls arriving within USER_UPSERT_WINDOW seconds are written together
+        in one transaction (see _write_upserts); repeated calls for the same
+        user in a batch are coalesced and the last name wins.
+        """
         # --- QAT'IY VALIDATSIYA (Strong Data) ---
         if not telegram_id:
             raise ValueError("Telegram ID bo'sh bo'lishi mumkin emas!")
-            
-        db = await Database.connect()
-        await db.execute(
-            """
-            INSERT INTO users (telegram_id, full_name, username)
-            VALUES (?, ?, ?)
-            ON CONFLICT(telegram_id) DO UPDATE SET
-                full_name = excluded.full_name,
-                username = excluded.username
-            """,
-            (int(telegram_id), str(full_name).strip(), str(username or "").strip()),
-        )
-        await db.commit()
-        return await UserModel.get_by_telegram_id(telegram_id)
+
+        telegram_id = int(telegram_id)
+        future = asyncio.get_running_loop().create_future()
+        pending = UserModel._pending_upserts
+        waiters = pending[telegram_id][2] if telegram_id in pending else []
+        waiters.append(future)
+        pending[telegram_id] = (str(full_name).strip(), str(username or "").strip(), waiters)
+
+        if len(pending) >= USER_UPSERT_BATCH:
+            UserModel._flush_upserts()
+        elif UserModel._upsert_timer is None:
+            UserModel._upsert_timer = asyncio.get_running_loop().call_later(
+                USER_UPSERT_WINDOW, UserModel._flush_upserts
+            )
+        return await future
+
+    @staticmethod
+    def _flush_upserts() -> None:
+        """Hand the pending upserts to a background batch write."""
+        if UserModel._upsert_timer is not None:
+            UserModel._upsert_timer.cancel()
+            UserModel._upsert_timer = None
+        batch = UserModel._pending_upserts
+        if not batch:
+            return
+        UserModel._pending_upserts = {}
+        task = asyncio.get_running_loop().create_task(UserModel._write_upserts(batch))
+        UserModel._upsert_tasks.add(task)
+        task.add_done_callback(UserModel._upsert_tasks.discard)
+
+    @staticmethod
+    async def flush_upserts() -> None:
+        """Write pending upserts now and wait for running batch writes (on shutdown)."""
+        UserModel._flush_upserts()
+        if UserModel._upsert_tasks:
+            await asyncio.gather(*UserModel._upsert_tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _write_upserts(batch: dict[int, tuple[str, str, list[asyncio.Future]]]) -> None:
+        """Upsert a batch of users in one transaction and resolve their futures.
+
+        sqlite3's executemany cannot return rows, so each chunk is a single
+        multi-row INSERT ... ON CONFLICT DO UPDATE ... RETURNING *.
+        """
+        items = list(batch.items())
+        rows: dict[int, dict] = {}
+        try:
+            async with Database.write() as db:
+                for start in range(0, len(items), UPSERT_CHUNK):
+                    chunk = items[start:start + UPSERT_CHUNK]
+                    values = ", ".join("(?, ?, ?)" for _ in chunk)
+                    params = [
+                        value
+                        for telegram_id, (full_name, username, _) in chunk
+                        for value in (telegram_id, full_name, username)
+                    ]
+                    cursor = await db.execute(
+                        f"""
+                        INSERT INTO users (telegram_id, full_name, username)
+                        VALUES {values}
+                        ON CONFLICT(telegram_id) DO UPDATE SET
+                            full_name = excluded.full_name,
+                            username = excluded.username
+                        RETURNING *
+                        """,
+                        params,
+                    )
+                    for row in await cursor.fetchall():
+                        rows[row["telegram_id"]] = dict(row)
+        except Exception as e:
+            logger.error("User upsert batch (%s users) failed: %s", len(items), e)
+            for _, (_, _, waiters) in items:
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for telegram_id, (_, _, waiters) in items:
+            user = rows.get(telegram_id)
+            if user is not None:
+                UserModel._remember(user)
+            for future in waiters:
+                if not future.done():
+                    future.set_result(dict(user) if user is not None else None)
+
+    @staticmethod
+    def _remember(user: dict) -> None:
+        """Put a user row into the identity LRU."""
+        identities = UserModel._identities
+        identities.pop(user["telegram_id"], None)
+        identities[user["telegram_id"]] = (user["id"], user["full_name"], user["username"])
+        if len(identities) > USER_CACHE_SIZE:
+            identities.popitem(last=False)
+
+    @staticmethod
+    async def get_context(
+        telegram_id: int, full_name: str, username: str, is_admin: bool = False
+    ) -> UserContext:
+        """Resolve the current user from the LRU, registering or renaming lazily.
+
+        The database is only touched on a cache miss for an unknown user
+        or when the Telegram name/username changed.
+        """
+        full_name = str(full_name or "").strip()
+        username = str(username or "").strip()
+        identity = UserModel._identities.get(telegram_id)
+        if identity is None:
+            user = await UserModel.get_by_telegram_id(telegram_id)
+            if user is not None:
+                UserModel._remember(user)
+                identity = (user["id"], user["full_name"], user["username"])
+        else:
+            UserModel._identities.move_to_end(telegram_id)
+
+        if identity is None or identity[1:] != (full_name, username):
+            user = await UserModel.create_or_update(telegram_id, full_name, username)
+            identity = (user["id"], user["full_name"], user["username"])
+        return UserContext(identity[0], telegram_id, identity[1], identity[2], is_admin)
 
     @staticmethod
     async def get_by_telegram_id(telegram_id: int) -> dict | None:
         """Fetch a user row by their Telegram ID."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM users WHERE telegram_id = ?", (telegram_id,)
-        )
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT * FROM users WHERE telegram_id = ?", (telegram_id,)
+            )
+            row = await cursor.fetchone()
+            return dict(row) if row else None
 
     @staticmethod
     async def get_by_id(user_id: int) -> dict | None:
         """Fetch a user row by internal database ID."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            row = await cursor.fetchone()
+            return dict(row) if row else None
 
     @staticmethod
-    async def set_vip(telegram_id: int, expire_date: str) -> None:
-        """Activate VIP status for a user with an expiration date."""
-        db = await Database.connect()
-        await db.execute(
-            "UPDATE users SET is_vip = 1, vip_expire_date = ? WHERE telegram_id = ?",
-            (expire_date, telegram_id),
-        )
-        await db.commit()
+    async def set_vip(telegram_id: int, expire_date: str) -> bool:
+        """Activate VIP status for a user with an expiration date.
+
+        Returns False (and changes nothing) if there is no such user.
+        """
+        async with Database.write() as db:
+            cursor = await db.execute(
+                "UPDATE users SET is_vip = 1, vip_expire_date = ? WHERE telegram_id = ?",
+                (expire_date, telegram_id),
+            )
+            if not cursor.rowcount:
+                return False
+            await CacheSync.bump(db, CacheSync.VIP)
+        UserModel._vip_until[telegram_id] = datetime.strptime(expire_date, VIP_DATE_FORMAT)
+        return True
 
     @staticmethod
     async def remove_vip(telegram_id: int) -> None:
         """Deactivate VIP status for a user."""
-        db = await Database.connect()
-        await db.execute(
-            "UPDATE users SET is_vip = 0, vip_expire_date = NULL WHERE telegram_id = ?",
-            (telegram_id,),
-        )
-        await db.commit()
+        async with Database.write() as db:
+            await db.execute(
+                "UPDATE users SET is_vip = 0, vip_expire_date = NULL WHERE telegram_id = ?",
+                (telegram_id,),
+            )
+            await CacheSync.bump(db, CacheSync.VIP)
+        UserModel._vip_until.pop(telegram_id, None)
 
     @staticmethod
-    async def get_all_users() -> list[dict]:
-        """Retrieve all registered users."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT * FROM users ORDER BY joined_date DESC")
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+    async def load_vips() -> None:
+        """Load the expiry of every VIP user into memory."""
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT telegram_id, vip_expire_date FROM users WHERE is_vip = 1"
+            )
+            rows = await cursor.fetchall()
+        vip_until = {}
+        for row in rows:
+            try:
+                vip_until[row["telegram_id"]] = datetime.strptime(row["vip_expire_date"], VIP_DATE_FORMAT)
+            except (ValueError, TypeError):
+                # Missing or malformed date: treated as not active
+                continue
+        UserModel._vip_until = vip_until
 
     @staticmethod
-    async def get_count() -> int:
-        """Return the total number of registered users."""
-        db = await Database.connect()
-        cursor = await db.execute("SELECT COUNT(*) as cnt FROM users")
-        row = await cursor.fetchone()
-        return row["cnt"] if row else 0
+    def get_vip_expiry(telegram_id: int) -> datetime | None:
+        """Return the in-memory VIP expiry of a user, or None if not VIP."""
+        return UserModel._vip_until.get(telegram_id)
+
+    @staticmethod
+    async def expire_vips(now: datetime | None = None) -> list[int]:
+        """Revoke every VIP whose expiry has passed. Returns their telegram_ids."""
+        cutoff = (now or datetime.now()).strftime(VIP_DATE_FORMAT)
+        async with Database.write() as db:
+            cursor = await db.execute(
+                """
+                UPDATE users SET is_vip = 0, vip_expire_date = NULL
+                WHERE is_vip = 1 AND vip_expire_date <= ?
+                RETURNING telegram_id
+                """,
+                (cutoff,),
+            )
+            expired = [row["telegram_id"] for row in await cursor.fetchall()]
+            if expired:
+                await CacheSync.bump(db, CacheSync.VIP)
+        for telegram_id in expired:
+            UserModel._vip_until.pop(telegram_id, None)
+        return expired
+
+    @staticmethod
+    async def iter_users(
+        chunk_size: int = USER_SCAN_CHUNK, after_id: int = 0, vip_only: bool = False
+    ) -> AsyncIterator[UserRecord]:
+        """Yield users with id > after_id in id order, `chunk_size` rows per query.
+
+        Memory stays at one chunk whatever the user count, and a read
+        connection is only held while a chunk is fetched, so the consumer
+        may be slow (e.g. a broadcast waiting on the rate limiter).
+        """
+        where = "id > ? AND is_vip = 1" if vip_only else "id > ?"
+        while True:
+            async with Database.read() as db:
+                cursor = await db.execute(
+                    f"SELECT {RECORD_COLUMNS} FROM users WHERE {where} ORDER BY id LIMIT ?",
+                    (after_id, chunk_size),
+                )
+                rows = await cursor.fetchall()
+            for row in rows:
+                yield UserRecord(*row)
+            if len(rows) < chunk_size:
+                return
+            after_id = rows[-1]["id"]
 
+    @staticmethod
+    async def iter_vip_users(chunk_size: int = USER_SCAN_CHUNK) -> AsyncIterator[UserRecord]:
+        """Yield VIP users in id order (see iter_users)."""
+        async for user in UserModel.iter_users(chunk_size, vip_only=True):
+            yield user
 
     @staticmethod
-    async def get_vip_users() -> list[dict]:
-        """Retrieve all VIP users."""
-        db = await Database.connect()
-        cursor = await db.execute(
-            "SELECT * FROM users WHERE is_vip = 1 ORDER BY vip_expire_date DESC"
-        )
-        rows = await cursor.fetchall()
-        return [dict(r) for r in rows]
+    async def get_count() -> int:
+        """Return the total number of registered users."""
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT COUNT(*) as cnt FROM users")
+            row = await cursor.fetchone()
+            return row["cnt"] if row else 0
@@ -0,0 +1,176 @@
+"""
+models/view_counter.py - Write-behind buffer for view counters.
+Aggregates anime, episode and shorts view increments in memory and
+flushes them to the database as one batched transaction.
+"""
+
+import asyncio
+import logging
+
+import aiosqlite
+
+from database import Database
+from models.catalog import CatalogCache
+from config import VIEW_FLUSH_INTERVAL, VIEW_FLUSH_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """In-process view counter buffer shared by all models."""
+
+    TABLES = ("anime", "episodes", "shorts")
+
+    # table -> {row_id: delta} waiting to be flushed
+    _pending: dict[str, dict[int, int]] = {t: {} for t in TABLES}
+    # table -> {row_id: delta} currently being written by flush()
+    _inflight: dict[str, dict[int, int]] = {t: {} for t in TABLES}
+    # Unique (short_id, user_id) pairs for short_views
+    _short_views: set[tuple[int, int]] = set()
+    _inflight_short_views: set[tuple[int, int]] = set()
+
+    _lock = asyncio.Lock()
+    _task: asyncio.Task | None = None
+    _flush_task: asyncio.Task | None = None
+
+    @classmethod
+    def add(cls, table: str, row_id: int, amount: int = 1) -> None:
+        """Queue a view increment for a row."""
+        bucket = cls._pending[table]
+        bucket[row_id] = bucket.get(row_id, 0) + amount
+        cls._maybe_flush()
+
+    @classmethod
+    def add_short_view(cls, short_id: int, user_id: int) -> None:
+        """Queue a unique short view together with its counter increment."""
+        cls._short_views.add((short_id, user_id))
+        cls.add("shorts", short_id)
+
+    @classmethod
+    def has_short_view(cls, short_id: int, user_id: int) -> bool:
+        """Return True if this unique short view is still waiting to be flushed."""
+        key = (short_id, user_id)
+        return key in cls._short_views or key in cls._inflight_short_views
+
+    @classmethod
+    def discard(cls, table: str, row_id: int) -> None:
+        """Drop buffered increments for a deleted row (and its unique short views)."""
+        cls._pending[table].pop(row_id, None)
+        if table == "shorts":
+            cls._short_views = {key for key in cls._short_views if key[0] != row_id}
+
+    @classmethod
+    def pending(cls, table: str, row_id: int) -> int:
+        """Return the not-yet-persisted delta for a row."""
+        return cls._pending[table].get(row_id, 0) + cls._inflight[table].get(row_id, 0)
+
+    @classmethod
+    def pending_total(cls, table: str) -> int:
+        """Return the sum of all not-yet-persisted deltas for a table."""
+        return sum(cls._pending[table].values()) + sum(cls._inflight[table].values())
+
+    @classmethod
+    def apply(cls, table: str, row: dict | None) -> dict | None:
+        """Add pending deltas to a row's 'views' so displayed counts never go backwards."""
+        if row and "views" in row:
+            row["views"] += cls.pending(table, row["id"])
+        return row
+
+    @classmethod
+    def size(cls) -> int:
+        """Number of distinct buffered entries."""
+        return sum(len(b) for b in cls._pending.values()) + len(cls._short_views)
+
+    @classmethod
+    def _maybe_flush(cls) -> None:
+        """Schedule a flush when the buffer reaches the size threshold."""
+        if cls.size() < VIEW_FLUSH_THRESHOLD:
+            return
+        if cls._flush_task is not None and not cls._flush_task.done():
+            return
+        try:
+            cls._flush_task = asyncio.get_running_loop().create_task(cls.flush())
+        except RuntimeError:
+            # No running loop (e.g. during shutdown); the next flush will pick it up
+            pass
+
+    @classmethod
+    async def flush(cls) -> None:
+        """Write all buffered increments in a single transaction."""
+        async with cls._lock:
+            if not cls.size():
+                return
+
+            for table in cls.TABLES:
+                cls._inflight[table], cls._pending[table] = cls._pending[table], {}
+            cls._inflight_short_views, cls._short_views = cls._short_views, set()
+
+            try:
+                async with Database.write() as db:
+                    if cls._inflight_short_views:
+                        # OR IGNORE does not cover foreign keys: skip pairs whose
+                        # short or user was deleted while the view was buffered
+                        await db.executemany(
+                            """
+                            INSERT OR IGNORE INTO short_views (short_id, user_id)
+                            SELECT ?, ?
+                            WHERE EXISTS (SELECT 1 FROM shorts WHERE id = ?)
+                              AND EXISTS (SELECT 1 FROM users WHERE id = ?)
+                            """,
+                            [(s, u, s, u) for s, u in cls._inflight_short_views],
+                        )
+                    for table in cls.TABLES:
+                        deltas = cls._inflight[table]
+                        if deltas:
+                            await db.executemany(
+                                f"UPDATE {table} SET views = views + ? WHERE id = ?",
+                                [(delta, row_id) for row_id, delta in deltas.items()],
+                            )
+                # Cached catalog rows now need the persisted deltas
+                CatalogCache.add_views(cls._inflight["anime"])
+            except Exception as e:
+                logger.error("View counter flush failed, keeping deltas: %s", e)
+                # Return the deltas to the buffer so nothing is lost
+                for table in cls.TABLES:
+                    for row_id, delta in cls._inflight[table].items():
+                        cls._pending[table][row_id] = cls._pending[table].get(row_id, 0) + delta
+                # A constraint error would repeat on every retry and block all
+                # counters; only the short_views inserts can raise one
+                if isinstance(e, aiosqlite.IntegrityError):
+                    logger.error("Dropping %s buffered short views", len(cls._inflight_short_views))
+                else:
+                    cls._short_views |= cls._inflight_short_views
+            finally:
+                for table in cls.TABLES:
+                    cls._inflight[table] = {}
+                cls._inflight_short_views = set()
+
+    @classmethod
+    async def _run(cls) -> None:
+        """Periodic flush loop."""
+        while True:
+            await asyncio.sleep(VIEW_FLUSH_INTERVAL)
+            try:
+                await cls.flush()
+            except Exception as e:
+                logger.error("View counter loop error: %s", e)
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the periodic flush task."""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.get_running_loop().create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop the periodic task and flush everything that is left."""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        if cls._flush_task is not None and not cls._flush_task.done():
+            await cls._flush_task
+        await cls.flush()
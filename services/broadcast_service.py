@@ -0,0 +1,377 @@
+"""
+services/broadcast_service.py - Broadcast (ommaviy xabar) dvigateli.
+Xabarni fon vazifasida, cheklangan parallel workerlar va umumiy
+token bucket orqali barcha foydalanuvchilarga yuboradi.
+Jarayon broadcast_jobs jadvalida saqlanadi: pauza, davom ettirish,
+bekor qilish va qayta ishga tushgandan keyin davom etish mumkin.
+
+Yetkazish "kamida bir marta": progress har BROADCAST_CHECKPOINT_EVERY
+qabul qiluvchidan keyin saqlanadi, jarayon kutilmaganda to'xtasa oxirgi
+saqlanmagan qism (ko'pi bilan shuncha foydalanuvchi) qayta yuboriladi.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from collections import deque
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from config import (
+    BROADCAST_RATE,
+    BROADCAST_WORKERS,
+    BROADCAST_CHUNK_SIZE,
+    BROADCAST_STATUS_INTERVAL,
+    BROADCAST_CHECKPOINT_EVERY,
+)
+from models.user import UserModel
+from models.broadcast import BroadcastModel
+from utils.rate_limit import TokenBucket, send_priority, PRIORITY_BROADCAST
+
+logger = logging.getLogger(__name__)
+
+# Bitta qabul qiluvchiga maksimal urinishlar (RetryAfter dan keyin)
+MAX_ATTEMPTS = 3
+
+# broadcast_jobs.owner - jobni qaysi jarayon yuborayotgani
+ENGINE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class BroadcastEngine:
+    """Bitta broadcast jobi (fon vazifasi sifatida ishlaydi)."""
+
+    # job_id -> ishlayotgan engine
+    _engines: dict[int, "BroadcastEngine"] = {}
+
+    def __init__(self, bot: Bot, job: dict) -> None:
+        self.bot = bot
+        self.job_id: int = job["id"]
+        self.from_chat_id: int = job["from_chat_id"]
+        self.message_id: int = job["message_id"]
+        self.admin_chat_id: int = job["admin_chat_id"]
+        self.status_message_id: int | None = job["status_message_id"]
+
+        self.total: int = job["total"]
+        self.sent: int = job["sent"]
+        self.blocked: int = job["blocked"]
+        self.errors: int = job["errors"]
+        self.cursor: int = job["last_user_id"]
+
+        self._bucket = TokenBucket(BROADCAST_RATE, capacity=BROADCAST_RATE)
+        # RetryAfter bo'lganda barcha workerlar shu event orqali to'xtaydi
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._resume_at = 0.0
+
+        # Pauza/bekor qilish/o'chirish signali va keyingi holat
+        self._stop = asyncio.Event()
+        self._stop_status: str | None = None
+
+        # Cursor hisobi: navbatga qo'yilgan id lar (o'sish tartibida) va tugaganlari
+        self._dispatched: deque[int] = deque()
+        self._done: set[int] = set()
+        self._outcomes: list[tuple[int, str]] = []
+        # Oxirgi saqlashdan beri tugagan qabul qiluvchilar soni
+        self._unsaved = 0
+        self._checkpoint_due = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    # ---- Boshqaruv ----
+
+    @classmethod
+    async def create(cls, bot: Bot, from_chat_id: int, message_id: int, admin_chat_id: int) -> int:
+        """Yangi job yaratish, holat xabarini yuborish va ishga tushirish."""
+        from keyboards.inline import broadcast_control_keyboard
+
+        total = await UserModel.get_count()
+        job_id = await BroadcastModel.create(
+            from_chat_id, message_id, admin_chat_id, total, ENGINE_OWNER
+        )
+        status_msg = await bot.send_message(
+            admin_chat_id,
+            f"⏳ <b>Yuborish boshlandi...</b> (#{job_id})\n"
+            f"Jami: {total} foydalanuvchi",
+            reply_markup=broadcast_control_keyboard(job_id, BroadcastModel.RUNNING),
+        )
+        await BroadcastModel.set_status_message(job_id, status_msg.message_id)
+        await cls.launch(bot, job_id)
+        return job_id
+
+    @classmethod
+    async def launch(cls, bot: Bot, job_id: int) -> bool:
+        """Shu jarayon egallagan (claim) jobni ishga tushirish."""
+        if job_id in cls._engines:
+            return False
+        job = await BroadcastModel.get(job_id)
+        if not job:
+            return False
+        engine = cls(bot, job)
+        cls._engines[job_id] = engine
+        engine._task = asyncio.create_task(engine.run())
+        return True
+
+    @classmethod
+    async def pause(cls, job_id: int) -> bool:
+        # Faqat ishlayotgan job: tugagan/bekor qilingan job qayta jonlanmasin
+        if not await BroadcastModel.pause(job_id):
+            return False
+        await cls._stop_engine(job_id, BroadcastModel.PAUSED)
+        return True
+
+    @classmethod
+    async def resume(cls, bot: Bot, job_id: int) -> bool:
+        # Bazada egallash: ikki jarayon bir vaqtda bossa ham faqat bittasi boshlaydi
+        if not await BroadcastModel.claim(job_id, ENGINE_OWNER, BroadcastModel.PAUSED):
+            return False
+        return await cls.launch(bot, job_id)
+
+    @classmethod
+    async def cancel(cls, job_id: int) -> None:
+        await cls._stop_engine(job_id, BroadcastModel.CANCELLED)
+        await BroadcastModel.set_status(job_id, BroadcastModel.CANCELLED)
+
+    @classmethod
+    async def _stop_engine(cls, job_id: int, status: str | None) -> None:
+        engine = cls._engines.get(job_id)
+        if engine is None:
+            return
+        engine._stop_status = status
+        engine._stop.set()
+        if engine._task is not None:
+            await asyncio.gather(engine._task, return_exceptions=True)
+
+    @classmethod
+    async def resume_interrupted(cls, bot: Bot) -> None:
+        """Bot qayta ishga tushganda uzilib qolgan joblarni davom ettirish."""
+        for job in await BroadcastModel.get_by_status(BroadcastModel.RUNNING):
+            if not await BroadcastModel.claim(job["id"], ENGINE_OWNER, BroadcastModel.RUNNING):
+                continue
+            logger.info("Broadcast #%s davom ettirilmoqda (cursor=%s)", job["id"], job["last_user_id"])
+            await cls.launch(bot, job["id"])
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Bot to'xtaganda barcha joblarni saqlab to'xtatish (status 'running' qoladi)."""
+        for job_id in list(cls._engines):
+            await cls._stop_engine(job_id, None)
+
+    # ---- Flood control ----
+
+    def _pause_workers(self, seconds: float) -> None:
+        """Barcha workerlarni `seconds` soniyaga to'xtatish."""
+        loop = asyncio.get_running_loop()
+        resume_at = loop.time() + seconds
+        if resume_at <= self._resume_at:
+            return
+        self._resume_at = resume_at
+        self._resumed.clear()
+        loop.call_at(resume_at, self._maybe_resume)
+        logger.warning("Broadcast #%s: RetryAfter %ss - barcha workerlar kutmoqda", self.job_id, seconds)
+
+    def _maybe_resume(self) -> None:
+        if asyncio.get_running_loop().time() >= self._resume_at:
+            self._resumed.set()
+
+    # ---- Ishchi qismlar ----
+
+    async def _send(self, chat_id: int) -> str:
+        """Bitta foydalanuvchiga xabarni nusxalash. Natija: sent | blocked | error."""
+        for _ in range(MAX_ATTEMPTS):
+            await self._resumed.wait()
+            await self._bucket.acquire()
+            try:
+                await self.bot.copy_message(
+                    chat_id=chat_id,
+                    from_chat_id=self.from_chat_id,
+                    message_id=self.message_id,
+                )
+                self.sent += 1
+                return "sent"
+            except TelegramRetryAfter as e:
+                self._pause_workers(e.retry_after)
+            except TelegramForbiddenError:
+                self.blocked += 1
+                return "blocked"
+            except Exception as e:
+                logger.error(f"Broadcast error to {chat_id}: {e}")
+                self.errors += 1
+                return "error"
+        self.errors += 1
+        return "error"
+
+    def _complete(self, user_id: int, state: str | None) -> None:
+        """Qabul qiluvchini tugagan deb belgilash va cursorni siljitish."""
+        self._done.add(user_id)
+        if state is not None:
+            self._outcomes.append((user_id, state))
+            self._unsaved += 1
+            if self._unsaved >= BROADCAST_CHECKPOINT_EVERY:
+                self._checkpoint_due.set()
+        while self._dispatched and self._dispatched[0] in self._done:
+            self.cursor = self._dispatched.popleft()
+            self._done.discard(self.cursor)
+
+    async def _checkpoint(self) -> bool:
+        """Progressni saqlash. Job boshqa jarayonga o'tgan bo'lsa False."""
+        self._unsaved = 0
+        self._checkpoint_due.clear()
+        outcomes, self._outcomes = self._outcomes, []
+        # Cursordan past natijalar last_user_id bilan qoplanadi
+        outcomes = [(u, s) for u, s in outcomes if u > self.cursor]
+        return await BroadcastModel.checkpoint(
+            self.job_id, ENGINE_OWNER, self.cursor, self.sent, self.blocked, self.errors, outcomes
+        )
+
+    async def _producer(self, queue: asyncio.Queue) -> None:
+        """Qabul qiluvchilarni bazadan cursordan boshlab bo'laklab (chunk) o'qish."""
+        already_done = await BroadcastModel.get_done_user_ids(self.job_id)
+        async for user in UserModel.iter_users(BROADCAST_CHUNK_SIZE, after_id=self.cursor):
+            if self._stop.is_set():
+                break
+            self._dispatched.append(user.id)
+            if user.id in already_done:
+                self._complete(user.id, None)
+                continue
+            await queue.put((user.id, user.telegram_id))
+        for _ in range(BROADCAST_WORKERS):
+            await queue.put(None)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if self._stop.is_set():
+                # Yuborilmagan - cursor bu foydalanuvchidan o'tmaydi
+                continue
+            user_id, telegram_id = item
+            self._complete(user_id, await self._send(telegram_id))
+
+    async def _update_status(self, text: str, reply_markup=None) -> None:
+        if not self.status_message_id:
+            return
+        try:
+            await self.bot.edit_message_text(
+                text,
+                chat_id=self.admin_chat_id,
+                message_id=self.status_message_id,
+                reply_markup=reply_markup,
+            )
+        except Exception:
+            pass
+
+    def _progress_text(self, title: str) -> str:
+        processed = self.sent + self.blocked + self.errors
+        return (
+            f"{title} (#{self.job_id}) ({processed}/{self.total})</b>\n\n"
+            f"✅ Yuborildi: {self.sent}\n"
+            f"🚫 Bloklagan: {self.blocked}\n"
+            f"❌ Xatolik: {self.errors}"
+        )
+
+    async def _reporter(self) -> None:
+        """Progressni saqlash va holat xabarini vaqti-vaqti bilan yangilash.
+
+        Progress har BROADCAST_CHECKPOINT_EVERY qabul qiluvchidan keyin va
+        kamida har BROADCAST_STATUS_INTERVAL soniyada saqlanadi; holat
+        xabari faqat intervalda yangilanadi.
+        """
+        from keyboards.inline import broadcast_control_keyboard
+
+        loop = asyncio.get_running_loop()
+        last_text = ""
+        report_at = loop.time() + BROADCAST_STATUS_INTERVAL
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._checkpoint_due.wait(), timeout=max(0.0, report_at - loop.time())
+                )
+            except asyncio.TimeoutError:
+                pass
+            if loop.time() < report_at:
+                try:
+                    if not await self._checkpoint():
+                        self._lost_ownership()
+                        return
+                except Exception as e:
+                    logger.error(f"Broadcast checkpoint error: {e}")
+                continue
+            report_at = loop.time() + BROADCAST_STATUS_INTERVAL
+            try:
+                if not await self._checkpoint():
+                    self._lost_ownership()
+                    return
+                # Pauza/bekor qilish boshqa worker jarayonida bosilgan bo'lishi mumkin
+                job = await BroadcastModel.get(self.job_id)
+                if job and job["status"] != BroadcastModel.RUNNING:
+                    self._stop_status = job["status"]
+                    self._stop.set()
+                    return
+            except Exception as e:
+                logger.error(f"Broadcast checkpoint error: {e}")
+            text = self._progress_text("⏳ <b>Yuborish davom etmoqda...")
+            if text != last_text:
+                await self._update_status(
+                    text, broadcast_control_keyboard(self.job_id, BroadcastModel.RUNNING)
+                )
+                last_text = text
+
+    def _lost_ownership(self) -> None:
+        """Job boshqa jarayonda davom ettirilgan - jim to'xtash."""
+        logger.warning("Broadcast #%s boshqa jarayonga o'tdi - to'xtatilmoqda", self.job_id)
+        self._stop_status = None
+        self._stop.set()
+
+    async def run(self) -> None:
+        """Jobni cursordan boshlab oxirigacha (yoki to'xtatilguncha) bajarish."""
+        from keyboards.inline import broadcast_control_keyboard
+        from keyboards.reply import admin_main_menu
+
+        # Foydalanuvchilarga javoblar broadcastdan oldin yuboriladi
+        send_priority.set(PRIORITY_BROADCAST)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=BROADCAST_WORKERS * 4)
+        reporter = asyncio.create_task(self._reporter())
+        try:
+            await asyncio.gather(
+                self._producer(queue),
+                *(self._worker(queue) for _ in range(BROADCAST_WORKERS)),
+            )
+        except Exception as e:
+            logger.error(f"Broadcast #{self.job_id} stopped: {e}")
+        finally:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+            try:
+                await self._checkpoint()
+            except Exception as e:
+                logger.error(f"Broadcast checkpoint error: {e}")
+            self._engines.pop(self.job_id, None)
+
+        if self._stop.is_set():
+            if self._stop_status == BroadcastModel.PAUSED:
+                await self._update_status(
+                    self._progress_text("⏸ <b>Pauza qilindi"),
+                    broadcast_control_keyboard(self.job_id, BroadcastModel.PAUSED),
+                )
+            elif self._stop_status == BroadcastModel.CANCELLED:
+                await self._update_status(self._progress_text("✖ <b>Bekor qilindi"))
+            return
+
+        await BroadcastModel.set_status(self.job_id, BroadcastModel.FINISHED)
+        try:
+            await self.bot.send_message(
+                self.admin_chat_id,
+                f"🏁 <b>Yuborish yakunlandi!</b> (#{self.job_id})\n━━━━━━━━━━━━━━━━━━\n\n"
+                f"✅ <b>Yuborildi:</b> {self.sent}\n"
+                f"🚫 <b>Bloklagan:</b> {self.blocked}\n"
+                f"❌ <b>Xatolik:</b> {self.errors}\n\n"
+                f"Jami: {self.sent + self.blocked + self.errors}",
+                reply_markup=admin_main_menu()
+            )
+            if self.status_message_id:
+                await self.bot.delete_message(self.admin_chat_id, self.status_message_id)
+        except Exception as e:
+            logger.error(f"Broadcast report error: {e}")
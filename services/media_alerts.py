@@ -0,0 +1,146 @@
+"""
+services/media_alerts.py - Media xatoliklari haqida adminlarga xabar berish.
+Xatoliklar (media turi, fayl, joy) bo'yicha guruhlanadi: bir oyna
+(MEDIA_ALERT_WINDOW) ichidagi barcha holatlar uchun adminlarga bitta
+xulosa yuboriladi. Yuborish fon vazifasida bajariladi - foydalanuvchi
+so'rovi kutib qolmaydi.
+"""
+
+import asyncio
+import html
+import logging
+import time
+
+from aiogram import Bot
+
+from config import ADMIN_IDS, MEDIA_ALERT_WINDOW
+from utils.rate_limit import send_priority, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+# Bir vaqtda kuzatiladigan maksimal (tur, fayl, joy) kalitlari
+MAX_PENDING = 500
+# Xabarda ko'rsatiladigan foydalanuvchilar soni
+SAMPLE_USERS = 3
+
+
+class _Alert:
+    """Bitta (tur, fayl, joy) kaliti bo'yicha yig'ilgan holatlar."""
+
+    __slots__ = ("media_type", "media", "context_info", "error", "first_seen", "hits", "users")
+
+    def __init__(self, media_type: str, media: str, context_info: str, first_seen: float) -> None:
+        self.media_type = media_type
+        self.media = media
+        self.context_info = context_info
+        self.error = ""
+        self.first_seen = first_seen
+        self.hits = 0
+        # user_id -> ism (faqat SAMPLE_USERS tagacha)
+        self.users: dict[int, str] = {}
+
+
+class MediaAlerts:
+    """Media xatoliklarini yig'ib, adminlarga xulosa yuborish."""
+
+    # (media_type, media, context_info) -> yig'ilayotgan alert
+    _pending: dict[tuple[str, str, str], _Alert] = {}
+    # MAX_PENDING dan oshib, tashlab yuborilgan holatlar soni
+    _overflow: int = 0
+    _bot: Bot | None = None
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    def report(
+        bot: Bot,
+        media_type: str,
+        media: str,
+        context_info: str,
+        error: Exception,
+        user_id: int,
+        user_name: str,
+    ) -> None:
+        """Xatolikni qayd etish (kutmaydi, darhol qaytadi)."""
+        key = (media_type, media, context_info)
+        alert = MediaAlerts._pending.get(key)
+        if alert is None:
+            if len(MediaAlerts._pending) >= MAX_PENDING:
+                MediaAlerts._overflow += 1
+                return
+            alert = _Alert(media_type, media, context_info, time.monotonic())
+            MediaAlerts._pending[key] = alert
+        alert.hits += 1
+        alert.error = str(error)
+        if len(alert.users) < SAMPLE_USERS:
+            alert.users[user_id] = user_name
+
+        MediaAlerts._bot = bot
+        if MediaAlerts._task is None or MediaAlerts._task.done():
+            MediaAlerts._task = asyncio.get_running_loop().create_task(MediaAlerts._run())
+
+    @staticmethod
+    def _format(alert: _Alert) -> str:
+        users = ", ".join(
+            f"<a href='tg://user?id={uid}'>{html.escape(name)}</a> (<code>{uid}</code>)"
+            for uid, name in alert.users.items()
+        )
+        return (
+            f"‼️ <b>MEDIA XATOLIGI ({alert.media_type.upper()})</b>\n\n"
+            f"📍 <b>Joy:</b> {alert.context_info}\n"
+            f"🔁 <b>Holatlar:</b> {alert.hits} ta (so'nggi {MEDIA_ALERT_WINDOW:g} soniyada)\n"
+            f"👤 <b>Userlar:</b> {users}\n"
+            f"❌ <b>Xato:</b> <code>{html.escape(alert.error)}</code>\n"
+            f"🔗 <b>Fayl:</b> <code>{alert.media}</code>"
+        )
+
+    @staticmethod
+    async def _send(alert: _Alert) -> None:
+        from keyboards.inline import admin_fix_media_keyboard
+
+        text = MediaAlerts._format(alert)
+        fix_kb = admin_fix_media_keyboard(alert.context_info, alert.media_type)
+        for admin_id in ADMIN_IDS:
+            try:
+                await MediaAlerts._bot.send_message(admin_id, text, reply_markup=fix_kb, parse_mode="HTML")
+            except Exception as e:
+                logger.warning(f"Media alertni adminga ({admin_id}) yuborib bo'lmadi: {e}")
+
+    @staticmethod
+    async def flush(force: bool = False) -> None:
+        """Oynasi tugagan (yoki force=True bo'lsa barcha) alertlarni yuborish."""
+        now = time.monotonic()
+        due = [
+            key for key, alert in MediaAlerts._pending.items()
+            if force or now - alert.first_seen >= MEDIA_ALERT_WINDOW
+        ]
+        alerts = [MediaAlerts._pending.pop(key) for key in due]
+        if MediaAlerts._overflow:
+            logger.error(f"Media alertlar: {MediaAlerts._overflow} ta holat limitdan oshib tashlandi")
+            MediaAlerts._overflow = 0
+        for alert in alerts:
+            logger.error(
+                f"Media error ({alert.media_type}) x{alert.hits}: {alert.error} | Context: {alert.context_info}"
+            )
+            await MediaAlerts._send(alert)
+
+    @staticmethod
+    async def _run() -> None:
+        send_priority.set(PRIORITY_BACKGROUND)
+        while MediaAlerts._pending:
+            oldest = min(alert.first_seen for alert in MediaAlerts._pending.values())
+            await asyncio.sleep(max(0.0, oldest + MEDIA_ALERT_WINDOW - time.monotonic()))
+            try:
+                await MediaAlerts.flush()
+            except Exception as e:
+                logger.error(f"Media alert yuborishda xatolik: {e}")
+
+    @staticmethod
+    async def stop() -> None:
+        """Fon vazifasini to'xtatib, yig'ilgan alertlarni darhol yuborish."""
+        if MediaAlerts._task is not None:
+            MediaAlerts._task.cancel()
+            await asyncio.gather(MediaAlerts._task, return_exceptions=True)
+            MediaAlerts._task = None
+        if MediaAlerts._pending and MediaAlerts._bot is not None:
+            send_priority.set(PRIORITY_BACKGROUND)
+            await MediaAlerts.flush(force=True)
@@ -1,16 +1,108 @@
 """
 services/media_service.py - Media (photo/video) delivery service.
 Handles sending media with robust error handling and automated admin alerting.
+Remote URLs are replaced by cached Telegram file_ids (see models/media_cache.py).
 """
 
+import asyncio
 import logging
+from typing import Any, Awaitable, Callable
 from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, CallbackQuery, InputMediaPhoto, InputMediaVideo
-from config import ADMIN_IDS
+from models.media_cache import MediaCacheModel
+from services.media_alerts import MediaAlerts
+from utils.rate_limit import send_priority, PRIORITY_BACKGROUND
 
 logger = logging.getLogger(__name__)
 
 class MediaService:
+    _warmup_task: asyncio.Task | None = None
+
+    @staticmethod
+    async def deliver(
+        send: Callable[[str], Awaitable[Any]],
+        media: str,
+        media_type: str
+    ) -> Any:
+        """
+        Call send(media) with the cached file_id when the media is a URL.
+        A stale file_id is dropped and the URL is sent instead; the file_id
+        from the first successful URL send is recorded for next time.
+        """
+        if not MediaCacheModel.is_url(media):
+            return await send(media)
+
+        file_id = await MediaCacheModel.get(media)
+        if file_id:
+            try:
+                return await send(file_id)
+            except TelegramBadRequest as e:
+                if "file" not in str(e).lower():
+                    raise
+                logger.warning(f"Cached file_id rejected for {media}: {e}")
+                await MediaCacheModel.forget(media)
+
+        result = await send(media)
+        await MediaService._remember(media, result, media_type)
+        return result
+
+    @staticmethod
+    async def _remember(url: str, message: Any, media_type: str) -> None:
+        """Record the file_id of a message that was sent from a URL."""
+        if not isinstance(message, Message):
+            return
+        if media_type == "photo" and message.photo:
+            file_id = message.photo[-1].file_id
+        elif media_type == "video" and message.video:
+            file_id = message.video.file_id
+        else:
+            return
+        try:
+            await MediaCacheModel.set(url, file_id, media_type)
+        except Exception as e:
+            logger.warning(f"Failed to cache file_id for {url}: {e}")
+
+    @staticmethod
+    async def warm_up(bot: Bot, chat_id: int, urls: list[str]) -> int:
+        """
+        Upload every URL that has no cached file_id yet to chat_id, record
+        the file_ids and delete the messages. Returns the number uploaded.
+        """
+        send_priority.set(PRIORITY_BACKGROUND)
+        uploaded = 0
+        for url in dict.fromkeys(urls):
+            if not MediaCacheModel.is_url(url) or await MediaCacheModel.get(url):
+                continue
+            try:
+                message = await bot.send_photo(chat_id=chat_id, photo=url, disable_notification=True)
+                await MediaService._remember(url, message, "photo")
+                uploaded += 1
+            except Exception as e:
+                logger.error(f"Media warm-up failed for {url}: {e}")
+                continue
+            try:
+                await bot.delete_message(chat_id=chat_id, message_id=message.message_id)
+            except Exception:
+                pass
+        logger.info(f"Media warm-up finished: {uploaded} uploaded")
+        return uploaded
+
+    @staticmethod
+    def start_warm_up(bot: Bot, chat_id: int, urls: list[str]) -> None:
+        """Run warm_up in the background so startup is not delayed."""
+        MediaService._warmup_task = asyncio.get_running_loop().create_task(
+            MediaService.warm_up(bot, chat_id, urls)
+        )
+
+    @staticmethod
+    async def stop_warm_up() -> None:
+        task = MediaService._warmup_task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            MediaService._warmup_task = None
+
     @staticmethod
     async def send_photo(
         event: Message | CallbackQuery, 
@@ -19,37 +111,29 @@ class MediaService:
         reply_markup=None, 
         context_info: str = ""
     ) -> bool:
-        """Send a photo and notify admin if it fails."""
+        """Send a photo; failures are reported to admins in the background."""
         bot: Bot = event.bot
         target = event if isinstance(event, Message) else event.message
         
         try:
-            await target.answer_photo(
-                photo=photo,
-                caption=caption,
-                reply_markup=reply_markup
+            await MediaService.deliver(
+                lambda media: target.answer_photo(
+                    photo=media,
+                    caption=caption,
+                    reply_markup=reply_markup
+                ),
+                photo, "photo"
             )
             return True
         except Exception as e:
-            error_msg = f"‼️ <b>MEDIA XATOLIGI (PHOTO)</b>\n\n" \
-                        f"👤 <b>User:</b> <a href='tg://user?id={event.from_user.id}'>{event.from_user.full_name}</a> (<code>{event.from_user.id}</code>)\n" \
-                        f"📍 <b>Joy:</b> {context_info}\n" \
-                        f"❌ <b>Xato:</b> <code>{str(e)}</code>\n" \
-                        f"🔗 <b>Fayl:</b> <code>{photo}</code>"
-            
-            logger.error(f"Media error (photo): {e} | User: {event.from_user.id} | Context: {context_info}")
-            
-            # Notify admins with possible fix button
-            from keyboards.inline import admin_fix_media_keyboard
-            fix_kb = admin_fix_media_keyboard(context_info, "photo")
-            
-            for admin_id in ADMIN_IDS:
-                try:
-                    await bot.send_message(admin_id, error_msg, reply_markup=fix_kb, parse_mode="HTML")
-                except Exception:
-                    pass
+            logger.warning(f"Media error (photo): {e} | User: {event.from_user.id} | Context: {context_info}")
+
+            # Admins get one background summary per (type, file, context)
+            MediaAlerts.report(
+                bot, "photo", photo, context_info, e,
+                event.from_user.id, event.from_user.full_name
+            )
 
-            
             # Re-raise to let the handler know it failed (user doesn't want text-only fallback)
             raise e
 
@@ -61,36 +145,29 @@ class MediaService:
         reply_markup=None, 
         context_info: str = ""
     ) -> bool:
-        """Send a video and notify admin if it fails."""
+        """Send a video; failures are reported to admins in the background."""
         bot: Bot = event.bot
         target = event if isinstance(event, Message) else event.message
         
         try:
-            await target.answer_video(
-                video=video,
-                caption=caption,
-                reply_markup=reply_markup
+            await MediaService.deliver(
+                lambda media: target.answer_video(
+                    video=media,
+                    caption=caption,
+                    reply_markup=reply_markup
+                ),
+                video, "video"
             )
             return True
         except Exception as e:
-            error_msg = f"‼️ <b>MEDIA XATOLIGI (VIDEO)</b>\n\n" \
-                        f"👤 <b>User:</b> <a href='tg://user?id={event.from_user.id}'>{event.from_user.full_name}</a> (<code>{event.from_user.id}</code>)\n" \
-                        f"📍 <b>Joy:</b> {context_info}\n" \
-                        f"❌ <b>Xato:</b> <code>{str(e)}</code>\n" \
-                        f"🔗 <b>Fayl:</b> <code>{video}</code>"
-            
-            logger.error(f"Media error (video): {e} | User: {event.from_user.id} | Context: {context_info}")
-            
-            from keyboards.inline import admin_fix_media_keyboard
-            fix_kb = admin_fix_media_keyboard(context_info, "video")
-            
-            for admin_id in ADMIN_IDS:
-                try:
-                    await bot.send_message(admin_id, error_msg, reply_markup=fix_kb, parse_mode="HTML")
-                except Exception:
-                    pass
+            logger.warning(f"Media error (video): {e} | User: {event.from_user.id} | Context: {context_info}")
+
+            # Admins get one background summary per (type, file, context)
+            MediaAlerts.report(
+                bot, "video", video, context_info, e,
+                event.from_user.id, event.from_user.full_name
+            )
 
-            
             raise e
 
     @staticmethod
@@ -171,13 +248,16 @@ class MediaService:
     ) -> bool:
         """Seamlessly replace current media (photo or video) with a new video."""
         try:
-            await callback.message.edit_media(
-                media=InputMediaVideo(
-                    media=video,
-                    caption=caption,
-                    parse_mode="HTML"
+            await MediaService.deliver(
+                lambda media: callback.message.edit_media(
+                    media=InputMediaVideo(
+                        media=media,
+                        caption=caption,
+                        parse_mode="HTML"
+                    ),
+                    reply_markup=reply_markup
                 ),
-                reply_markup=reply_markup
+                video, "video"
             )
             return True
         except Exception as e:
@@ -186,11 +266,14 @@ class MediaService:
             try:
                 await callback.message.delete()
                 bot: Bot = callback.bot
-                await bot.send_video(
-                    chat_id=callback.message.chat.id,
-                    video=video,
-                    caption=caption,
-                    reply_markup=reply_markup
+                await MediaService.deliver(
+                    lambda media: bot.send_video(
+                        chat_id=callback.message.chat.id,
+                        video=media,
+                        caption=caption,
+                        reply_markup=reply_markup
+                    ),
+                    video, "video"
                 )
                 return True
             except Exception as e2:
@@ -207,13 +290,16 @@ class MediaService:
     ) -> bool:
         """Seamlessly replace current media (photo or video) with a new photo."""
         try:
-            await callback.message.edit_media(
-                media=InputMediaPhoto(
-                    media=photo,
-                    caption=caption,
-                    parse_mode="HTML"
+            await MediaService.deliver(
+                lambda media: callback.message.edit_media(
+                    media=InputMediaPhoto(
+                        media=media,
+                        caption=caption,
+                        parse_mode="HTML"
+                    ),
+                    reply_markup=reply_markup
                 ),
-                reply_markup=reply_markup
+                photo, "photo"
             )
             return True
         except Exception as e:
@@ -222,11 +308,14 @@ class MediaService:
             try:
                 await callback.message.delete()
                 bot: Bot = callback.bot
-                await bot.send_photo(
-                    chat_id=callback.message.chat.id,
-                    photo=photo,
-                    caption=caption,
-                    reply_markup=reply_markup
+                await MediaService.deliver(
+                    lambda media: bot.send_photo(
+                        chat_id=callback.message.chat.id,
+                        photo=media,
+                        caption=caption,
+                        reply_markup=reply_markup
+                    ),
+                    photo, "photo"
                 )
                 return True
             except Exception as e2:
@@ -244,11 +333,14 @@ class MediaService:
     ) -> bool:
         """Send a photo to a specific chat ID (usually for admins)."""
         try:
-            await bot.send_photo(
-                chat_id=chat_id,
-                photo=photo,
-                caption=caption,
-                reply_markup=reply_markup
+            await MediaService.deliver(
+                lambda media: bot.send_photo(
+                    chat_id=chat_id,
+                    photo=media,
+                    caption=caption,
+                    reply_markup=reply_markup
+                ),
+                photo, "photo"
             )
             return True
         except Exception as e:
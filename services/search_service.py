@@ -4,24 +4,42 @@ Turli qidiruv turlarini boshqarish va natijalarni formatlash.
 """
 
 import math
-from models.anime import AnimeModel
-from config import SEARCH_RESULTS_PER_PAGE
+from models.anime import AnimeModel, AnimeSummary
+from config import (
+    SEARCH_RESULTS_PER_PAGE,
+    SEARCH_COUNT_TTL,
+    SEARCH_CURSOR_TTL,
+    SEARCH_CACHE_SIZE,
+)
+from utils.ttl_cache import TTLCache
 
 
 class SearchService:
     """Qidiruv bilan bog'liq biznes logika xizmati."""
 
+    # (tur, qiymat) -> natijalar soni
+    _counts = TTLCache(maxsize=SEARCH_CACHE_SIZE)
+    # (tur, qiymat, sahifa) -> oldingi sahifa oxirgi qatorining keyset kursori
+    _cursors = TTLCache(maxsize=SEARCH_CACHE_SIZE)
+
     @staticmethod
-    async def search_by_title(query: str, page: int = 0) -> tuple[list[dict], int]:
+    async def search_by_title(query: str, page: int = 0) -> tuple[list[AnimeSummary], int]:
         """Nom bo'yicha qidirish. Returns (results, total_pages)."""
-        all_results = await AnimeModel.search_by_title(query, limit=100)
-        return SearchService._paginate(all_results, page)
+        # FTS reytingi ifoda - keyset qo'llanmaydi, sahifa OFFSET bilan o'qiladi
+        offset = page * SEARCH_RESULTS_PER_PAGE
+        results = await AnimeModel.search_fulltext_page(query, SEARCH_RESULTS_PER_PAGE, offset)
+        if results is None:
+            return await SearchService._listing("title", query, page)
+        total = SearchService._counts.get(("fts", query))
+        if total is None:
+            total = await AnimeModel.count_fulltext(query) or 0
+            SearchService._counts.set(("fts", query), total, SEARCH_COUNT_TTL)
+        return results, SearchService._total_pages(total)
 
     @staticmethod
-    async def search_by_genre(genre: str, page: int = 0) -> tuple[list[dict], int]:
+    async def search_by_genre(genre: str, page: int = 0) -> tuple[list[AnimeSummary], int]:
         """Janr bo'yicha qidirish. Returns (results, total_pages)."""
-        all_results = await AnimeModel.search_by_genre(genre, limit=100)
-        return SearchService._paginate(all_results, page)
+        return await SearchService._listing("genre", genre, page)
 
     @staticmethod
     async def search_by_code(code: str) -> dict | None:
@@ -29,31 +47,47 @@ class SearchService:
         return await AnimeModel.get_by_code(code)
 
     @staticmethod
-    async def get_top_anime(page: int = 0) -> tuple[list[dict], int]:
+    async def get_top_anime(page: int = 0) -> tuple[list[AnimeSummary], int]:
         """Eng ko'p ko'rilgan animelar. Returns (results, total_pages)."""
-        all_results = await AnimeModel.get_top(limit=50)
-        return SearchService._paginate(all_results, page)
+        return await SearchService._listing("top", "", page)
 
     @staticmethod
-    async def get_latest_anime(page: int = 0) -> tuple[list[dict], int]:
+    async def get_latest_anime(page: int = 0) -> tuple[list[AnimeSummary], int]:
         """Yangi qo'shilgan animelar. Returns (results, total_pages)."""
-        all_results = await AnimeModel.get_latest(limit=50)
-        return SearchService._paginate(all_results, page)
+        return await SearchService._listing("latest", "", page)
 
     @staticmethod
-    async def get_vip_anime(page: int = 0) -> tuple[list[dict], int]:
+    async def get_vip_anime(page: int = 0) -> tuple[list[AnimeSummary], int]:
         """VIP animelar. Returns (results, total_pages)."""
-        all_results = await AnimeModel.get_vip_anime(limit=50)
-        return SearchService._paginate(all_results, page)
+        return await SearchService._listing("vip", "", page)
+
+    @staticmethod
+    async def _listing(kind: str, value: str, page: int) -> tuple[list[AnimeSummary], int]:
+        """
+        Bitta sahifani bazadan o'qish. Sahifa boshining kursori ma'lum bo'lsa
+        keyset (indeks orqali), aks holda OFFSET ishlatiladi. Har bir o'qilgan
+        sahifa keyingisining kursorini eslab qoladi.
+        """
+        after = SearchService._cursors.get((kind, value, page)) if page > 0 else None
+        results, last = await AnimeModel.list_page(
+            kind,
+            value,
+            limit=SEARCH_RESULTS_PER_PAGE,
+            offset=page * SEARCH_RESULTS_PER_PAGE,
+            after=after,
+        )
+        if last is not None and len(results) == SEARCH_RESULTS_PER_PAGE:
+            SearchService._cursors.set((kind, value, page + 1), last, SEARCH_CURSOR_TTL)
+
+        total = SearchService._counts.get((kind, value))
+        if total is None:
+            total = await AnimeModel.count_listing(kind, value)
+            SearchService._counts.set((kind, value), total, SEARCH_COUNT_TTL)
+        return results, SearchService._total_pages(total)
 
     @staticmethod
-    def _paginate(items: list[dict], page: int) -> tuple[list[dict], int]:
-        """Ro'yxatni sahifalarga bo'lish."""
-        total = len(items)
-        total_pages = max(1, math.ceil(total / SEARCH_RESULTS_PER_PAGE))
-        start = page * SEARCH_RESULTS_PER_PAGE
-        end = start + SEARCH_RESULTS_PER_PAGE
-        return items[start:end], total_pages
+    def _total_pages(total: int) -> int:
+        return max(1, math.ceil(total / SEARCH_RESULTS_PER_PAGE))
 
     @staticmethod
     async def get_random_anime() -> dict | None:
@@ -17,8 +17,9 @@ class UserService:
         if not user:
             return "❌ Foydalanuvchi topilmadi."
 
-        vip_status = "💎 VIP" if user["is_vip"] else "👤 Oddiy a'zo"
-        vip_expire = user["vip_expire_date"] if user["is_vip"] else "---"
+        is_vip = await UserService.is_vip_active(telegram_id)
+        vip_status = "💎 VIP" if is_vip else "👤 Oddiy a'zo"
+        vip_expire = user["vip_expire_date"] if is_vip else "---"
         
         # Ro'yxatdan o'tgan sana
         joined = user.get("joined_date", "---")
@@ -38,30 +39,9 @@ class UserService:
 
     @staticmethod
     async def is_vip_active(telegram_id: int) -> bool:
-        """VIP holati hali ham faolligini tekshirish."""
-        user = await UserModel.get_by_telegram_id(telegram_id)
-        if not user or not user["is_vip"]:
-            return False
-
-        if not user["vip_expire_date"]:
-            return False
-
-        try:
-            expire_date = datetime.strptime(
-                user["vip_expire_date"], "%Y-%m-%d %H:%M:%S"
-            )
-            return datetime.now() < expire_date
-        except (ValueError, TypeError):
-            return False
-
-    @staticmethod
-    async def check_and_expire_vip(telegram_id: int) -> bool:
-        """VIP muddati tugagan bo'lsa, uni bekor qilish."""
-        user = await UserModel.get_by_telegram_id(telegram_id)
-        if not user or not user["is_vip"]:
-            return False
+        """VIP holati hali ham faolligini tekshirish (xotiradagi muddatlar bo'yicha).
 
-        if not await UserService.is_vip_active(telegram_id):
-            await UserModel.remove_vip(telegram_id)
-            return True
-        return False
+        Muddati o'tganlarni bazada VipService sweeper bekor qiladi.
+        """
+        expire_date = UserModel.get_vip_expiry(telegram_id)
+        return expire_date is not None and datetime.now() < expire_date
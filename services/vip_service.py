@@ -3,14 +3,21 @@ services/vip_service.py - VIP bilan bog'liq biznes logika.
 Karta raqami plan ichidan olinadi.
 """
 
+import asyncio
+import logging
 from datetime import datetime, timedelta
-from models.user import UserModel
+
+from models.user import UserModel, VIP_DATE_FORMAT
 from models.vip import VipModel
 
+logger = logging.getLogger(__name__)
+
 
 class VipService:
     """VIP bilan bog'liq biznes logika xizmati."""
 
+    _sweeper_task: asyncio.Task | None = None
+
     @staticmethod
     async def activate_vip(telegram_id: int, plan_id: int) -> str:
         """Foydalanuvchiga VIP maqomini berish."""
@@ -18,8 +25,9 @@ class VipService:
         if not plan:
             return "VIP reja topilmadi."
         expire_date = datetime.now() + timedelta(days=plan["duration_days"])
-        expire_str = expire_date.strftime("%Y-%m-%d %H:%M:%S")
-        await UserModel.set_vip(telegram_id, expire_str)
+        expire_str = expire_date.strftime(VIP_DATE_FORMAT)
+        if not await UserModel.set_vip(telegram_id, expire_str):
+            return "Foydalanuvchi topilmadi."
         return (
             f"\u2714 <b>VIP faollashtirildi!</b>\n\n"
             f"\u25B8 Reja: {plan['name']}\n"
@@ -27,6 +35,35 @@ class VipService:
             f"\u25B8 Tugash sanasi: {expire_str}\n"
         )
 
+    @staticmethod
+    async def _sweep_loop(interval: float) -> None:
+        """Muddati tugagan VIP larni davriy ravishda bekor qilish."""
+        while True:
+            try:
+                expired = await UserModel.expire_vips()
+                if expired:
+                    logger.info(f"VIP muddati tugadi: {len(expired)} ta foydalanuvchi")
+            except Exception as e:
+                logger.error(f"VIP sweeper xatoligi: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def start_expiry_sweeper(interval: float) -> None:
+        """VIP sweeper ni fonda ishga tushirish (faqat bitta jarayonda)."""
+        task = VipService._sweeper_task
+        if task is None or task.done():
+            VipService._sweeper_task = asyncio.get_running_loop().create_task(
+                VipService._sweep_loop(interval)
+            )
+
+    @staticmethod
+    async def stop_expiry_sweeper() -> None:
+        task = VipService._sweeper_task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            VipService._sweeper_task = None
+
     @staticmethod
     async def get_plans_text(anime_title: str | None = None) -> str:
         """Barcha VIP rejalarning matnli ro'yxatini tayyorlash."""
@@ -53,8 +90,9 @@ class VipService:
             return "Reja topilmadi."
         
         # Karta raqami va egasini olish
-        card_num = await SettingsModel.get("vip_card_number")
-        card_name = await SettingsModel.get("vip_card_name")
+        settings = await SettingsModel.get_all()
+        card_num = settings.get("vip_card_number")
+        card_name = settings.get("vip_card_name")
         
         if not card_num:
             card_num = plan.get("card_number", "---") or "---"
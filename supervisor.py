@@ -0,0 +1,303 @@
+"""
+supervisor.py - Ko'p jarayonli (multi-process) rejim.
+Supervisor updatelarni qabul qiladi (polling yoki webhook) va ularni
+from_user.id bo'yicha WORKERS ta worker jarayonga taqsimlaydi. Bitta
+foydalanuvchining updatelari doim bitta workerga tushadi va ketma-ket
+bajariladi. Har bir worker o'z DB ulanishlari va keshlariga ega.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing as mp
+import os
+import secrets
+import signal
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, web
+
+from config import (
+    DB_PATH,
+    WORKERS,
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET,
+    WEBAPP_HOST, WEBAPP_PORT, WEBHOOK_DRAIN_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bitta worker bir vaqtda bajaradigan maksimal updatelar
+WORKER_CONCURRENCY = 100
+# getUpdates long polling vaqti (soniya)
+POLLING_TIMEOUT = 30
+
+
+def shard_key(update: dict) -> int:
+    """Update qaysi foydalanuvchiga (yoki chatga) tegishli ekanini aniqlash."""
+    for name, event in update.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        user = event.get("from") or event.get("user")
+        if user:
+            return user["id"]
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+    return update.get("update_id", 0)
+
+
+# ==============================================================
+# WORKER JARAYONI
+# ==============================================================
+
+def worker_main(index: int, queue: Any) -> None:
+    """Worker jarayonining kirish nuqtasi."""
+    try:
+        asyncio.run(_worker(index, queue))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker(index: int, queue: Any) -> None:
+    from main import register_routers, register_middlewares, on_startup, on_shutdown
+    from loader import bot, dp
+
+    # Ctrl+C butun jarayon guruhiga keladi - to'xtatishni supervisor boshqaradi
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    register_routers()
+    register_middlewares()
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    await dp.emit_startup(bot=bot, **dp.workflow_data)
+    logger.info("Worker #%s ishga tushdi (pid=%s)", index, os.getpid())
+
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(WORKER_CONCURRENCY)
+    # shard key -> shu foydalanuvchining oxirgi update vazifasi (tartibni saqlash uchun)
+    tails: dict[int, asyncio.Task] = {}
+
+    async def process(key: int, update: dict, previous: asyncio.Task | None) -> None:
+        try:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            await dp.feed_raw_update(bot, update)
+        except Exception as e:
+            logger.error("Worker #%s: update %s xatolik: %s", index, update.get("update_id"), e)
+        finally:
+            slots.release()
+            if tails.get(key) is asyncio.current_task():
+                del tails[key]
+
+    while True:
+        update = await loop.run_in_executor(None, queue.get)
+        if update is None:
+            break
+        await slots.acquire()
+        key = shard_key(update)
+        tails[key] = asyncio.create_task(process(key, update, tails.get(key)))
+
+    if tails:
+        await asyncio.gather(*tails.values(), return_exceptions=True)
+    await dp.emit_shutdown(bot=bot, **dp.workflow_data)
+
+
+# ==============================================================
+# SUPERVISOR
+# ==============================================================
+
+class Supervisor:
+    """Worker jarayonlarini boshqarish va updatelarni taqsimlash."""
+
+    def __init__(self, workers: int = WORKERS) -> None:
+        self.ctx = mp.get_context("spawn")
+        self.queues = [self.ctx.Queue() for _ in range(workers)]
+        self.processes: list[Any] = [None] * workers
+        self.stopping = False
+
+    def _spawn(self, index: int) -> None:
+        # config.WORKER_INDEX bola jarayonda shu o'zgaruvchidan o'qiladi
+        os.environ["BOT_WORKER_INDEX"] = str(index)
+        try:
+            process = self.ctx.Process(
+                target=worker_main, args=(index, self.queues[index]), name=f"bot-worker-{index}"
+            )
+            process.start()
+        finally:
+            os.environ.pop("BOT_WORKER_INDEX", None)
+        self.processes[index] = process
+
+    def start(self) -> None:
+        for index in range(len(self.queues)):
+            self._spawn(index)
+
+    def dispatch(self, update: dict) -> None:
+        """Updateni foydalanuvchining workeriga yuborish."""
+        self.queues[shard_key(update) % len(self.queues)].put(update)
+
+    @property
+    def alive(self) -> int:
+        return sum(1 for p in self.processes if p is not None and p.is_alive())
+
+    async def watch(self) -> None:
+        """Kutilmaganda to'xtagan workerlarni qayta ishga tushirish."""
+        while not self.stopping:
+            await asyncio.sleep(2)
+            for index, process in enumerate(self.processes):
+                if not self.stopping and process is not None and not process.is_alive():
+                    logger.error(
+                        "Worker #%s to'xtadi (exitcode=%s), qayta ishga tushirilmoqda",
+                        index, process.exitcode,
+                    )
+                    self._spawn(index)
+
+    async def stop(self, timeout: float = WEBHOOK_DRAIN_TIMEOUT) -> None:
+        """Workerlarga navbatdagi updatelarni tugatib, to'xtashni aytish."""
+        self.stopping = True
+        for queue in self.queues:
+            queue.put(None)
+        loop = asyncio.get_running_loop()
+        for index, process in enumerate(self.processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning("Worker #%s vaqtida to'xtamadi, majburan to'xtatilmoqda", index)
+                process.terminate()
+
+
+async def _prepare_database() -> None:
+    """Jadvallarni workerlar ishga tushishidan oldin bir marta yaratish."""
+    from database import Database
+
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    await Database.create_tables()
+    await Database.close()
+
+
+async def _poll(supervisor: Supervisor, stop: asyncio.Event) -> None:
+    """Bitta getUpdates oqimi - updatelar workerlarga taqsimlanadi."""
+    from loader import bot, dp
+
+    await bot.delete_webhook(drop_pending_updates=True)
+    url = bot.session.api.api_url(token=bot.token, method="getUpdates")
+    allowed_updates = dp.resolve_used_update_types()
+    offset = 0
+    backoff = 1.0
+
+    async with ClientSession(timeout=ClientTimeout(total=POLLING_TIMEOUT + 10)) as http:
+
+        async def fetch() -> list[dict]:
+            async with http.post(url, json={
+                "offset": offset,
+                "timeout": POLLING_TIMEOUT,
+                "allowed_updates": allowed_updates,
+            }) as response:
+                payload = json.loads(await response.read())
+            if not payload.get("ok"):
+                raise RuntimeError(payload.get("description", "getUpdates failed"))
+            return payload["result"]
+
+        logger.info("Polling boshlanmoqda (%s ta worker)...", len(supervisor.queues))
+        stopped = asyncio.ensure_future(stop.wait())
+        while not stop.is_set():
+            request = asyncio.ensure_future(fetch())
+            await asyncio.wait({request, stopped}, return_when=asyncio.FIRST_COMPLETED)
+            if not request.done():
+                # To'xtash signali - javob kutilmaydi, updatelar keyin qayta keladi
+                request.cancel()
+                await asyncio.gather(request, return_exceptions=True)
+                break
+            try:
+                for update in request.result():
+                    supervisor.dispatch(update)
+                    offset = update["update_id"] + 1
+                backoff = 1.0
+            except Exception as e:
+                logger.error("Polling xatolik: %s (%.0fs dan keyin qayta)", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+        stopped.cancel()
+
+    # Oxirgi qabul qilingan updatelarni Telegramga tasdiqlash (qayta kelmasligi uchun)
+    if offset:
+        try:
+            await bot.get_updates(offset=offset, limit=1, timeout=0)
+        except Exception as e:
+            logger.warning("Offsetni tasdiqlab bo'lmadi: %s", e)
+
+
+async def _serve_webhook(supervisor: Supervisor, stop: asyncio.Event) -> None:
+    """Webhook server - updatelar workerlarga taqsimlanadi."""
+    from loader import bot, dp
+
+    if not WEBHOOK_URL:
+        raise ValueError("BOT_MODE=webhook uchun WEBHOOK_URL o'rnatilishi kerak.")
+    secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    draining = False
+
+    async def handle(request: web.Request) -> web.Response:
+        if draining:
+            return web.Response(status=503, text="shutting down")
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not secrets.compare_digest(token, secret):
+            return web.Response(status=401, text="Unauthorized")
+        supervisor.dispatch(await request.json(loads=json.loads))
+        return web.json_response({})
+
+    async def health(request: web.Request) -> web.Response:
+        ok = not draining and supervisor.alive == len(supervisor.processes)
+        return web.json_response(
+            {"status": "ok" if ok else "degraded", "workers": supervisor.alive},
+            status=200 if ok else 503,
+        )
+
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, handle)
+    app.router.add_get("/health", health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT).start()
+
+    try:
+        await bot.set_webhook(
+            url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info("Webhook ishga tushdi: %s%s (%s ta worker)", WEBHOOK_URL, WEBHOOK_PATH, len(supervisor.queues))
+        await stop.wait()
+    finally:
+        draining = True
+        await runner.cleanup()
+
+
+async def run_supervisor(mode: str) -> None:
+    """Supervisor rejimini ishga tushirish (mode: polling | webhook)."""
+    from loader import bot
+
+    # Routerlar main() da ro'yxatdan o'tgan - allowed_updates shulardan olinadi
+    await _prepare_database()
+
+    supervisor = Supervisor()
+    supervisor.start()
+    watcher = asyncio.create_task(supervisor.watch())
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    try:
+        if mode == "webhook":
+            await _serve_webhook(supervisor, stop)
+        else:
+            await _poll(supervisor, stop)
+    finally:
+        logger.info("Workerlar to'xtatilmoqda...")
+        watcher.cancel()
+        await supervisor.stop()
+        await bot.session.close()
@@ -0,0 +1,121 @@
+-- Schema created by Database.create_tables before versioned migrations
+-- (without the ALTER TABLE columns that migrate_database added later).
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    telegram_id INTEGER UNIQUE NOT NULL,
+    full_name TEXT NOT NULL DEFAULT '',
+    username TEXT DEFAULT '',
+    is_vip INTEGER NOT NULL DEFAULT 0,
+    vip_expire_date TEXT DEFAULT NULL,
+    joined_date TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS anime (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    code TEXT UNIQUE NOT NULL,
+    description TEXT DEFAULT '',
+    genre TEXT DEFAULT '',
+    season_count INTEGER NOT NULL DEFAULT 1,
+    total_episodes INTEGER NOT NULL DEFAULT 0,
+    poster_file_id TEXT DEFAULT '',
+    poster_url TEXT DEFAULT '',
+    status TEXT DEFAULT 'Tugallangan',
+    translator TEXT DEFAULT 'AniBro',
+    is_vip INTEGER NOT NULL DEFAULT 0,
+    views INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    anime_id INTEGER NOT NULL,
+    season_number INTEGER NOT NULL DEFAULT 1,
+    episode_number INTEGER NOT NULL,
+    title TEXT DEFAULT '',
+    video_file_id TEXT NOT NULL,
+    is_vip INTEGER NOT NULL DEFAULT 0,
+    views INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    anime_id INTEGER NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE,
+    UNIQUE(user_id, anime_id)
+);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    anime_id INTEGER NOT NULL,
+    comment_text TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS channels (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id TEXT UNIQUE NOT NULL,
+    channel_name TEXT NOT NULL DEFAULT '',
+    channel_link TEXT NOT NULL DEFAULT '',
+    added_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS vip_plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    duration_days INTEGER NOT NULL,
+    card_number TEXT DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS admins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    telegram_id INTEGER UNIQUE NOT NULL,
+    full_name TEXT DEFAULT '',
+    role TEXT DEFAULT 'admin',
+    added_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS shorts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    anime_id INTEGER NOT NULL,
+    short_video_file_id TEXT NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (anime_id) REFERENCES anime(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS short_views (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    short_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    viewed_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (short_id) REFERENCES shorts(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE(short_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_anime_code ON anime(code);
+CREATE INDEX IF NOT EXISTS idx_anime_genre ON anime(genre);
+CREATE INDEX IF NOT EXISTS idx_anime_views ON anime(views DESC);
+CREATE INDEX IF NOT EXISTS idx_anime_created ON anime(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_episodes_anime ON episodes(anime_id);
+CREATE INDEX IF NOT EXISTS idx_episodes_views ON episodes(views DESC);
+CREATE INDEX IF NOT EXISTS idx_favorites_user ON favorites(user_id);
+CREATE INDEX IF NOT EXISTS idx_comments_anime ON comments(anime_id);
+CREATE INDEX IF NOT EXISTS idx_shorts_anime ON shorts(anime_id);
+CREATE INDEX IF NOT EXISTS idx_shorts_views ON shorts(views DESC);
+CREATE INDEX IF NOT EXISTS idx_short_views_short ON short_views(short_id);
+CREATE INDEX IF NOT EXISTS idx_users_joined ON users(joined_date DESC);
@@ -0,0 +1,48 @@
+"""
+tests/conftest.py - Shared fixtures: repo on sys.path, a throwaway SQLite
+database per test and a runner for async test bodies.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# config.py refuses to import without a token
+os.environ.setdefault("BOT_TOKEN", "123456:TEST")
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point Database at a fresh file under tmp_path."""
+    import database
+    from database import Database
+
+    path = tmp_path / "bot.db"
+    monkeypatch.setattr(database, "DB_PATH", str(path))
+    # Locks bind to the first event loop that waits on them
+    monkeypatch.setattr(Database, "_write_lock", asyncio.Lock())
+    monkeypatch.setattr(Database, "_pool_lock", asyncio.Lock())
+    monkeypatch.setattr(Database, "has_fts5", False)
+    return path
+
+
+@pytest.fixture
+def run(db_path):
+    """Run a coroutine on a new loop and close the database afterwards."""
+    from database import Database
+
+    def runner(coro):
+        async def wrapped():
+            try:
+                return await coro
+            finally:
+                await Database.close()
+        return asyncio.run(wrapped())
+
+    return runner
@@ -0,0 +1,102 @@
+"""
+tests/test_broadcast_service.py - Broadcast progress checkpoints.
+"""
+
+import asyncio
+
+import services.broadcast_service as broadcast_service
+from database import Database
+from models.broadcast import BroadcastModel
+from services.broadcast_service import BroadcastEngine
+
+
+class StallingBot:
+    """Delivers `deliver` messages, then blocks as if the process hung."""
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self.sent = []
+        self.stalled = asyncio.Event()
+
+    async def copy_message(self, chat_id, from_chat_id, message_id):
+        if len(self.sent) >= self.deliver:
+            self.stalled.set()
+            await asyncio.Event().wait()
+        self.sent.append(chat_id)
+
+
+async def _add_users(count):
+    async with Database.write() as db:
+        await db.executemany(
+            "INSERT INTO users (telegram_id) VALUES (?)",
+            [(1000 + i,) for i in range(count)],
+        )
+
+
+def test_progress_saved_every_n_recipients(run, monkeypatch):
+    monkeypatch.setattr(broadcast_service, "BROADCAST_WORKERS", 1)
+    monkeypatch.setattr(broadcast_service, "BROADCAST_CHECKPOINT_EVERY", 3)
+    monkeypatch.setattr(broadcast_service, "BROADCAST_STATUS_INTERVAL", 3600)
+
+    async def scenario():
+        await Database.create_tables()
+        await _add_users(10)
+        job_id = await BroadcastModel.create(1, 1, 1, 10, broadcast_service.ENGINE_OWNER)
+        bot = StallingBot(deliver=7)
+        await BroadcastEngine.launch(bot, job_id)
+        await asyncio.wait_for(bot.stalled.wait(), 5)
+        # Let the reporter write the due checkpoint
+        for _ in range(50):
+            job = await BroadcastModel.get(job_id)
+            if job["last_user_id"] >= 6:
+                break
+            await asyncio.sleep(0.01)
+        engine = BroadcastEngine._engines[job_id]
+        engine._task.cancel()
+        await asyncio.gather(engine._task, return_exceptions=True)
+        return job
+
+    job = run(scenario())
+    # 7 delivered and the status interval never elapsed: the count-based
+    # checkpoint saved at least 6, so a crash re-sends at most one recipient
+    assert job["last_user_id"] >= 6
+    assert job["sent"] == job["last_user_id"]
+
+
+def test_paused_job_claimed_once(run):
+    async def scenario():
+        await Database.create_tables()
+        job_id = await BroadcastModel.create(1, 1, 1, 10, "a")
+        await BroadcastModel.set_status(job_id, BroadcastModel.PAUSED)
+        claims = await asyncio.gather(
+            BroadcastModel.claim(job_id, "a", BroadcastModel.PAUSED),
+            BroadcastModel.claim(job_id, "b", BroadcastModel.PAUSED),
+        )
+        job = await BroadcastModel.get(job_id)
+        winner, loser = ("a", "b") if claims[0] else ("b", "a")
+        saved_by_loser = await BroadcastModel.checkpoint(job_id, loser, 9, 9, 0, 0, [])
+        return claims, job, winner, saved_by_loser, await BroadcastModel.get(job_id)
+
+    claims, job, winner, saved_by_loser, after = run(scenario())
+    assert sorted(claims) == [False, True]
+    assert job["status"] == BroadcastModel.RUNNING and job["owner"] == winner
+    # The process that lost the claim cannot overwrite progress
+    assert saved_by_loser is False
+    assert after["last_user_id"] == 0
+
+
+def test_pause_only_running_jobs(run):
+    async def scenario():
+        await Database.create_tables()
+        job_id = await BroadcastModel.create(1, 1, 1, 10, "a")
+        await BroadcastModel.set_status(job_id, BroadcastModel.FINISHED)
+        paused_finished = await BroadcastEngine.pause(job_id)
+        finished = await BroadcastModel.get(job_id)
+
+        other_id = await BroadcastModel.create(1, 1, 1, 10, "a")
+        paused_running = await BroadcastEngine.pause(other_id)
+        return paused_finished, finished["status"], paused_running, await BroadcastModel.get(other_id)
+
+    paused_finished, status, paused_running, other = run(scenario())
+    assert (paused_finished, status) == (False, BroadcastModel.FINISHED)
+    assert paused_running and other["status"] == BroadcastModel.PAUSED
@@ -0,0 +1,29 @@
+"""
+tests/test_callback_store.py - Callback tokens round-trip through CallbackStore.
+"""
+
+from keyboards.callbacks import SearchPageCallback
+from utils.callback_store import CallbackStore
+
+
+def test_token_round_trip_through_callback_data():
+    context = {"query": "Ванпанчмен / One Punch Man: " + "x" * 200}
+    token = CallbackStore.put(context)
+
+    packed = SearchPageCallback(kind="title", token=token, page=3).pack()
+    # Telegram limit for callback_data
+    assert len(packed.encode()) <= 64
+
+    unpacked = SearchPageCallback.unpack(packed)
+    assert unpacked.page == 3
+    assert CallbackStore.get(unpacked.token) == context
+
+
+def test_same_context_same_token():
+    first = CallbackStore.put({"query": "naruto"})
+    assert CallbackStore.put({"query": "naruto"}) == first
+    assert CallbackStore.put({"query": "bleach"}) != first
+
+
+def test_unknown_token():
+    assert CallbackStore.get("AAAAAAAA") is None
@@ -0,0 +1,70 @@
+"""
+tests/test_catalog.py - CatalogCache generations, size cap and row expiry.
+"""
+
+import pytest
+
+import models.catalog as catalog
+from models.catalog import CatalogCache, EpisodeEntry
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    CatalogCache.clear()
+    yield
+    CatalogCache.clear()
+
+
+def _row(anime_id, views=0):
+    return {"id": anime_id, "code": f"c{anime_id}", "views": views}
+
+
+def test_fill_after_invalidation_is_dropped():
+    generation = CatalogCache.generation()
+    # ... database read happens here, then a writer invalidates ...
+    CatalogCache.invalidate_anime(1)
+    CatalogCache.put_anime(_row(1), generation)
+    CatalogCache.put_episodes(1, {1: [EpisodeEntry(10, 1, 0)]}, generation)
+
+    assert CatalogCache.get_anime(1) is None
+    assert CatalogCache.get_anime_id("c1") is None
+    assert CatalogCache.get_episodes(1) is None
+
+    CatalogCache.put_anime(_row(1), CatalogCache.generation())
+    assert CatalogCache.get_anime(1)["code"] == "c1"
+
+
+def test_fill_read_before_view_flush_is_dropped():
+    CatalogCache.put_anime(_row(1, views=5), CatalogCache.generation())
+    generation = CatalogCache.generation()
+    # ... anime 2 is read with views=5, then ViewCounter persists +3 ...
+    CatalogCache.add_views({1: 3, 2: 3})
+    CatalogCache.put_anime(_row(2, views=5), generation)
+
+    assert CatalogCache.get_anime(2) is None
+    assert CatalogCache.get_anime(1)["views"] == 8
+
+
+def test_size_cap_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(catalog, "CATALOG_CACHE_SIZE", 2)
+    for anime_id in (1, 2):
+        CatalogCache.put_anime(_row(anime_id), CatalogCache.generation())
+    CatalogCache.get_anime(1)
+    CatalogCache.put_anime(_row(3), CatalogCache.generation())
+
+    assert CatalogCache.get_anime(2) is None
+    assert CatalogCache.get_anime_id("c2") is None
+    assert CatalogCache.get_anime(1) is not None
+    assert CatalogCache.get_anime(3) is not None
+
+
+def test_anime_rows_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(catalog.time, "monotonic", lambda: now[0])
+    CatalogCache.put_anime(_row(1, views=5), CatalogCache.generation())
+    CatalogCache.add_views({1: 2})
+    assert CatalogCache.get_anime(1)["views"] == 7
+
+    now[0] += catalog.CATALOG_ANIME_TTL
+    assert CatalogCache.get_anime(1) is None
+    assert CatalogCache.get_anime_id("c1") is None
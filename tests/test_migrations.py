@@ -0,0 +1,115 @@
+"""
+tests/test_migrations.py - Versioned schema migrations (migrations.py).
+"""
+
+import sqlite3
+from pathlib import Path
+
+import migrations
+from database import Database
+from migrations import MIGRATIONS, Migration, MigrationDeferred, migrate
+
+BASELINE_SCHEMA = Path(__file__).with_name("baseline_schema.sql")
+
+
+async def _applied_versions():
+    async with Database.read() as db:
+        cursor = await db.execute("SELECT version FROM schema_version ORDER BY version")
+        return [row[0] for row in await cursor.fetchall()]
+
+
+async def _columns(table):
+    async with Database.read() as db:
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        return {row["name"] for row in await cursor.fetchall()}
+
+
+async def _indexes():
+    async with Database.read() as db:
+        cursor = await db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        return {row[0] for row in await cursor.fetchall()}
+
+
+def test_fresh_database(run):
+    async def scenario():
+        state = await migrate()
+        return state, await _applied_versions(), await _columns("broadcast_jobs"), await _indexes()
+
+    (applied, has_fts), versions, job_columns, indexes = run(scenario())
+    assert versions == [s.version for s in MIGRATIONS]
+    assert (applied, has_fts) == (len(MIGRATIONS), True)
+    assert "owner" in job_columns
+    assert {"idx_episodes_anime_season", "idx_users_vip_expire"} <= indexes
+    # Superseded by composite indexes
+    assert not {"idx_episodes_anime", "idx_anime_views", "idx_anime_created"} & indexes
+
+
+def test_baseline_database_keeps_data(run, db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(BASELINE_SCHEMA.read_text())
+        conn.execute(
+            "INSERT INTO anime (title, code, description, genre) "
+            "VALUES ('Naruto', 'n1', 'ninja', 'action')"
+        )
+        conn.execute("INSERT INTO users (telegram_id, full_name) VALUES (7, 'Ali')")
+    conn.close()
+
+    async def scenario():
+        await migrate()
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT * FROM anime WHERE code = 'n1'")
+            anime = dict(await cursor.fetchone())
+            cursor = await db.execute(
+                "SELECT rowid FROM anime_fts WHERE anime_fts MATCH 'ninja'"
+            )
+            fts_rows = [row[0] for row in await cursor.fetchall()]
+            cursor = await db.execute("SELECT telegram_id FROM users")
+            users = [row[0] for row in await cursor.fetchall()]
+        return anime, fts_rows, users, await _applied_versions()
+
+    anime, fts_rows, users, versions = run(scenario())
+    assert versions == [s.version for s in MIGRATIONS]
+    # Added columns take their defaults; existing rows are indexed for search
+    assert anime["poster_url"] == "" and anime["status"] == "Tugallangan"
+    assert fts_rows == [anime["id"]]
+    assert users == [7]
+
+    # The next start only reads the state
+    assert run(migrate()) == (len(MIGRATIONS), True)
+
+
+def test_deferred_step_is_retried_on_next_start(run, monkeypatch):
+    attempts = []
+
+    async def no_fts5(db):
+        attempts.append(1)
+        raise MigrationDeferred("no FTS5")
+
+    steps = [
+        Migration(s.version, s.name, no_fts5, s.analyze) if s.name == "anime_fts" else s
+        for s in MIGRATIONS
+    ]
+    monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+    all_versions = [s.version for s in MIGRATIONS]
+    fts_version = next(s.version for s in MIGRATIONS if s.name == "anime_fts")
+
+    async def first_start():
+        state = await migrate()
+        return state, await _applied_versions()
+
+    (applied, has_fts), versions = run(first_start())
+    assert fts_version not in versions
+    assert versions == [v for v in all_versions if v != fts_version]
+    assert (applied, has_fts) == (len(all_versions) - 1, False)
+
+    # FTS5 is available on the next start
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS)
+
+    async def second_start():
+        state = await migrate()
+        return state, await _applied_versions()
+
+    (applied, has_fts), versions = run(second_start())
+    assert len(attempts) == 1
+    assert versions == all_versions
+    assert (applied, has_fts) == (len(all_versions), True)
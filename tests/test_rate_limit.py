@@ -0,0 +1,113 @@
+"""
+tests/test_rate_limit.py - Token bucket, per-key limiter and GCRA schedule math.
+"""
+
+import asyncio
+
+import pytest
+
+import utils.rate_limit as rate_limit
+from utils.rate_limit import KeyedRateLimiter, OutboundLimiter, TokenBucket, _ChatSchedule
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+def test_token_bucket_burst_and_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+    assert [bucket.try_acquire() for _ in range(5)] == [True] * 4 + [False]
+    assert bucket.wait_time() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    # Refill never exceeds the capacity
+    clock.now += 100
+    assert [bucket.try_acquire() for _ in range(5)] == [True] * 4 + [False]
+
+
+def test_token_bucket_hold(clock):
+    bucket = TokenBucket(rate=10)
+    bucket.hold(clock.now + 2)
+    clock.now += 1.9
+    assert not bucket.try_acquire()
+    # 0.1 s of refill after the hold ends: one token, no burst
+    clock.now += 0.2
+    assert [bucket.try_acquire() for _ in range(2)] == [True, False]
+
+
+def test_keyed_limiter_limits_each_key(clock):
+    limiter = KeyedRateLimiter(rate=1, capacity=2)
+    assert [limiter.hit("a") for _ in range(3)] == [True, True, False]
+    assert limiter.hit("b")
+    clock.now += 1
+    assert limiter.hit("a")
+    assert not limiter.hit("a")
+
+
+def test_keyed_limiter_evicts_idle_and_lru(clock):
+    limiter = KeyedRateLimiter(rate=1, capacity=2, maxsize=2)
+    limiter.hit("a")
+    clock.now += 1
+    limiter.hit("b")
+    # "a" has been idle for capacity / rate seconds: it is full again and dropped
+    clock.now += 1
+    limiter.hit("c")
+    assert len(limiter) == 2
+    assert "a" not in limiter._buckets
+
+    # Over maxsize the least recently used key goes
+    limiter.hit("d")
+    assert list(limiter._buckets) == ["c", "d"]
+
+
+def test_chat_schedule_gcra_spacing():
+    # 20 messages per minute with a burst of 3 (the group budget)
+    schedule = _ChatSchedule(rate=20 / 60, burst=3, maxsize=100)
+    now = 0.0
+    for _ in range(3):
+        assert schedule.ready_at(-100) <= now
+        schedule.take(-100, now)
+    # Burst used up: the next slot is one interval after the first
+    assert schedule.ready_at(-100) == pytest.approx(3.0)
+    now = schedule.ready_at(-100)
+    schedule.take(-100, now)
+    assert schedule.ready_at(-100) == pytest.approx(6.0)
+    # Other chats have their own schedule
+    assert schedule.ready_at(-200) == 0.0
+
+
+def test_chat_schedule_drops_expired_keys():
+    schedule = _ChatSchedule(rate=1, burst=1, maxsize=100)
+    schedule.take(1, 0.0)
+    schedule.take(2, 5.0)
+    assert list(schedule._tat) == [2]
+
+
+def test_outbound_limiter_chatless_calls_skip_chat_budget():
+    async def scenario():
+        limiter = OutboundLimiter(
+            global_rate=1000, chat_rate=1, chat_burst=1, group_rate=20 / 60, group_burst=3
+        )
+        # Calls without a chat only use the global bucket
+        await asyncio.wait_for(asyncio.gather(*(limiter.acquire(None) for _ in range(20))), 1)
+        # A group gets its burst, then has to wait ~3 s
+        for _ in range(3):
+            await asyncio.wait_for(limiter.acquire(-100), 1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(-100), 0.2)
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+"""
+tests/test_shorts_manage.py - Admin short deletion (delete_short_process).
+"""
+
+from database import Database
+from keyboards.callbacks import DeleteShortCallback
+from handlers.admin.shorts_manage import delete_short_process
+from models.shorts import ShortsModel
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, reply_markup=None):
+        self.edits.append(text)
+
+
+class FakeCallback:
+    def __init__(self):
+        self.message = FakeMessage()
+        self.answers = []
+
+    async def answer(self, text=None, show_alert=False):
+        self.answers.append((text, show_alert))
+
+
+async def _count(sql, *params):
+    async with Database.read() as db:
+        cursor = await db.execute(sql, params)
+        return (await cursor.fetchone())[0]
+
+
+def test_delete_short_removes_short_and_views(run):
+    async def scenario():
+        await Database.create_tables()
+        async with Database.write() as db:
+            cursor = await db.execute("INSERT INTO anime (title, code) VALUES ('A', 'a1')")
+            anime_id = cursor.lastrowid
+            await db.execute("INSERT INTO users (telegram_id) VALUES (1)")
+        short_id = await ShortsModel.create(anime_id, "file-id")
+        await ShortsModel.increment_views(short_id, 1)
+        from models.view_counter import ViewCounter
+        await ViewCounter.flush()
+        assert await _count("SELECT COUNT(*) FROM short_views WHERE short_id = ?", short_id) == 1
+
+        callback = FakeCallback()
+        await delete_short_process(callback, DeleteShortCallback(short_id=short_id))
+
+        assert callback.answers[0] == ("✅ Short o'chirildi.", False)
+        assert await ShortsModel.get_by_id(short_id) is None
+        assert await _count("SELECT COUNT(*) FROM short_views WHERE short_id = ?", short_id) == 0
+
+    run(scenario())
@@ -0,0 +1,44 @@
+"""
+tests/test_telegram_session.py - Which Bot API calls go through the outbound limiter.
+"""
+
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import (
+    AnswerCallbackQuery, CopyMessage, EditMessageText, GetChatMember, SendMessage,
+)
+
+from utils.telegram_session import ThrottledSession, is_chat_send
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.acquired = []
+
+    async def acquire(self, chat_id, priority=None):
+        self.acquired.append(chat_id)
+
+
+def test_is_chat_send():
+    assert is_chat_send(SendMessage(chat_id=1, text="x"))
+    assert is_chat_send(CopyMessage(chat_id=1, from_chat_id=2, message_id=3))
+    assert is_chat_send(EditMessageText(chat_id=1, message_id=3, text="x"))
+    assert not is_chat_send(GetChatMember(chat_id=-100, user_id=1))
+    assert not is_chat_send(AnswerCallbackQuery(callback_query_id="q"))
+
+
+def test_get_chat_member_skips_limiter(run, monkeypatch):
+    async def fake_request(self, bot, method, timeout=None):
+        return method.__api_method__
+
+    monkeypatch.setattr(AiohttpSession, "make_request", fake_request)
+
+    async def scenario():
+        limiter = RecordingLimiter()
+        session = ThrottledSession(limiter)
+        for _ in range(5):
+            await session.make_request(None, GetChatMember(chat_id=-100, user_id=1))
+        await session.make_request(None, SendMessage(chat_id=42, text="x"))
+        await session.close()
+        return limiter.acquired
+
+    assert run(scenario()) == [42]
@@ -0,0 +1,62 @@
+"""
+tests/test_ttl_cache.py - TTLCache expiry and size bound.
+"""
+
+import pytest
+
+import utils.ttl_cache as ttl_cache
+from utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ttl_cache, "time", fake)
+    return fake
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache()
+    cache.set("short", 1, ttl=1)
+    cache.set("long", 2, ttl=10)
+    clock.now += 0.5
+    assert cache.get("short") == 1
+    clock.now += 0.5
+    assert cache.get("short") is None
+    assert cache.get("short", "gone") == "gone"
+    assert cache.get("long") == 2
+    # Expired entries are removed on access
+    assert len(cache) == 1
+
+
+def test_set_refreshes_ttl(clock):
+    cache = TTLCache()
+    cache.set("k", 1, ttl=1)
+    clock.now += 0.9
+    cache.set("k", 2, ttl=1)
+    clock.now += 0.9
+    assert cache.get("k") == 2
+
+
+def test_oldest_entry_evicted_when_full(clock):
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    # Re-setting moves a key to the young end
+    cache.set("a", 3, ttl=60)
+    cache.set("c", 4, ttl=60)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (3, 4)
+
+    cache.pop("a")
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,33 @@
+"""
+tests/test_user_upserts.py - Batched user upserts are written on shutdown.
+"""
+
+import asyncio
+
+import models.user as user_module
+from database import Database
+from models.user import UserModel
+
+
+def test_flush_upserts_writes_waiting_batch(run, monkeypatch):
+    # The batch window would not close before shutdown
+    monkeypatch.setattr(user_module, "USER_UPSERT_WINDOW", 3600)
+
+    async def scenario():
+        await Database.create_tables()
+        waiting = [
+            asyncio.create_task(UserModel.create_or_update(telegram_id, f"u{telegram_id}", ""))
+            for telegram_id in (1, 2, 3)
+        ]
+        await asyncio.sleep(0)
+        assert not any(task.done() for task in waiting)
+
+        await UserModel.flush_upserts()
+        assert UserModel._upsert_timer is None and not UserModel._upsert_tasks
+        rows = [await task for task in waiting]
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT telegram_id FROM users ORDER BY telegram_id")
+            stored = [row[0] for row in await cursor.fetchall()]
+        return [row["full_name"] for row in rows], stored
+
+    assert run(scenario()) == (["u1", "u2", "u3"], [1, 2, 3])
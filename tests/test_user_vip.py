@@ -0,0 +1,27 @@
+"""
+tests/test_user_vip.py - UserModel VIP map stays in step with the database.
+"""
+
+import pytest
+
+from database import Database
+from models.user import UserModel
+
+
+@pytest.fixture(autouse=True)
+def empty_vip_map(monkeypatch):
+    monkeypatch.setattr(UserModel, "_vip_until", {})
+
+
+def test_set_vip_unknown_user_changes_nothing(run):
+    async def scenario():
+        await Database.create_tables()
+        async with Database.write() as db:
+            await db.execute("INSERT INTO users (telegram_id) VALUES (1)")
+        unknown = await UserModel.set_vip(2, "2030-01-01 00:00:00")
+        known = await UserModel.set_vip(1, "2030-01-01 00:00:00")
+        return unknown, known
+
+    assert run(scenario()) == (False, True)
+    assert UserModel.get_vip_expiry(2) is None
+    assert UserModel.get_vip_expiry(1).year == 2030
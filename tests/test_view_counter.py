@@ -0,0 +1,65 @@
+"""
+tests/test_view_counter.py - ViewCounter flushes around deleted rows.
+"""
+
+import asyncio
+
+import pytest
+
+from database import Database
+from models.shorts import ShortsModel
+from models.view_counter import ViewCounter
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    monkeypatch.setattr(ViewCounter, "_pending", {t: {} for t in ViewCounter.TABLES})
+    monkeypatch.setattr(ViewCounter, "_short_views", set())
+    monkeypatch.setattr(ViewCounter, "_lock", asyncio.Lock())
+
+
+async def _setup():
+    await Database.create_tables()
+    async with Database.write() as db:
+        cursor = await db.execute("INSERT INTO anime (title, code) VALUES ('A', 'a1')")
+        anime_id = cursor.lastrowid
+        cursor = await db.execute("INSERT INTO users (telegram_id) VALUES (1)")
+        user_id = cursor.lastrowid
+    short_id = await ShortsModel.create(anime_id, "file-id")
+    return anime_id, user_id, short_id
+
+
+async def _views(table, row_id):
+    async with Database.read() as db:
+        cursor = await db.execute(f"SELECT views FROM {table} WHERE id = ?", (row_id,))
+        return (await cursor.fetchone())[0]
+
+
+def test_deleting_short_with_pending_view_does_not_block_flush(run):
+    async def scenario():
+        anime_id, user_id, short_id = await _setup()
+        ViewCounter.add("anime", anime_id)
+        ViewCounter.add_short_view(short_id, user_id)
+        await ShortsModel.delete(short_id)
+        await ViewCounter.flush()
+        return ViewCounter.size(), await _views("anime", anime_id)
+
+    assert run(scenario()) == (0, 1)
+
+
+def test_view_of_row_deleted_behind_the_buffer_is_skipped(run):
+    async def scenario():
+        anime_id, user_id, short_id = await _setup()
+        ViewCounter.add("anime", anime_id)
+        ViewCounter.add_short_view(short_id, user_id)
+        ViewCounter.add_short_view(short_id, user_id + 100)  # no such user
+        # Deleted without going through ShortsModel (e.g. anime cascade)
+        async with Database.write() as db:
+            await db.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        await ViewCounter.flush()
+        async with Database.read() as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM short_views")
+            short_views = (await cursor.fetchone())[0]
+        return ViewCounter.size(), await _views("anime", anime_id), short_views
+
+    assert run(scenario()) == (0, 1, 0)
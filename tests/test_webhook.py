@@ -0,0 +1,105 @@
+"""
+tests/test_webhook.py - DrainingRequestHandler: 503 while draining, /health, drain timeout.
+"""
+
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from utils.webhook import DrainingRequestHandler
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+        "text": "hi",
+    },
+}
+
+
+class SlowUpdates:
+    """Message handler that blocks until released and records how it ended."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.finished = False
+        self.cancelled = False
+
+    async def handle(self, message: Message) -> None:
+        self.started.set()
+        try:
+            await self.release.wait()
+            self.finished = True
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+async def _client(slow: SlowUpdates, drain_timeout: float):
+    dp = Dispatcher()
+    dp.message.register(slow.handle)
+    bot = Bot("123456:TEST")
+    handler = DrainingRequestHandler(dispatcher=dp, bot=bot, drain_timeout=drain_timeout)
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    app.router.add_get("/health", handler.health)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client, handler, bot
+
+
+def test_drain_waits_for_in_flight_updates():
+    async def scenario():
+        slow = SlowUpdates()
+        client, handler, bot = await _client(slow, drain_timeout=5)
+        try:
+            response = await client.get("/health")
+            assert response.status == 200
+            assert await response.json() == {"status": "ok", "in_flight": 0}
+
+            response = await client.post("/webhook", json=UPDATE)
+            assert response.status == 200
+            await asyncio.wait_for(slow.started.wait(), 1)
+            assert (await (await client.get("/health")).json())["in_flight"] == 1
+
+            drain = asyncio.create_task(handler.drain())
+            await asyncio.sleep(0)
+            response = await client.get("/health")
+            assert response.status == 503
+            assert await response.json() == {"status": "draining", "in_flight": 1}
+            response = await client.post("/webhook", json={**UPDATE, "update_id": 2})
+            assert response.status == 503
+
+            assert not drain.done()
+            slow.release.set()
+            await asyncio.wait_for(drain, 1)
+            assert slow.finished and not slow.cancelled
+        finally:
+            await client.close()
+            await bot.session.close()
+
+    asyncio.run(scenario())
+
+
+def test_drain_cancels_updates_after_timeout():
+    async def scenario():
+        slow = SlowUpdates()
+        client, handler, bot = await _client(slow, drain_timeout=0.1)
+        try:
+            await client.post("/webhook", json=UPDATE)
+            await asyncio.wait_for(slow.started.wait(), 1)
+            await asyncio.wait_for(handler.drain(), 1)
+            assert slow.cancelled and not slow.finished
+            assert handler.in_flight == 0
+        finally:
+            await client.close()
+            await bot.session.close()
+
+    asyncio.run(scenario())
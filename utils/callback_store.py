@@ -0,0 +1,42 @@
+"""
+utils/callback_store.py - Server-side context for inline button callbacks.
+Telegram limits callback_data to 64 bytes, so free text (search queries,
+filters) is kept here and the button only carries a short opaque token.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any
+
+from config import CALLBACK_CONTEXT_TTL, CALLBACK_CONTEXT_SIZE
+from utils.ttl_cache import TTLCache
+
+
+class CallbackStore:
+    """Token -> context mapping with a TTL, local to the process.
+
+    Tokens are derived from the context itself, so the same query always
+    gets the same token and repeated searches do not grow the store.
+    Supervisor workers are sharded by user, so a user's callbacks reach
+    the process that issued the token.
+    """
+
+    # Token length in characters (6 bytes of digest, urlsafe base64)
+    TOKEN_BYTES = 6
+
+    _contexts = TTLCache(maxsize=CALLBACK_CONTEXT_SIZE)
+
+    @classmethod
+    def put(cls, context: dict[str, Any]) -> str:
+        """Store a context and return its token (refreshes the TTL)."""
+        raw = json.dumps(context, sort_keys=True, ensure_ascii=False).encode()
+        digest = hashlib.blake2b(raw, digest_size=cls.TOKEN_BYTES).digest()
+        token = base64.urlsafe_b64encode(digest).decode()
+        cls._contexts.set(token, context, CALLBACK_CONTEXT_TTL)
+        return token
+
+    @classmethod
+    def get(cls, token: str) -> dict[str, Any] | None:
+        """Return the context for a token, or None if it expired."""
+        return cls._contexts.get(token)
@@ -0,0 +1,194 @@
+"""
+utils/fsm_storage.py - SQLite-backed FSM storage for aiogram.
+States survive restarts. Reads are served from an in-memory cache
+(read-through); writes are buffered and flushed in one transaction.
+Every key has a TTL and expired rows are removed by a background sweeper.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from database import Database
+from config import (
+    FSM_STATE_TTL,
+    FSM_FLUSH_INTERVAL,
+    FSM_FLUSH_THRESHOLD,
+    FSM_SWEEP_INTERVAL,
+    FSM_CACHE_IDLE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Record:
+    """Cached FSM record for one storage key."""
+
+    __slots__ = ("state", "data", "expires_at", "accessed")
+
+    def __init__(self, state: Optional[str] = None, data: Optional[dict] = None,
+                 expires_at: float = 0.0) -> None:
+        self.state = state
+        self.data = data if data is not None else {}
+        self.expires_at = expires_at
+        self.accessed = time.monotonic()
+
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM storage kept in the fsm_storage table of the bot database."""
+
+    def __init__(self, ttl: float = FSM_STATE_TTL) -> None:
+        self.ttl = ttl
+        # storage key -> cached record (also holds not-yet-flushed writes)
+        self._cache: Dict[str, _Record] = {}
+        # keys changed since the last flush
+        self._dirty: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+        self._flush_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return ":".join(
+            str(part) if part is not None else ""
+            for part in (
+                key.bot_id, key.chat_id, key.user_id, key.thread_id,
+                key.business_connection_id, key.destiny,
+            )
+        )
+
+    # ---- Read-through cache ----
+
+    async def _get(self, key: StorageKey) -> _Record:
+        k = self._key(key)
+        record = self._cache.get(k)
+        if record is None:
+            record = await self._load(k)
+            # A concurrent write may have created the record while we were loading
+            record = self._cache.setdefault(k, record)
+        elif record.expires_at and record.expires_at <= time.time():
+            record.state, record.data, record.expires_at = None, {}, 0.0
+        record.accessed = time.monotonic()
+        return record
+
+    @staticmethod
+    async def _load(k: str) -> _Record:
+        async with Database.read() as db:
+            cursor = await db.execute(
+                "SELECT state, data, expires_at FROM fsm_storage WHERE key = ? AND expires_at > ?",
+                (k, time.time()),
+            )
+            row = await cursor.fetchone()
+        if row is None:
+            return _Record()
+        return _Record(row["state"], json.loads(row["data"]), row["expires_at"])
+
+    def _touch(self, key: StorageKey, record: _Record) -> None:
+        """Mark a record as changed and refresh its TTL."""
+        record.expires_at = time.time() + self.ttl
+        self._dirty.add(self._key(key))
+        if len(self._dirty) >= FSM_FLUSH_THRESHOLD:
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    # ---- BaseStorage ----
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._get(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._touch(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._get(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self._get(key)
+        record.data = data.copy()
+        self._touch(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._get(key)).data.copy()
+
+    async def close(self) -> None:
+        await self.stop()
+
+    # ---- Background work ----
+
+    async def flush(self) -> None:
+        """Write all buffered changes in a single transaction."""
+        async with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+
+            upserts, deletes = [], []
+            for k in dirty:
+                record = self._cache.get(k)
+                if record is None or record.is_empty():
+                    deletes.append((k,))
+                else:
+                    upserts.append(
+                        (k, record.state, json.dumps(record.data, ensure_ascii=False), record.expires_at)
+                    )
+            try:
+                async with Database.write() as db:
+                    if upserts:
+                        await db.executemany(
+                            "INSERT OR REPLACE INTO fsm_storage (key, state, data, expires_at) "
+                            "VALUES (?, ?, ?, ?)",
+                            upserts,
+                        )
+                    if deletes:
+                        await db.executemany("DELETE FROM fsm_storage WHERE key = ?", deletes)
+            except Exception as e:
+                logger.error("FSM storage flush failed, will retry: %s", e)
+                self._dirty |= dirty
+
+    async def sweep(self) -> None:
+        """Delete expired rows and drop idle or expired records from memory."""
+        now = time.time()
+        idle_before = time.monotonic() - FSM_CACHE_IDLE
+        async with self._lock:
+            for k, record in list(self._cache.items()):
+                if k in self._dirty:
+                    continue
+                if record.accessed < idle_before or (record.expires_at and record.expires_at <= now):
+                    del self._cache[k]
+        async with Database.write() as db:
+            await db.execute("DELETE FROM fsm_storage WHERE expires_at <= ?", (now,))
+
+    async def _run(self, interval: float, job) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await job()
+            except Exception as e:
+                logger.error("FSM storage background error: %s", e)
+
+    def start(self) -> None:
+        """Start the flush and sweeper tasks (needs a running loop and database)."""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._run(FSM_FLUSH_INTERVAL, self.flush)),
+            loop.create_task(self._run(FSM_SWEEP_INTERVAL, self.sweep)),
+        ]
+
+    async def stop(self) -> None:
+        """Stop background tasks and flush what is left."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self.flush()
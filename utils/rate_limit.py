@@ -0,0 +1,236 @@
+"""
+utils/rate_limit.py - Async token bucket rate limiters.
+"""
+
+import asyncio
+import bisect
+import itertools
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Hashable
+
+# Outbound request priorities (lower is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 5
+PRIORITY_BROADCAST = 10
+
+# Priority of Telegram API calls made from the current task
+send_priority: ContextVar[int] = ContextVar("send_priority", default=PRIORITY_INTERACTIVE)
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens without waiting. Returns False if there are not enough."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` will be available."""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def hold(self, until: float) -> None:
+        """Empty the bucket and start refilling it only at monotonic time `until`."""
+        self._tokens = 0
+        self._updated = max(self._updated, until)
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Wait until tokens are available and take them (FIFO between waiters)."""
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class KeyedRateLimiter:
+    """Token buckets per key (e.g. user id) in a size-bounded store.
+
+    A bucket that has been idle for `capacity / rate` seconds is full again,
+    so it is evicted without changing behaviour. When the store still grows
+    beyond `maxsize`, the least recently used buckets are dropped.
+    """
+
+    def __init__(self, rate: float, capacity: float, maxsize: int = 100000) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.maxsize = maxsize
+        self._idle_after = capacity / rate
+        # key -> [tokens, updated], least recently used first
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+
+    def hit(self, key: Hashable) -> bool:
+        """Take one token for `key`. Returns False if the key is over its limit."""
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.capacity, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        return False
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop buckets from the LRU end that have refilled completely."""
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated) = next(iter(buckets.items()))
+            if now - updated < self._idle_after:
+                break
+            del buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class _ChatSchedule:
+    """Per-key spacing (GCRA): `rate` requests per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: float, maxsize: int) -> None:
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (burst - 1)
+        self.maxsize = maxsize
+        # key -> theoretical arrival time, least recently used first
+        self._tat: OrderedDict[Hashable, float] = OrderedDict()
+
+    def ready_at(self, key: Hashable) -> float:
+        """Earliest time a request for `key` may go out."""
+        tat = self._tat.get(key)
+        return 0.0 if tat is None else tat - self.tolerance
+
+    def take(self, key: Hashable, now: float) -> None:
+        self._tat[key] = max(self._tat.pop(key, now), now) + self.interval
+        # Keys whose schedule is in the past are equivalent to new ones
+        while self._tat:
+            oldest_key, oldest = next(iter(self._tat.items()))
+            if oldest > now and len(self._tat) <= self.maxsize:
+                break
+            del self._tat[oldest_key]
+
+
+class OutboundLimiter:
+    """Scheduler for outgoing Telegram API calls.
+
+    Enforces a global requests/s budget plus separate per-chat budgets for
+    private chats and for groups/channels. Waiting requests are served by
+    priority (then FIFO); a request whose chat is still cooling down does
+    not hold up requests for other chats. pause() stops everyone, which is
+    how a RetryAfter from one call is applied to all senders.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        group_rate: float,
+        group_burst: float,
+        maxsize: int = 100000,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chats = _ChatSchedule(chat_rate, chat_burst, maxsize)
+        self.groups = _ChatSchedule(group_rate, group_burst, maxsize)
+        self._paused_until = 0.0
+        # Sorted list of (priority, seq, chat_id, future)
+        self._waiters: list[tuple[int, int, int | str | None, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._pump_task: asyncio.Task | None = None
+
+    def _schedule_for(self, chat_id: int | str) -> _ChatSchedule:
+        # Private chats have positive ids; groups, channels and @usernames do not
+        if isinstance(chat_id, int) and chat_id > 0:
+            return self.chats
+        return self.groups
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for `seconds` (e.g. after RetryAfter)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        # No burst right after the pause - that would trip the limit again
+        self.global_bucket.hold(self._paused_until)
+        self._wakeup.set()
+
+    async def acquire(self, chat_id: int | str | None, priority: int | None = None) -> None:
+        """Wait for a send slot for `chat_id` (None = no per-chat budget)."""
+        if priority is None:
+            priority = send_priority.get()
+        future = asyncio.get_running_loop().create_future()
+        bisect.insort(self._waiters, (priority, next(self._seq), chat_id, future),
+                      key=lambda w: (w[0], w[1]))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.get_running_loop().create_task(self._pump())
+        self._wakeup.set()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+
+    async def _pump(self) -> None:
+        """Grant slots to waiters in priority order."""
+        while self._waiters:
+            self._wakeup.clear()
+            now = time.monotonic()
+            delay = self._paused_until - now
+
+            if delay <= 0:
+                delay = float("inf")
+                granted = False
+                for i, (_, _, chat_id, future) in enumerate(self._waiters):
+                    if future.done():
+                        del self._waiters[i]
+                        granted = True  # list changed - rescan
+                        break
+                    if chat_id is not None:
+                        schedule = self._schedule_for(chat_id)
+                        ready_at = schedule.ready_at(chat_id)
+                        if ready_at > now:
+                            delay = min(delay, ready_at - now)
+                            continue
+                    if not self.global_bucket.try_acquire():
+                        delay = min(delay, self.global_bucket.wait_time())
+                        break
+                    if chat_id is not None:
+                        schedule.take(chat_id, now)
+                    del self._waiters[i]
+                    future.set_result(None)
+                    granted = True
+                    break
+                if granted:
+                    continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay if delay != float("inf") else None)
+            except asyncio.TimeoutError:
+                pass
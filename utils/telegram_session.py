@@ -0,0 +1,51 @@
+"""
+utils/telegram_session.py - Bot API session with centralized outbound rate limiting.
+Methods that post into a chat (send*, copy/forward, edit*) wait for a slot
+from OutboundLimiter; reads such as getChatMember go straight through.
+A RetryAfter answer pauses all senders for the requested time.
+"""
+
+import logging
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from utils.rate_limit import OutboundLimiter
+
+logger = logging.getLogger(__name__)
+
+# Methods Telegram counts against the per-chat message limits
+_CHAT_SEND_PREFIXES = ("send", "copyMessage", "forwardMessage", "edit")
+
+
+def is_chat_send(method: TelegramMethod) -> bool:
+    """True for API methods that post or change messages in a chat."""
+    return method.__api_method__.startswith(_CHAT_SEND_PREFIXES)
+
+
+class ThrottledSession(AiohttpSession):
+    """AiohttpSession that schedules chat sends through a limiter."""
+
+    def __init__(self, limiter: OutboundLimiter, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        # getChatMember, getUpdates, answerCallbackQuery etc. are not limited
+        if is_chat_send(method):
+            await self.limiter.acquire(getattr(method, "chat_id", None))
+        try:
+            return await super().make_request(bot, method, timeout)
+        except TelegramRetryAfter as e:
+            logger.warning(
+                "RetryAfter %ss on %s - pausing all outgoing requests",
+                e.retry_after, method.__api_method__,
+            )
+            self.limiter.pause(e.retry_after)
+            raise
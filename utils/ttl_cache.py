@@ -0,0 +1,49 @@
+"""
+utils/ttl_cache.py - Small in-memory cache with per-entry TTL.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Dict-like cache where each entry expires after its own TTL.
+
+    The cache is bounded by `maxsize`; when full, the oldest entry is evicted.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        # key -> (expires_at, value), oldest first
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live value, or `default` if the key is missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        if item[0] <= time.monotonic():
+            del self._data[key]
+            return default
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop a key if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop everything."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,61 @@
+"""
+utils/webhook.py - Webhook request handler with health check and graceful drain.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from aiohttp import web
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingRequestHandler(SimpleRequestHandler):
+    """SimpleRequestHandler that stops accepting updates on shutdown and
+    waits for the ones already being processed.
+
+    Updates are acknowledged immediately and processed in the background.
+    Once draining starts, new requests get 503 so Telegram delivers them
+    again after the restart.
+    """
+
+    def __init__(self, *args: Any, drain_timeout: float = 30.0, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.drain_timeout = drain_timeout
+        self.draining = False
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._background_feed_update_tasks)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.draining:
+            return web.Response(status=503, text="shutting down")
+        return await super().handle(request)
+
+    async def health(self, request: web.Request) -> web.Response:
+        """GET /health - for load balancers and container probes."""
+        return web.json_response(
+            {"status": "draining" if self.draining else "ok", "in_flight": self.in_flight},
+            status=503 if self.draining else 200,
+        )
+
+    async def drain(self) -> None:
+        """Refuse new updates and wait for in-flight ones (up to drain_timeout)."""
+        self.draining = True
+        tasks = set(self._background_feed_update_tasks)
+        if not tasks:
+            return
+        logger.info("Webhook: waiting for %s in-flight updates", len(tasks))
+        _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout)
+        if pending:
+            logger.warning("Webhook: %s updates did not finish in time, cancelling", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close(self) -> None:
+        # The bot session is closed by main.on_shutdown
+        await self.drain()